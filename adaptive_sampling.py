@@ -0,0 +1,218 @@
+"""
+Sequential (adaptive) sampling of benchmark cells.
+
+A fixed number of runs per agent x prompt cell is too few for the noisy
+agents and wasted on the stable ones. With ``--adaptive`` every cell first
+gets ``--min-runs`` runs. After each round, cells whose confidence interval
+for the chosen latency percentile is still wider than ``--ci-target``
+(relative to the estimate) are scheduled again, with more runs for cells
+further from the target, until they converge or hit their budget of runs,
+tokens or cost. Converged cells get no further runs, so spend goes where
+the variance is.
+"""
+
+import math
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmark_metrics import TestMetrics
+from benchmark_stats import percentile, percentile_ci
+from scheduler import TestJob
+
+
+CellKey = Tuple[str, str]  # (agent name, prompt type)
+
+CI_METRICS = {
+    "total": "total_time_ms",
+    "ttfb": "time_to_first_event_ms",
+    "ttfc": "time_to_first_content_ms",
+}
+
+# Cell outcomes
+CONVERGED = "converged"
+SAMPLING = "sampling"
+RUN_BUDGET = "run budget"
+TOKEN_BUDGET = "token budget"
+COST_BUDGET = "cost budget"
+FAILING = "failing"
+
+
+@dataclass
+class AdaptiveConfig:
+    """Stopping rule for sequential sampling (0 budgets mean unlimited)."""
+    min_runs: int = 3
+    max_runs: int = 20
+    target_width: float = 0.2  # CI width / estimate
+    percentile: float = 50.0
+    level: float = 0.95
+    metric: str = "total"
+    max_tokens: int = 0
+    max_cost: float = 0.0
+    batch: int = 4  # Max extra runs per cell per round
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "min_runs": self.min_runs,
+            "max_runs": self.max_runs,
+            "target_width": self.target_width,
+            "percentile": self.percentile,
+            "level": self.level,
+            "metric": self.metric,
+            "max_tokens": self.max_tokens,
+            "max_cost": self.max_cost,
+            "batch": self.batch,
+        }
+
+
+@dataclass
+class CellState:
+    """Sampling status of one agent x prompt cell."""
+    runs: int
+    successes: int
+    status: str
+    estimate_ms: float = 0.0
+    ci_low_ms: Optional[float] = None
+    ci_high_ms: Optional[float] = None
+    relative_width: Optional[float] = None
+    tokens: int = 0
+    cost: float = 0.0
+    next_runs: int = 0
+
+
+class AdaptiveSampler:
+    """Decides, round by round, which cells need more runs."""
+
+    def __init__(self, config: AdaptiveConfig, templates: List[TestJob],
+                 cost: Callable[[TestJob, TestMetrics], float]):
+        self.config = config
+        self.cost = cost
+        # First job of each cell; further runs are copies with a new run number
+        self.templates: Dict[CellKey, TestJob] = {}
+        for job in templates:
+            self.templates.setdefault((job.name, job.prompt_type), job)
+        self.rounds = 0
+
+    def evaluate(self, key: CellKey, results: List[TestMetrics]) -> CellState:
+        config = self.config
+        field = CI_METRICS[config.metric]
+        values = [getattr(m, field) for m in results if m.success and getattr(m, field)]
+        template = self.templates[key]
+        state = CellState(
+            runs=len(results),
+            successes=len(values),
+            status=SAMPLING,
+            tokens=sum(m.total_tokens for m in results),
+            cost=sum(self.cost(template, m) for m in results),
+        )
+
+        if values:
+            state.estimate_ms = percentile(values, config.percentile)
+            ci = percentile_ci(values, config.percentile, config.level)
+            if ci is not None:
+                state.ci_low_ms, state.ci_high_ms = ci
+                if state.estimate_ms > 0:
+                    state.relative_width = (ci[1] - ci[0]) / state.estimate_ms
+
+        if state.relative_width is not None and state.relative_width <= config.target_width:
+            state.status = CONVERGED
+        elif not values and state.runs >= config.min_runs:
+            state.status = FAILING
+        elif state.runs >= config.max_runs:
+            state.status = RUN_BUDGET
+        elif config.max_tokens and state.tokens >= config.max_tokens:
+            state.status = TOKEN_BUDGET
+        elif config.max_cost and state.cost >= config.max_cost:
+            state.status = COST_BUDGET
+        else:
+            state.next_runs = self._extra_runs(state)
+        return state
+
+    def _extra_runs(self, state: CellState) -> int:
+        config = self.config
+        if state.relative_width is None:
+            # No usable interval yet: take a full batch
+            extra = config.batch
+        else:
+            # CI width shrinks roughly with 1/sqrt(n)
+            needed = state.runs * (state.relative_width / config.target_width) ** 2
+            extra = min(config.batch, max(1, math.ceil(needed - state.runs)))
+
+        extra = min(extra, config.max_runs - state.runs)
+        # Keep the projected spend inside the token and cost budgets
+        if config.max_tokens and state.tokens and state.runs:
+            per_run = state.tokens / state.runs
+            extra = min(extra, max(1, math.floor((config.max_tokens - state.tokens) / per_run)))
+        if config.max_cost and state.cost and state.runs:
+            per_run = state.cost / state.runs
+            extra = min(extra, max(1, math.floor((config.max_cost - state.cost) / per_run)))
+        return max(extra, 0)
+
+    def evaluate_all(self, cells: Dict[CellKey, List[TestMetrics]]) -> Dict[CellKey, CellState]:
+        return {key: self.evaluate(key, cells.get(key, [])) for key in self.templates}
+
+    def plan(self, cells: Dict[CellKey, List[TestMetrics]]) -> List[TestJob]:
+        """Jobs for the next round (empty when every cell has stopped)."""
+        states = self.evaluate_all(cells)
+        jobs = []
+        for key, state in states.items():
+            template = self.templates[key]
+            for i in range(state.next_runs):
+                jobs.append(replace(template, run_num=state.runs + i + 1,
+                                    queue_wait_ms=0, in_flight_at_start=0))
+        # Interleave cells so one noisy agent does not hog the front of the queue
+        jobs.sort(key=lambda job: job.run_num)
+        if jobs:
+            self.rounds += 1
+        return jobs
+
+    def summary(self, cells: Dict[CellKey, List[TestMetrics]]) -> Dict[str, Any]:
+        states = self.evaluate_all(cells)
+        statuses: Dict[str, int] = {}
+        for state in states.values():
+            statuses[state.status] = statuses.get(state.status, 0) + 1
+        return {
+            "config": self.config.as_dict(),
+            "rounds": self.rounds,
+            "total_runs": sum(s.runs for s in states.values()),
+            "statuses": statuses,
+            "cells": {
+                f"{name}/{prompt_type}": {
+                    "runs": s.runs,
+                    "successes": s.successes,
+                    "status": s.status,
+                    "estimate_ms": s.estimate_ms,
+                    "ci_low_ms": s.ci_low_ms,
+                    "ci_high_ms": s.ci_high_ms,
+                    "relative_width": s.relative_width,
+                    "tokens": s.tokens,
+                    "cost": s.cost,
+                }
+                for (name, prompt_type), s in sorted(states.items())
+            },
+        }
+
+
+def print_adaptive_report(summary: Dict[str, Any]):
+    """Per-agent view of where the runs went."""
+    config = summary["config"]
+    print("\n" + "=" * 120)
+    print(f"ADAPTIVE SAMPLING (p{config['percentile']:g} {config['metric']}, "
+          f"{config['level'] * 100:g}% CI width <= {config['target_width'] * 100:g}%)")
+    print("=" * 120)
+
+    by_agent: Dict[str, List[Dict[str, Any]]] = {}
+    for cell_name, cell in summary["cells"].items():
+        by_agent.setdefault(cell_name.split("/", 1)[0], []).append(cell)
+
+    print(f"\n  {'Agent':<30} {'Runs':>6} {'Converged':>10} {'Worst CI':>10}  Stopped by")
+    print(f"  {'-' * 90}")
+    for agent, cells in sorted(by_agent.items(), key=lambda x: -sum(c["runs"] for c in x[1])):
+        converged = sum(1 for c in cells if c["status"] == CONVERGED)
+        widths = [c["relative_width"] for c in cells if c["relative_width"] is not None]
+        worst = f"±{max(widths) * 50:.0f}%" if widths else "n/a"
+        reasons = sorted({c["status"] for c in cells if c["status"] != CONVERGED})
+        print(f"  {agent:<30} {sum(c['runs'] for c in cells):>6} {converged:>5}/{len(cells):<4} "
+              f"{worst:>10}  {', '.join(reasons) or '-'}")
+
+    print(f"\n  {summary['total_runs']} runs in {summary['rounds']} adaptive rounds: "
+          + ", ".join(f"{count} {status}" for status, count in sorted(summary["statuses"].items())))
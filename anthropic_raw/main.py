@@ -6,6 +6,7 @@ Endpoint: POST /agent
 Direct Anthropic API wrapped with AG-UI events - no framework needed.
 """
 
+import asyncio
 import os
 import uuid
 import json
@@ -94,6 +95,19 @@ app = FastAPI(
 )
 
 
+@app.on_event("startup")
+async def prewarm_upstream():
+    """PREWARM=1: open the upstream connection before the first request."""
+    if os.getenv("PREWARM") != "1":
+        return
+    try:
+        # Listing models costs no tokens but goes through the client's connection pool
+        await asyncio.to_thread(client.models.list, limit=1)
+        print("🔥 Prewarmed Anthropic API connection")
+    except Exception as e:
+        print(f"⚠️  Prewarm failed: {e}")
+
+
 @app.post("/agent")
 async def agent_endpoint(input_data: RunAgentInput):
     """AG-UI compatible endpoint using raw Anthropic API."""
@@ -0,0 +1,227 @@
+"""
+Metric records produced by the AG-UI benchmark harness.
+
+Shared by test_agents.py and the event processors that fill these records
+while a response is still streaming.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from histogram import LatencyHistogram
+
+
+@dataclass
+class ToolCallDetail:
+    """Detailed metrics for a single tool call."""
+    tool_call_id: str
+    name: str
+    start_ms: float
+    args_complete_ms: float = 0
+    end_ms: float = 0
+    result_ms: float = 0
+    success: bool = False
+    result: str = ""
+    args: str = ""
+
+    @property
+    def duration_ms(self) -> float:
+        """Total time from start to result."""
+        if self.result_ms > 0:
+            return self.result_ms - self.start_ms
+        return 0
+
+    @property
+    def execution_time_ms(self) -> float:
+        """Time spent executing (end to result)."""
+        if self.result_ms > 0 and self.end_ms > 0:
+            return self.result_ms - self.end_ms
+        return 0
+
+
+@dataclass
+class StreamingMetrics:
+    """Streaming performance metrics."""
+    total_chars: int = 0
+    total_chunks: int = 0
+    duration_ms: float = 0
+    throughput_chars_per_sec: float = 0
+    avg_gap_ms: float = 0
+    p95_gap_ms: float = 0
+    stalls: int = 0  # Gaps > 500ms
+    stall_time_ms: float = 0
+    gap_histogram: Optional[LatencyHistogram] = None  # Inter-chunk gaps, mergeable across runs
+
+
+@dataclass
+class TokenTiming:
+    """Output-token timing from the provider's usage count and delta arrival times."""
+    output_tokens: int = 0
+    generated_chars: int = 0  # Text, tool-argument and thinking deltas
+    chars_per_token: float = 0
+    decode_ms: float = 0  # Time between deltas, excluding tool round trips
+    tpot_ms: float = 0  # Time per output token after the first delta
+    output_tokens_per_sec: float = 0
+    itl_histogram: Optional[LatencyHistogram] = None  # Inter-token latency, one entry per token
+
+
+@dataclass
+class PhaseTiming:
+    """Where a run spent its time (ms; None when the phase did not occur)."""
+    run_started_ms: Optional[float] = None  # Request start -> RUN_STARTED
+    model_start_ms: Optional[float] = None  # RUN_STARTED -> first model-derived event
+    tool_args_ms: Optional[float] = None  # TOOL_CALL_START -> TOOL_CALL_END, summed
+    tool_exec_ms: Optional[float] = None  # TOOL_CALL_END -> TOOL_CALL_RESULT, summed
+    post_tool_ms: Optional[float] = None  # Last TOOL_CALL_RESULT -> next model event, summed
+    finish_ms: Optional[float] = None  # Last content or tool result -> RUN_FINISHED
+    tool_rounds: int = 0  # Model calls that followed tool results
+
+
+@dataclass
+class ReadFraming:
+    """How the response was cut into network reads (detects server-side buffering)."""
+    reads: int = 0
+    bytes: int = 0
+    bytes_per_read: Optional[LatencyHistogram] = None
+    events_per_read: Dict[int, int] = field(default_factory=dict)  # Events completed -> reads
+    max_events_per_read: int = 0
+    content_events: int = 0  # Text, tool-argument and thinking deltas
+    content_reads: int = 0  # Reads that completed at least one delta
+    buffering_score: Optional[float] = None  # 0 = one delta per read, 1 = all deltas in one read
+    burst_reads: int = 0  # Reads delivering a batch of deltas after a quiet gap
+    burst_events: int = 0
+    max_held_ms: float = 0  # Longest quiet gap before a burst
+    buffered: bool = False
+
+
+@dataclass
+class EventTypeSize:
+    """Wire bytes of one AG-UI event type within a response."""
+    count: int = 0
+    wire_bytes: int = 0  # SSE framing + payload
+    payload_bytes: int = 0  # The JSON in the data: lines
+
+
+@dataclass
+class WireSize:
+    """Bytes on the wire, split into AG-UI payload and SSE framing."""
+    bytes: int = 0  # Everything read from the response body
+    event_bytes: int = 0  # Wire bytes of AG-UI events
+    payload_bytes: int = 0
+    framing_bytes: int = 0  # data:/event:/id: prefixes, line endings, comments before events
+    other_bytes: int = 0  # Not part of an AG-UI event: keep-alive comments, [DONE], ...
+    raw_event_bytes: int = 0  # Wire bytes of embedded rawEvent values (LangGraph)
+    bytes_per_char: Optional[float] = None  # Wire bytes per character of assistant text
+    payload_bytes_per_char: Optional[float] = None
+    by_type: Dict[str, EventTypeSize] = field(default_factory=dict)
+
+
+@dataclass
+class ClientNoise:
+    """Harness-side pauses overlapping one request (see harness_noise.py)."""
+    gc_ms: float = 0
+    gc_collections: int = 0
+    loop_lag_ms: float = 0  # Event-loop ticks that woke up late
+    pause_ms: float = 0  # Union of both; GC pauses also delay the ticker
+    noisy: bool = False
+
+
+@dataclass
+class TurnMetrics:
+    """One request of a multi-turn conversation."""
+    turn: int  # 1-based
+    history_messages: int  # Messages sent, including the new user turn
+    request_bytes: int
+    success: bool
+    ttfb_ms: float = 0
+    ttfc_ms: float = 0
+    total_ms: float = 0
+    response_chars: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class ConnectionTiming:
+    """Client-side phases of one HTTP request (ms, relative to request start)."""
+    pool_wait_ms: float = 0  # Waiting for a free pooled connection
+    connect_ms: float = 0  # TCP connect (new connections only)
+    tls_ms: float = 0
+    request_write_ms: float = 0  # Sending request headers + body
+    server_wait_ms: float = 0  # Request written -> response headers received
+    time_to_headers_ms: float = 0
+    time_to_first_byte_ms: float = 0  # First response body byte
+    connection_reused: bool = False
+
+
+@dataclass
+class TestMetrics:
+    """Metrics collected during a test run."""
+    name: str
+    prompt_type: str
+    prompt: str
+    success: bool = False
+    error: str = None
+    failure: Optional[str] = None  # Failure class, see stream_guard.py
+    run_error: Optional[str] = None  # RUN_ERROR message, if the agent sent one
+
+    # Timing metrics (in milliseconds)
+    total_time_ms: float = 0
+    time_to_first_event_ms: float = 0
+    time_to_first_content_ms: float = 0
+    time_to_complete_ms: float = 0
+
+    # Tool metrics
+    tool_calls: int = 0
+    tool_call_time_ms: float = 0
+    tool_calls_detail: List[ToolCallDetail] = field(default_factory=list)
+
+    # Response metrics
+    request_bytes: int = 0  # Request body as sent
+    response_chars: int = 0
+    response_tokens_approx: int = 0
+
+    # Token usage (for cost calculation)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+
+    # Event counts
+    total_events: int = 0
+    event_types: set = field(default_factory=set)
+
+    # Streaming performance
+    streaming: Optional[StreamingMetrics] = None
+    token_timing: Optional[TokenTiming] = None  # Only when the stream reports usage
+    phases: Optional[PhaseTiming] = None
+    read_framing: Optional[ReadFraming] = None
+    wire: Optional[WireSize] = None
+    noise: Optional[ClientNoise] = None  # Only with --trace-gc / --loop-lag-tick
+
+    # The actual response
+    final_response: str = ""
+
+    # === NEW: Feature detection ===
+    has_thinking: bool = False
+    has_artifacts: bool = False
+    has_hitl: bool = False
+    has_state_snapshot: bool = False
+    has_error_events: bool = False
+    thinking_time_ms: float = 0
+    hitl_response_time_ms: float = 0
+
+    # Multi-turn tracking
+    is_multi_turn: bool = False
+    turn_count: int = 1
+    context_retained: bool = False
+    turns: List[TurnMetrics] = field(default_factory=list)  # Every request of the conversation
+
+    # HTTP client phases (pool wait, connect, ...)
+    connection: Optional[ConnectionTiming] = None
+
+    # Scheduling context (how contended the harness was when this ran)
+    run_num: int = 0
+    queue_wait_ms: float = 0
+    throttle_wait_ms: float = 0  # Held back by the provider rate limiter
+    in_flight_at_start: int = 0
@@ -0,0 +1,219 @@
+"""
+Statistical helpers for comparing benchmark samples.
+
+Pure-stdlib implementations (no scipy) so the harness keeps its small
+dependency footprint. Rank and proportion tests use normal approximations,
+which are accurate for the sample sizes load modes produce (tens to
+thousands of requests); small paired samples use the exact sign test and
+percentile bootstrap.
+"""
+
+import math
+import random
+import statistics
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _normal_two_sided_p(z: float) -> float:
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0-100) of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (q / 100) * (len(ordered) - 1)
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def percentile_ci(values: List[float], q: float = 50.0,
+                  level: float = 0.95) -> Optional[Tuple[float, float]]:
+    """Distribution-free confidence interval for a percentile.
+
+    Uses order statistics: the number of samples below the true q-th
+    percentile is Binomial(n, q/100), so [x(l), x(u)] covers it with
+    probability P(l <= K < u). The interval is grown from the middle
+    towards whichever side adds more coverage. Returns None when even
+    [min, max] does not reach ``level`` (too few samples, e.g. n < 6 for
+    a 95% CI of the median).
+    """
+    n = len(values)
+    if n < 2:
+        return None
+    p = q / 100
+    pmf = [math.comb(n, k) * p ** k * (1 - p) ** (n - k) for k in range(n + 1)]
+    ordered = sorted(values)
+
+    # 1-based order statistic indices; covered when l <= K <= u - 1
+    low = min(max(1, math.floor(n * p)), n - 1)
+    high = low + 1
+    coverage = pmf[low]
+    while coverage < level:
+        down = pmf[low - 1] if low > 1 else -1.0
+        up = pmf[high] if high < n else -1.0
+        if down < 0 and up < 0:
+            return None
+        if down >= up:
+            low -= 1
+            coverage += down
+        else:
+            coverage += up
+            high += 1
+    return ordered[low - 1], ordered[high - 1]
+
+
+def mann_whitney_u(a: List[float], b: List[float]) -> Dict[str, float]:
+    """Two-sided Mann-Whitney U test of whether ``b`` tends to differ from ``a``.
+
+    Returns U for ``b``, the tie-corrected z score (positive when ``b`` is
+    larger) and the p-value.
+    """
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return {"u": 0.0, "z": 0.0, "p_value": 1.0}
+
+    combined = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    rank_sum_b = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        rank_sum_b += avg_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 1)
+        i = j + 1
+
+    n = n1 + n2
+    u = rank_sum_b - n2 * (n2 + 1) / 2
+    mean_u = n1 * n2 / 2
+    var_u = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0.0
+    if var_u <= 0:
+        return {"u": u, "z": 0.0, "p_value": 1.0}
+    z = (u - mean_u) / math.sqrt(var_u)
+    return {"u": u, "z": z, "p_value": _normal_two_sided_p(z)}
+
+
+def two_proportion_z(successes_a: int, n_a: int, successes_b: int, n_b: int) -> Dict[str, float]:
+    """Two-sided z test for a difference between two proportions."""
+    if n_a == 0 or n_b == 0:
+        return {"z": 0.0, "p_value": 1.0}
+    pooled = (successes_a + successes_b) / (n_a + n_b)
+    se = math.sqrt(pooled * (1 - pooled) * (1 / n_a + 1 / n_b))
+    if se == 0:
+        return {"z": 0.0, "p_value": 1.0}
+    z = (successes_b / n_b - successes_a / n_a) / se
+    return {"z": z, "p_value": _normal_two_sided_p(z)}
+
+
+def bootstrap_ci(values: List[float], statistic: Callable[[List[float]], float] = statistics.median,
+                 level: float = 0.95, resamples: int = 5000,
+                 seed: Optional[int] = None) -> Optional[Tuple[float, float]]:
+    """Percentile-bootstrap confidence interval of ``statistic``."""
+    n = len(values)
+    if n < 2:
+        return None
+    rng = random.Random(seed)
+    estimates = sorted(statistic(rng.choices(values, k=n)) for _ in range(resamples))
+    alpha = (1 - level) / 2
+    return (
+        estimates[int(alpha * (resamples - 1))],
+        estimates[int(math.ceil((1 - alpha) * (resamples - 1)))],
+    )
+
+
+def sign_test(differences: List[float]) -> Dict[str, float]:
+    """Exact two-sided sign test of whether paired differences centre on zero."""
+    positive = sum(1 for d in differences if d > 0)
+    negative = sum(1 for d in differences if d < 0)
+    n = positive + negative
+    if n == 0:
+        return {"positive": 0, "negative": 0, "p_value": 1.0}
+    k = min(positive, negative)
+    tail = sum(math.comb(n, i) for i in range(k + 1)) / 2 ** n
+    return {"positive": positive, "negative": negative, "p_value": min(1.0, 2 * tail)}
+
+
+def linear_fit(x: List[float], y: List[float], level: float = 0.95, resamples: int = 1000,
+               seed: Optional[int] = 0) -> Optional[Dict[str, Any]]:
+    """Least-squares line ``y = intercept + slope * x`` with a bootstrap CI of the slope.
+
+    Returns None below 3 points or when ``x`` does not vary.
+    """
+    n = len(x)
+    if n < 3 or len(set(x)) < 2:
+        return None
+    slope, intercept = statistics.linear_regression(x, y)
+    r = statistics.correlation(x, y) if len(set(y)) > 1 else 0.0
+
+    # Resample (x, y) pairs; skip resamples that hit a single x value
+    rng = random.Random(seed)
+    pairs = list(zip(x, y))
+    slopes = []
+    for _ in range(resamples):
+        sample = rng.choices(pairs, k=n)
+        xs = [p[0] for p in sample]
+        if len(set(xs)) > 1:
+            slopes.append(statistics.linear_regression(xs, [p[1] for p in sample]).slope)
+    slopes.sort()
+    alpha = (1 - level) / 2
+    return {
+        "n": n,
+        "slope": slope,
+        "intercept": intercept,
+        "r_squared": r * r,
+        "slope_ci_low": slopes[int(alpha * (len(slopes) - 1))] if slopes else None,
+        "slope_ci_high": slopes[int(math.ceil((1 - alpha) * (len(slopes) - 1)))] if slopes else None,
+    }
+
+
+def median_ci(values: List[float], level: float = 0.95, resamples: int = 2000,
+              seed: Optional[int] = 0) -> Dict[str, Any]:
+    """Median with its bootstrap confidence interval (None bounds below 2 samples)."""
+    ci = bootstrap_ci(values, level=level, resamples=resamples, seed=seed) if values else None
+    return {
+        "n": len(values),
+        "median": statistics.median(values) if values else 0.0,
+        "ci_low": ci[0] if ci else None,
+        "ci_high": ci[1] if ci else None,
+    }
+
+
+def rank_tiers(samples: Dict[str, List[float]], level: float = 0.95,
+               resamples: int = 2000, seed: Optional[int] = 0) -> List[Dict[str, Any]]:
+    """Rank groups by median (lowest first) and split them into tiers.
+
+    Each group is tested against the group ranked directly above it with a
+    Mann-Whitney U test. A new tier starts when the difference to that
+    neighbour, or to the first group of the current tier, is significant at
+    ``1 - level``; checking the tier leader stops a chain of small steps from
+    keeping clearly different groups in one tier. Groups in the same tier
+    are statistically indistinguishable at this sample size.
+    """
+    alpha = 1 - level
+    ranked = sorted(((name, values) for name, values in samples.items() if values),
+                    key=lambda item: (statistics.median(item[1]), item[0]))
+    rows: List[Dict[str, Any]] = []
+    tier = 0
+    leader: List[float] = []
+    previous: List[float] = []
+    for rank, (name, values) in enumerate(ranked, 1):
+        row = {"rank": rank, "name": name, **median_ci(values, level, resamples, seed),
+               "p_vs_previous": None}
+        if rank == 1:
+            tier, leader = 1, values
+        else:
+            row["p_vs_previous"] = mann_whitney_u(previous, values)["p_value"]
+            if row["p_vs_previous"] < alpha or mann_whitney_u(leader, values)["p_value"] < alpha:
+                tier, leader = tier + 1, values
+        row["tier"] = tier
+        previous = values
+        rows.append(row)
+    return rows
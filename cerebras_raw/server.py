@@ -37,6 +37,30 @@ CEREBRAS_MODELS = {
 # Default model (can be overridden via env or request)
 DEFAULT_MODEL = os.getenv("CEREBRAS_MODEL", "llama-3.3-70b")
 
+# One pooled client per process, so requests reuse upstream connections
+http_client = httpx.AsyncClient(timeout=60.0)
+
+
+@app.on_event("startup")
+async def prewarm_upstream():
+    """PREWARM=1: open the upstream connection before the first request."""
+    if os.getenv("PREWARM") != "1":
+        return
+    try:
+        # Listing models costs no tokens but goes through the same connection pool
+        response = await http_client.get(
+            f"{CEREBRAS_BASE_URL}/models",
+            headers={"Authorization": f"Bearer {CEREBRAS_API_KEY}"},
+        )
+        print(f"🔥 Prewarmed Cerebras API connection (HTTP {response.status_code})")
+    except Exception as e:
+        print(f"⚠️  Prewarm failed: {e}")
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await http_client.aclose()
+
 
 async def stream_cerebras_to_agui(request_data: dict) -> AsyncIterator[str]:
     """Convert Cerebras streaming to AG-UI events."""
@@ -72,43 +96,42 @@ async def stream_cerebras_to_agui(request_data: dict) -> AsyncIterator[str]:
     yield f"data: {json.dumps({'type': 'TEXT_MESSAGE_START', 'messageId': message_id, 'role': 'assistant'})}\n\n"
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            async with client.stream(
-                "POST",
-                f"{CEREBRAS_BASE_URL}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {CEREBRAS_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json=cerebras_request,
-            ) as response:
-                async for line in response.aiter_lines():
-                    if not line or line.startswith(":"):
+        async with http_client.stream(
+            "POST",
+            f"{CEREBRAS_BASE_URL}/chat/completions",
+            headers={
+                "Authorization": f"Bearer {CEREBRAS_API_KEY}",
+                "Content-Type": "application/json",
+            },
+            json=cerebras_request,
+        ) as response:
+            async for line in response.aiter_lines():
+                if not line or line.startswith(":"):
+                    continue
+
+                if line.startswith("data: "):
+                    data_str = line[6:]
+
+                    if data_str == "[DONE]":
+                        break
+
+                    try:
+                        chunk = json.loads(data_str)
+
+                        # Extract usage if present (OpenAI format)
+                        if "usage" in chunk:
+                            usage_data = chunk["usage"]
+
+                        delta = chunk.get("choices", [{}])[0].get("delta", {})
+                        content = delta.get("content", "")
+
+                        if content:
+                            # Yield TEXT_MESSAGE_CONTENT
+                            yield f"data: {json.dumps({'type': 'TEXT_MESSAGE_CONTENT', 'messageId': message_id, 'delta': content})}\n\n"
+
+                    except json.JSONDecodeError:
                         continue
 
-                    if line.startswith("data: "):
-                        data_str = line[6:]
-
-                        if data_str == "[DONE]":
-                            break
-
-                        try:
-                            chunk = json.loads(data_str)
-
-                            # Extract usage if present (OpenAI format)
-                            if "usage" in chunk:
-                                usage_data = chunk["usage"]
-
-                            delta = chunk.get("choices", [{}])[0].get("delta", {})
-                            content = delta.get("content", "")
-
-                            if content:
-                                # Yield TEXT_MESSAGE_CONTENT
-                                yield f"data: {json.dumps({'type': 'TEXT_MESSAGE_CONTENT', 'messageId': message_id, 'delta': content})}\n\n"
-
-                        except json.JSONDecodeError:
-                            continue
-
     except Exception as e:
         # Yield ERROR
         yield f"data: {json.dumps({'type': 'ERROR', 'error': str(e)})}\n\n"
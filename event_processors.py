@@ -0,0 +1,617 @@
+"""
+Single-pass event-processor pipeline for the AG-UI benchmark harness.
+
+Each processor collects one aspect of ``TestMetrics`` (text, tokens, tools,
+thinking, ...) and declares the AG-UI event types it handles. The pipeline
+builds a dispatch table from those declarations, so every event arriving on
+the wire is routed in O(1) to exactly the processors that care about its
+type, while the response is still streaming.
+
+Adding a collector:
+
+    @register_processor
+    class StepProcessor(EventProcessor):
+        event_types = ("STEP_STARTED", "STEP_FINISHED")
+
+        def on_event(self, event, ctx):
+            ...
+
+Processors are instantiated per request, so they can keep per-run state on
+``self``. State shared between processors lives on the ``StreamContext``.
+"""
+
+import re
+import statistics
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from benchmark_metrics import (
+    EventTypeSize, PhaseTiming, ReadFraming, StreamingMetrics, TestMetrics, TokenTiming,
+    ToolCallDetail, WireSize,
+)
+from histogram import LatencyHistogram
+from sse_stream import StreamEvent
+
+
+# Register for this pseudo-type to see every event (adds per-event cost)
+ALL_EVENTS = "*"
+
+# Deltas that carry generated tokens
+TOKEN_EVENTS = ("TEXT_MESSAGE_CONTENT", "TOOL_CALL_ARGS", "THINKING_TEXT_MESSAGE_CONTENT")
+
+# Events only a model response can produce (adapters often emit RUN_STARTED
+# and TEXT_MESSAGE_START before calling the model at all)
+MODEL_EVENTS = (
+    "TEXT_MESSAGE_CONTENT", "TEXT_MESSAGE_CHUNK", "THINKING_TEXT_MESSAGE_CONTENT",
+    "TOOL_CALL_START", "TOOL_CALL_ARGS", "TOOL_CALL_CHUNK",
+)
+
+# A read completing at least BURST_EVENTS deltas after BURST_GAP_MS without
+# data is a burst; a run whose deltas mostly share reads and that has a
+# burst was buffered by the server
+BURST_EVENTS = 5
+BURST_GAP_MS = 500
+BUFFERED_SCORE = 0.5
+
+# Key of the embedded LangGraph event (an escaped quote means it is inside a string)
+_RAW_EVENT_KEY = re.compile(rb'(?<!\\)"rawEvent"\s*:\s*')
+# A JSON string, or a bracket outside of strings
+_JSON_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.DOTALL)
+_JSON_SCALAR = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[^,}\]\s]+', re.DOTALL)
+
+PROCESSOR_REGISTRY: List[Type["EventProcessor"]] = []
+
+
+def json_value_bytes(data: bytes, start: int) -> int:
+    """Length of the JSON value starting at ``data[start]``, found without decoding it."""
+    if data[start:start + 1] not in (b"{", b"["):
+        match = _JSON_SCALAR.match(data, start)
+        return match.end() - start if match else 0
+    depth = 0
+    for token in _JSON_TOKEN.finditer(data, start):
+        first = token.group()[0]
+        if first in b"{[":
+            depth += 1
+        elif first in b"}]":
+            depth -= 1
+            if depth == 0:
+                return token.end() - start
+    return len(data) - start  # Unterminated
+
+
+def register_processor(cls: Type["EventProcessor"]) -> Type["EventProcessor"]:
+    """Class decorator adding a processor to the default pipeline."""
+    PROCESSOR_REGISTRY.append(cls)
+    return cls
+
+
+class StreamContext:
+    """Per-request state shared by all processors."""
+
+    def __init__(self, metrics: TestMetrics, start_ns: int):
+        self.metrics = metrics
+        self.start_ns = start_ns
+        self.first_event_ns: Optional[int] = None
+        self.first_content_ns: Optional[int] = None
+        self.last_event_ns: Optional[int] = None
+        self.bytes_received = 0
+        self.response_parts: List[str] = []
+        self.snapshot_response = ""
+
+    def offset_ms(self, event: StreamEvent) -> float:
+        """Arrival time of an event relative to the request start."""
+        return (event.arrival_ns - self.start_ns) / 1e6
+
+    def mark_content(self, event: StreamEvent):
+        if self.first_content_ns is None:
+            self.first_content_ns = event.arrival_ns
+
+
+class EventProcessor(ABC):
+    """Base class for metric collectors run inline on the event stream."""
+
+    # AG-UI event types this processor is dispatched for
+    event_types: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def on_event(self, event: StreamEvent, ctx: StreamContext):
+        """Called for every event of one of ``event_types``, as it arrives."""
+
+    def finish(self, ctx: StreamContext):
+        """Called once after the stream ends."""
+
+
+class EventPipeline:
+    """Routes each incoming event to the processors registered for its type."""
+
+    def __init__(self, metrics: TestMetrics, start_ns: int,
+                 processors: Optional[List[Type[EventProcessor]]] = None):
+        self.ctx = StreamContext(metrics, start_ns)
+        self.processors = [cls() for cls in (processors or PROCESSOR_REGISTRY)]
+
+        wildcard = tuple(p.on_event for p in self.processors if ALL_EVENTS in p.event_types)
+        dispatch: Dict[str, List[Callable]] = {}
+        for processor in self.processors:
+            for event_type in processor.event_types:
+                if event_type != ALL_EVENTS:
+                    dispatch.setdefault(event_type, []).append(processor.on_event)
+        self._dispatch: Dict[str, Tuple[Callable, ...]] = {
+            event_type: tuple(handlers) + wildcard
+            for event_type, handlers in dispatch.items()
+        }
+        self._wildcard = wildcard
+        self.reads: List[List[int]] = []  # [arrival_ns, bytes, events, deltas] per network read
+
+    def process_read(self, arrival_ns: int, nbytes: int, events: List[StreamEvent]):
+        """Process the events completed by one network read and log its framing."""
+        deltas = 0
+        for event in events:
+            self.process(event)
+            if event.type in TOKEN_EVENTS:
+                deltas += 1
+        self.reads.append([arrival_ns, nbytes, len(events), deltas])
+        self.ctx.bytes_received += nbytes
+
+    def process_flush(self, events: List[StreamEvent]):
+        """Process events left in the parser when the stream ended.
+
+        Their bytes came with the last read, so they are counted there.
+        """
+        for event in events:
+            self.process(event)
+            if self.reads:
+                self.reads[-1][2] += 1
+                self.reads[-1][3] += event.type in TOKEN_EVENTS
+
+    def process(self, event: StreamEvent):
+        ctx = self.ctx
+        metrics = ctx.metrics
+        metrics.total_events += 1
+        if event.type:
+            metrics.event_types.add(event.type)
+        if ctx.first_event_ns is None:
+            ctx.first_event_ns = event.arrival_ns
+        ctx.last_event_ns = event.arrival_ns
+
+        for handler in self._dispatch.get(event.type, self._wildcard):
+            handler(event, ctx)
+        # Every processor is done with the raw bytes
+        event.release_data()
+
+    def finish(self, end_ns: int) -> StreamContext:
+        ctx = self.ctx
+        for processor in self.processors:
+            processor.finish(ctx)
+
+        metrics = ctx.metrics
+        metrics.total_time_ms = (end_ns - ctx.start_ns) / 1e6
+        if ctx.first_event_ns is not None:
+            metrics.time_to_first_event_ms = (ctx.first_event_ns - ctx.start_ns) / 1e6
+        if ctx.first_content_ns is not None:
+            metrics.time_to_first_content_ms = (ctx.first_content_ns - ctx.start_ns) / 1e6
+        metrics.time_to_complete_ms = metrics.total_time_ms
+        metrics.read_framing = build_read_framing(self.reads, ctx.start_ns)
+        return ctx
+
+
+def _merge_usage(metrics: TestMetrics, usage: Any):
+    if isinstance(usage, dict):
+        metrics.input_tokens = max(metrics.input_tokens, usage.get("input_tokens", 0) or 0)
+        metrics.output_tokens = max(metrics.output_tokens, usage.get("output_tokens", 0) or 0)
+        metrics.total_tokens = max(metrics.total_tokens, usage.get("total_tokens", 0) or 0)
+
+
+def build_streaming_metrics(arrivals_ns: List[int], chars: int) -> Optional[StreamingMetrics]:
+    """Build chunk-gap statistics from text chunk arrival times."""
+    if len(arrivals_ns) < 2:
+        return None
+
+    # Calculate gaps between text chunks
+    gaps = []
+    for i in range(1, len(arrivals_ns)):
+        gap_ms = (arrivals_ns[i] - arrivals_ns[i - 1]) / 1e6
+        if gap_ms > 0:
+            gaps.append(gap_ms)
+
+    if not gaps:
+        return None
+
+    # Identify stalls (gaps > 500ms)
+    stalls = [g for g in gaps if g > 500]
+
+    duration_ms = (arrivals_ns[-1] - arrivals_ns[0]) / 1e6
+    throughput_cps = 0
+    if duration_ms > 0:
+        throughput_cps = (chars / duration_ms) * 1000  # chars per second
+
+    gap_histogram = LatencyHistogram.from_values(gaps)
+
+    return StreamingMetrics(
+        total_chars=chars,
+        total_chunks=len(arrivals_ns),
+        duration_ms=duration_ms,
+        throughput_chars_per_sec=throughput_cps,
+        avg_gap_ms=statistics.mean(gaps),
+        p95_gap_ms=gap_histogram.percentile(95),
+        stalls=len(stalls),
+        stall_time_ms=sum(stalls),
+        gap_histogram=gap_histogram,
+    )
+
+
+def build_token_timing(chunks: List[Tuple[int, Optional[int]]],
+                       output_tokens: int) -> Optional[TokenTiming]:
+    """Token throughput, TPOT and inter-token latency.
+
+    ``chunks`` holds (chars, gap_ns) per generated delta, with no gap for the
+    first delta of each generation segment. The provider's output token
+    count is spread over the deltas in proportion to their characters, so a
+    delta carrying k tokens after a gap g adds k inter-token latencies of
+    g / k. Without a usage count there is no estimate (no chars/4 guess).
+    """
+    chars = sum(c for c, _ in chunks)
+    if output_tokens <= 0 or chars <= 0 or len(chunks) < 2:
+        return None
+
+    tokens_per_char = output_tokens / chars
+    itl = LatencyHistogram()
+    decode_ns = 0
+    decoded_tokens = 0.0
+    for chunk_chars, gap_ns in chunks:
+        if gap_ns is None:
+            continue
+        tokens = chunk_chars * tokens_per_char
+        decode_ns += gap_ns
+        decoded_tokens += tokens
+        itl.record(gap_ns / 1e6 / tokens, count=max(1, round(tokens)))
+
+    decode_ms = decode_ns / 1e6
+    if decode_ms <= 0 or decoded_tokens <= 0:
+        return None  # Everything arrived in one burst; no timing to measure
+
+    tpot_ms = decode_ms / decoded_tokens
+    return TokenTiming(
+        output_tokens=output_tokens,
+        generated_chars=chars,
+        chars_per_token=chars / output_tokens,
+        decode_ms=decode_ms,
+        tpot_ms=tpot_ms,
+        output_tokens_per_sec=1000 / tpot_ms,
+        itl_histogram=itl,
+    )
+
+
+def build_read_framing(reads: List[List[int]], start_ns: int) -> Optional[ReadFraming]:
+    """Bytes and events per network read, and a buffering score.
+
+    A server that flushes every event gives one delta per read; one that
+    batches delivers many deltas per read, typically after a long silence.
+    The score is 1 - (reads carrying deltas - 1) / (deltas - 1).
+    """
+    if not reads:
+        return None
+
+    framing = ReadFraming(reads=len(reads), bytes_per_read=LatencyHistogram())
+    previous_ns = start_ns
+    for arrival_ns, nbytes, events, deltas in reads:
+        framing.bytes += nbytes
+        framing.bytes_per_read.record(nbytes)
+        framing.events_per_read[events] = framing.events_per_read.get(events, 0) + 1
+        framing.max_events_per_read = max(framing.max_events_per_read, events)
+        framing.content_events += deltas
+        if deltas:
+            framing.content_reads += 1
+        held_ms = (arrival_ns - previous_ns) / 1e6
+        if deltas >= BURST_EVENTS and held_ms >= BURST_GAP_MS:
+            framing.burst_reads += 1
+            framing.burst_events += deltas
+            framing.max_held_ms = max(framing.max_held_ms, held_ms)
+        previous_ns = arrival_ns
+
+    if framing.content_events >= 2:
+        framing.buffering_score = 1 - (framing.content_reads - 1) / (framing.content_events - 1)
+        framing.buffered = framing.burst_reads > 0 and framing.buffering_score >= BUFFERED_SCORE
+    return framing
+
+
+# === Built-in processors ===
+
+@register_processor
+class TextContentProcessor(EventProcessor):
+    """Accumulates streamed assistant text and chunk timing."""
+
+    event_types = ("TEXT_MESSAGE_CONTENT",)
+
+    def __init__(self):
+        self.arrivals_ns: List[int] = []
+        self.chars = 0
+
+    def on_event(self, event, ctx):
+        ctx.mark_content(event)
+        delta = event.get("delta", "") or ""
+        ctx.response_parts.append(delta)
+        self.arrivals_ns.append(event.arrival_ns)
+        self.chars += len(delta)
+
+    def finish(self, ctx):
+        metrics = ctx.metrics
+        metrics.final_response = "".join(ctx.response_parts) or ctx.snapshot_response
+        metrics.response_chars = len(metrics.final_response)
+        metrics.response_tokens_approx = metrics.response_chars // 4
+        metrics.streaming = build_streaming_metrics(self.arrivals_ns, self.chars)
+
+
+@register_processor
+class MessagesSnapshotProcessor(EventProcessor):
+    """Falls back to MESSAGES_SNAPSHOT for frameworks that do not stream text."""
+
+    event_types = ("MESSAGES_SNAPSHOT",)
+
+    def on_event(self, event, ctx):
+        for msg in reversed(event.get("messages", []) or []):
+            if isinstance(msg, dict) and msg.get("role") == "assistant":
+                content = msg.get("content", "")
+                if content and isinstance(content, str):
+                    ctx.snapshot_response = content
+                    if not ctx.response_parts:
+                        ctx.mark_content(event)
+                break
+
+
+@register_processor
+class UsageMetadataProcessor(EventProcessor):
+    """Token usage from USAGE_METADATA events (raw API wrappers)."""
+
+    event_types = ("USAGE_METADATA",)
+
+    def on_event(self, event, ctx):
+        _merge_usage(ctx.metrics, event.payload)
+
+
+@register_processor
+class EmbeddedUsageProcessor(EventProcessor):
+    """Token usage attached to regular events (LangGraph ``rawEvent`` chunks)."""
+
+    # Any event type may carry usage; the raw-bytes check keeps this cheap
+    event_types = (ALL_EVENTS,)
+
+    def on_event(self, event, ctx):
+        # Skip decoding payloads that cannot carry usage
+        if not event.contains(b'"usage_metadata"'):
+            return
+        metrics = ctx.metrics
+        _merge_usage(metrics, event.get("usage_metadata"))
+
+        raw = event.get("rawEvent")
+        if isinstance(raw, dict) and isinstance(raw.get("data"), dict):
+            data = raw["data"]
+            # LangGraph usage_metadata in chunk / output
+            for key in ("chunk", "output"):
+                if isinstance(data.get(key), dict):
+                    _merge_usage(metrics, data[key].get("usage_metadata"))
+
+
+@register_processor
+class LangGraphRawUsageProcessor(EventProcessor):
+    """Final per-call usage from LangGraph RAW ``on_chat_model_end`` events."""
+
+    event_types = ("RAW",)
+
+    def on_event(self, event, ctx):
+        if not event.contains(b'"on_chat_model_end"'):
+            return
+        raw = event.get("event")
+        if isinstance(raw, dict) and isinstance(raw.get("data"), dict):
+            output = raw["data"].get("output")
+            if isinstance(output, dict):
+                _merge_usage(ctx.metrics, output.get("usage_metadata"))
+
+
+@register_processor
+class TokenTimingProcessor(EventProcessor):
+    """Size and arrival gap of every generated delta, for token-level timing."""
+
+    event_types = TOKEN_EVENTS + ("TOOL_CALL_END",)
+
+    def __init__(self):
+        self.chunks: List[Tuple[int, Optional[int]]] = []
+        self.last_ns: Optional[int] = None
+
+    def on_event(self, event, ctx):
+        if event.type == "TOOL_CALL_END":
+            # Tool execution and the next model call are not decode time
+            self.last_ns = None
+            return
+        delta = event.get("delta")
+        chars = len(delta) if isinstance(delta, str) else 0
+        if not chars:
+            return
+        gap_ns = event.arrival_ns - self.last_ns if self.last_ns is not None else None
+        self.chunks.append((chars, gap_ns))
+        self.last_ns = event.arrival_ns
+
+    def finish(self, ctx):
+        # Usage events arrive during the stream, so the count is final here
+        ctx.metrics.token_timing = build_token_timing(self.chunks, ctx.metrics.output_tokens)
+
+
+@register_processor
+class ToolCallProcessor(EventProcessor):
+    """Tracks each tool call from start through args, end and result."""
+
+    event_types = ("TOOL_CALL_START", "TOOL_CALL_ARGS", "TOOL_CALL_END", "TOOL_CALL_RESULT")
+
+    def __init__(self):
+        self.calls: Dict[str, ToolCallDetail] = {}
+
+    def on_event(self, event, ctx):
+        metrics = ctx.metrics
+        event_type = event.type
+
+        if event_type == "TOOL_CALL_START":
+            metrics.tool_calls += 1
+            tool_call_id = event.get("toolCallId") or f"tool_{metrics.tool_calls}"
+            detail = ToolCallDetail(
+                tool_call_id=tool_call_id,
+                name=event.get("toolCallName", "unknown"),
+                start_ms=ctx.offset_ms(event),
+            )
+            self.calls[tool_call_id] = detail
+            metrics.tool_calls_detail.append(detail)
+            return
+
+        detail = self.calls.get(event.get("toolCallId", ""))
+        if detail is None:
+            return
+
+        if event_type == "TOOL_CALL_ARGS":
+            detail.args += event.get("delta", "") or ""
+        elif event_type == "TOOL_CALL_END":
+            detail.end_ms = detail.args_complete_ms = ctx.offset_ms(event)
+        elif event_type == "TOOL_CALL_RESULT":
+            detail.result_ms = ctx.offset_ms(event)
+            result = event.get("result", event.get("content", ""))
+            detail.result = result if isinstance(result, str) else str(result)
+            detail.success = True
+            if detail.duration_ms > 0:
+                metrics.tool_call_time_ms += detail.duration_ms
+
+
+@register_processor
+class PhaseProcessor(EventProcessor):
+    """Splits the run into protocol, model and tool phases."""
+
+    event_types = MODEL_EVENTS + ("RUN_STARTED", "RUN_FINISHED", "TOOL_CALL_RESULT")
+
+    def __init__(self):
+        self.run_started_ns: Optional[int] = None
+        self.run_finished_ns: Optional[int] = None
+        self.first_model_ns: Optional[int] = None
+        self.last_content_ns: Optional[int] = None
+        self.tool_result_ns: Optional[int] = None  # Set until the model responds
+        self.post_tool_ns = 0
+        self.tool_rounds = 0
+
+    def on_event(self, event, ctx):
+        event_type = event.type
+        if event_type == "RUN_STARTED":
+            if self.run_started_ns is None:
+                self.run_started_ns = event.arrival_ns
+        elif event_type == "RUN_FINISHED":
+            self.run_finished_ns = event.arrival_ns
+        elif event_type == "TOOL_CALL_RESULT":
+            self.tool_result_ns = self.last_content_ns = event.arrival_ns
+        else:
+            if self.first_model_ns is None:
+                self.first_model_ns = event.arrival_ns
+            if self.tool_result_ns is not None:
+                self.post_tool_ns += event.arrival_ns - self.tool_result_ns
+                self.tool_rounds += 1
+                self.tool_result_ns = None
+            self.last_content_ns = event.arrival_ns
+
+    def finish(self, ctx):
+        def ms(start_ns, end_ns):
+            return (end_ns - start_ns) / 1e6 if start_ns is not None and end_ns is not None else None
+
+        calls = ctx.metrics.tool_calls_detail
+        phases = PhaseTiming(
+            run_started_ms=ms(ctx.start_ns, self.run_started_ns),
+            model_start_ms=ms(self.run_started_ns, self.first_model_ns),
+            finish_ms=ms(self.last_content_ns, self.run_finished_ns),
+            tool_rounds=self.tool_rounds,
+        )
+        if calls:
+            phases.tool_args_ms = sum(tc.end_ms - tc.start_ms for tc in calls if tc.end_ms)
+            phases.tool_exec_ms = sum(tc.execution_time_ms for tc in calls)
+        if self.tool_rounds:
+            phases.post_tool_ms = self.post_tool_ns / 1e6
+        ctx.metrics.phases = phases
+
+
+@register_processor
+class WireSizeProcessor(EventProcessor):
+    """Bytes on the wire per event type, and how much of it is SSE framing."""
+
+    event_types = (ALL_EVENTS,)
+
+    def __init__(self):
+        self.by_type: Dict[str, EventTypeSize] = {}
+        self.raw_event_bytes = 0
+        self.last: Optional[Tuple[StreamEvent, int]] = None  # (event, wire bytes counted)
+
+    def _recount_last(self):
+        # An event whose blank line ended a read in CR gets the LF from the next read
+        if self.last is not None:
+            event, counted = self.last
+            self.by_type[event.type].wire_bytes += event.wire_bytes - counted
+            self.last = None
+
+    def on_event(self, event, ctx):
+        self._recount_last()
+        size = self.by_type.get(event.type)
+        if size is None:
+            size = self.by_type[event.type] = EventTypeSize()
+        size.count += 1
+        size.wire_bytes += event.wire_bytes
+        self.last = (event, event.wire_bytes)
+        size.payload_bytes += len(event.data)
+        if event.contains(b'"rawEvent"'):
+            # Span of the value in the raw bytes; decoding would cost more than the event
+            match = _RAW_EVENT_KEY.search(event.data)
+            if match and event.data[match.end():match.end() + 4] != b"null":
+                self.raw_event_bytes += json_value_bytes(event.data, match.end())
+
+    def finish(self, ctx):
+        self._recount_last()
+        wire = WireSize(bytes=ctx.bytes_received, raw_event_bytes=self.raw_event_bytes,
+                        by_type=self.by_type)
+        for size in self.by_type.values():
+            wire.event_bytes += size.wire_bytes
+            wire.payload_bytes += size.payload_bytes
+        wire.framing_bytes = wire.event_bytes - wire.payload_bytes
+        wire.other_bytes = max(0, wire.bytes - wire.event_bytes)
+        # Registered after TextContentProcessor, so the response text is final
+        chars = ctx.metrics.response_chars
+        if chars:
+            wire.bytes_per_char = wire.bytes / chars
+            wire.payload_bytes_per_char = wire.payload_bytes / chars
+        ctx.metrics.wire = wire
+
+
+@register_processor
+class ThinkingProcessor(EventProcessor):
+    """Detects reasoning output and measures time spent thinking."""
+
+    event_types = (
+        "THINKING_START", "THINKING_END",
+        "THINKING_TEXT_MESSAGE_START", "THINKING_TEXT_MESSAGE_CONTENT", "THINKING_TEXT_MESSAGE_END",
+    )
+
+    def __init__(self):
+        self.open_ns: Optional[int] = None
+
+    def on_event(self, event, ctx):
+        metrics = ctx.metrics
+        metrics.has_thinking = True
+        if event.type == "THINKING_START":
+            self.open_ns = event.arrival_ns
+        elif event.type == "THINKING_END" and self.open_ns is not None:
+            metrics.thinking_time_ms += (event.arrival_ns - self.open_ns) / 1e6
+            self.open_ns = None
+
+
+@register_processor
+class FeatureFlagProcessor(EventProcessor):
+    """Sets the feature-detection flags on TestMetrics."""
+
+    event_types = ("STATE_SNAPSHOT", "STATE_DELTA", "RUN_ERROR")
+
+    def on_event(self, event, ctx):
+        if event.type == "RUN_ERROR":
+            ctx.metrics.has_error_events = True
+            code = event.get("code") or ""
+            message = event.get("message") or ""
+            ctx.metrics.run_error = f"{code}: {message}" if code else str(message)
+        else:
+            ctx.metrics.has_state_snapshot = True
@@ -6,6 +6,7 @@ Endpoint: POST /agent
 Direct Google Gemini API wrapped with AG-UI events - no framework needed.
 """
 
+import asyncio
 import os
 import uuid
 import json
@@ -82,6 +83,19 @@ app = FastAPI(
 )
 
 
+@app.on_event("startup")
+async def prewarm_upstream():
+    """PREWARM=1: open the upstream connection before the first request."""
+    if os.getenv("PREWARM") != "1":
+        return
+    try:
+        # count_tokens is free and uses the same generative service channel
+        await asyncio.to_thread(model.count_tokens, "ping")
+        print("🔥 Prewarmed Gemini API connection")
+    except Exception as e:
+        print(f"⚠️  Prewarm failed: {e}")
+
+
 @app.post("/agent")
 async def agent_endpoint(input_data: RunAgentInput):
     """AG-UI compatible endpoint using raw Gemini API."""
@@ -9,6 +9,7 @@ Reads JSON output from benchmark runs and generates:
 - Streaming performance analysis
 - Success rate comparisons
 - Model vs Framework comparisons
+- Wire size per event type
 """
 
 import json
@@ -18,6 +19,21 @@ from collections import defaultdict
 from statistics import median, mean
 from datetime import datetime
 
+from benchmark_stats import rank_tiers
+
+# Confidence level of the latency intervals and tier tests
+RANKING_LEVEL = 0.95
+
+# (column label, metadata.json "phases" key) in the order the phases happen
+PHASES = (
+    ("→RUN_STARTED (ms)", "run_started_ms"),
+    ("→Model (ms)", "model_start_ms"),
+    ("Tool args (ms)", "tool_args_ms"),
+    ("Tool exec (ms)", "tool_exec_ms"),
+    ("Post-tool (ms)", "post_tool_ms"),
+    ("→FINISHED (ms)", "finish_ms"),
+)
+
 
 def load_benchmark_results(run_dir):
     """Load all benchmark results from a run directory."""
@@ -74,6 +90,25 @@ def load_benchmark_results(run_dir):
     return results
 
 
+def agent_times(results):
+    """Total times of every successful test, per agent."""
+    times = {}
+    for agent_name, tests in results.items():
+        values = [t["metadata"].get("timing", {}).get("total_time_ms", 0)
+                  for t in tests.values() if t["metadata"].get("success")]
+        values = [v for v in values if v]
+        if values:
+            times[agent_name] = values
+    return times
+
+
+def format_ci(row):
+    """Render a ranking row's interval as 'low-high'."""
+    if row.get("ci_low") is None:
+        return "n/a"
+    return f"{row['ci_low']:.0f}-{row['ci_high']:.0f}"
+
+
 def generate_event_coverage_matrix(results, output_file):
     """Generate 26-event × agents matrix."""
 
@@ -187,6 +222,9 @@ def generate_framework_comparison(results, output_file):
             "tests_count": len(test_data),
         }
 
+    # Bootstrap CI of each median and tiers of indistinguishable agents
+    ranking = {row["name"]: row for row in rank_tiers(agent_times(results), level=RANKING_LEVEL)}
+
     # Sort by success rate, then speed
     sorted_agents = sorted(
         agent_stats.items(),
@@ -194,17 +232,48 @@ def generate_framework_comparison(results, output_file):
     )
 
     # Generate table
+    level = f"{RANKING_LEVEL * 100:g}%"
     content += "## 📊 Framework Performance Matrix\n\n"
-    content += "| Framework | Tests | Success | Median Time (ms) | Throughput (c/s) | Tool Calls |\n"
-    content += "|-----------|-------|---------|------------------|------------------|------------|\n"
+    content += f"| Framework | Tests | Success | Median Time (ms) | {level} CI (ms) | Tier | Throughput (c/s) | Tool Calls |\n"
+    content += "|-----------|-------|---------|------------------|-------------|------|------------------|------------|\n"
 
     for agent, stats in sorted_agents:
+        row = ranking.get(agent, {})
         content += f"| {agent} | {stats['tests_count']} | "
         content += f"{stats['success_rate']:.0f}% | "
         content += f"{stats['median_time_ms']:.0f} | "
+        content += f"{format_ci(row)} | "
+        content += f"{row.get('tier', '-')} | "
         content += f"{stats['throughput']:.0f} | "
         content += f"{stats['tool_calls_total']} |\n"
 
+    content += "\n## 🏁 Latency Tiers\n\n"
+    content += ("Agents ranked by median total time. Agents in the same tier are not "
+                f"significantly different (Mann-Whitney U against the previous rank and the "
+                f"tier leader, {level} confidence); the interval is a bootstrap CI of the median.\n\n")
+    content += "| Rank | Tier | Framework | Runs | Median (ms) | " + level + " CI (ms) | p vs previous |\n"
+    content += "|------|------|-----------|------|-------------|-------------|---------------|\n"
+    for row in ranking.values():
+        p_value = f"{row['p_vs_previous']:.3f}" if row["p_vs_previous"] is not None else "-"
+        content += f"| {row['rank']} | {row['tier']} | {row['name']} | {row['n']} | "
+        content += f"{row['median']:.0f} | {format_ci(row)} | {p_value} |\n"
+
+    # Where each framework spends its time
+    content += "\n## ⏱️ Phase Breakdown\n\n"
+    content += ("Median per phase over the successful runs in which it occurred. `→Model` is "
+                "RUN_STARTED to the first text, thinking or tool-call event; `Post-tool` is a "
+                "tool result to the model's next event; `→FINISHED` is the last content to RUN_FINISHED.\n\n")
+    content += "| Framework | " + " | ".join(label for label, _ in PHASES) + " |\n"
+    content += "|-----------|" + "|".join("-" * (len(label) + 2) for label, _ in PHASES) + "|\n"
+    for agent, _ in sorted_agents:
+        phases = [t["metadata"].get("phases") or {} for t in results[agent].values()
+                  if t["metadata"].get("success")]
+        content += f"| {agent} |"
+        for _, key in PHASES:
+            values = [p[key] for p in phases if p.get(key) is not None]
+            content += f" {median(values):.0f} |" if values else " - |"
+        content += "\n"
+
     # Feature coverage
     content += "\n## 🎯 Feature Support Matrix\n\n"
 
@@ -301,6 +370,110 @@ def generate_event_type_analysis(results, output_file):
     print(f"✅ Generated: {output_file}")
 
 
+def format_bytes(n):
+    """Render a byte count as B, KB or MB."""
+    if n >= 1024 * 1024:
+        return f"{n / (1024 * 1024):.1f} MB"
+    if n >= 1024:
+        return f"{n / 1024:.1f} KB"
+    return f"{n:.0f} B"
+
+
+def generate_wire_size_report(results, output_file):
+    """Generate bytes-on-the-wire analysis per agent, prompt and event type."""
+
+    content = "# 📦 Wire Size Analysis\n\n"
+    content += f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    content += ("Bytes read from each response body, split into AG-UI JSON payload, SSE framing "
+                "(`data:` prefixes, line endings, comment lines) and bytes outside any AG-UI event "
+                "(keep-alives, `[DONE]`). Bytes/char divides by the characters of assistant text, "
+                "so it shows what a client downloads and parses per character it displays.\n\n")
+
+    # Per agent, over successful runs
+    agent_wire = {}
+    for agent_name, tests in results.items():
+        wires = [(name, t["metadata"]) for name, t in tests.items()
+                 if t["metadata"].get("success") and t["metadata"].get("wire")]
+        if wires:
+            agent_wire[agent_name] = wires
+
+    if not agent_wire:
+        content += "_No wire-size data in this run (recorded by test_agents.py since wire accounting was added)._\n"
+        with open(output_file, "w") as f:
+            f.write(content)
+        print(f"✅ Generated: {output_file}")
+        return
+
+    content += "## 📊 Bytes per Run\n\n"
+    content += "| Framework | Runs | Median | Max | Payload | Framing | Other | rawEvent | Bytes/char | Payload bytes/char |\n"
+    content += "|-----------|------|--------|-----|---------|---------|-------|----------|------------|--------------------|\n"
+
+    rows = []
+    for agent, wires in agent_wire.items():
+        sizes = [m["wire"]["bytes"] for _, m in wires]
+        total = sum(sizes)
+        chars = sum(m.get("response", {}).get("chars", 0) for _, m in wires)
+        payload = sum(m["wire"]["payload_bytes"] for _, m in wires)
+        rows.append((agent, len(wires), median(sizes), max(sizes), total, payload,
+                     sum(m["wire"]["framing_bytes"] for _, m in wires),
+                     sum(m["wire"]["other_bytes"] for _, m in wires),
+                     sum(m["wire"].get("raw_event_bytes", 0) for _, m in wires), chars))
+
+    for agent, runs, med, biggest, total, payload, framing, other, raw, chars in sorted(rows, key=lambda r: -r[2]):
+        def share(n):
+            return f"{n / total * 100:.0f}%" if total else "-"
+        content += f"| {agent} | {runs} | {format_bytes(med)} | {format_bytes(biggest)} | "
+        content += f"{share(payload)} | {share(framing)} | {share(other)} | {share(raw)} | "
+        content += f"{total / chars:.1f} | {payload / chars:.1f} |\n" if chars else "- | - |\n"
+
+    # Which prompts produce the heavy streams
+    prompt_types = sorted({name.split("-", 1)[1] for wires in agent_wire.values() for name, _ in wires})
+    content += "\n## 🧪 Median Bytes by Prompt\n\n"
+    content += "| Framework | " + " | ".join(prompt_types) + " |\n"
+    content += "|-----------|" + "|".join("-" * (len(p) + 2) for p in prompt_types) + "|\n"
+    for agent, wires in sorted(agent_wire.items()):
+        content += f"| {agent} |"
+        for prompt_type in prompt_types:
+            sizes = [m["wire"]["bytes"] for name, m in wires if name.split("-", 1)[1] == prompt_type]
+            content += f" {format_bytes(median(sizes))} |" if sizes else " - |"
+        content += "\n"
+
+    # Where the bytes go, per event type
+    content += "\n## 🧬 Bytes by Event Type\n\n"
+    content += "Event types making up at least 5% of an agent's bytes.\n\n"
+    content += "| Framework | Event Type | Events | Share | Avg Event | Framing/Event |\n"
+    content += "|-----------|------------|--------|-------|-----------|---------------|\n"
+    overall = defaultdict(lambda: {"count": 0, "wire_bytes": 0, "payload_bytes": 0, "agents": set()})
+    for agent, wires in sorted(agent_wire.items()):
+        by_type = defaultdict(lambda: {"count": 0, "wire_bytes": 0, "payload_bytes": 0})
+        for _, m in wires:
+            for event_type, size in m["wire"].get("by_type", {}).items():
+                for key in ("count", "wire_bytes", "payload_bytes"):
+                    by_type[event_type][key] += size[key]
+                    overall[event_type][key] += size[key]
+                overall[event_type]["agents"].add(agent)
+        total = sum(size["wire_bytes"] for size in by_type.values())
+        for event_type, size in sorted(by_type.items(), key=lambda x: -x[1]["wire_bytes"]):
+            if not total or size["wire_bytes"] / total < 0.05:
+                continue
+            content += f"| {agent} | {event_type} | {size['count']} | "
+            content += f"{size['wire_bytes'] / total * 100:.0f}% | "
+            content += f"{format_bytes(size['wire_bytes'] / size['count'])} | "
+            content += f"{(size['wire_bytes'] - size['payload_bytes']) / size['count']:.0f} B |\n"
+
+    content += "\n## 🌐 Event Types Across All Agents\n\n"
+    content += "| Event Type | Agents | Events | Total | Avg Event |\n"
+    content += "|------------|--------|--------|-------|-----------|\n"
+    for event_type, size in sorted(overall.items(), key=lambda x: -x[1]["wire_bytes"]):
+        content += f"| {event_type} | {len(size['agents'])} | {size['count']} | "
+        content += f"{format_bytes(size['wire_bytes'])} | {format_bytes(size['wire_bytes'] / size['count'])} |\n"
+
+    with open(output_file, "w") as f:
+        f.write(content)
+
+    print(f"✅ Generated: {output_file}")
+
+
 def generate_summary_report(results, output_file):
     """Generate overall summary report."""
 
@@ -365,18 +538,16 @@ def generate_summary_report(results, output_file):
     content += "## 🏆 Top Performers\n\n"
 
     # Fastest
-    agent_times = {}
-    for agent_name, tests in results.items():
-        successful = [t["metadata"] for t in tests.values() if t["metadata"].get("success")]
-        if successful:
-            times = [m.get("timing", {}).get("total_time_ms", 0) for m in successful]
-            agent_times[agent_name] = median(times) if times else float('inf')
+    ranking = rank_tiers(agent_times(results), level=RANKING_LEVEL)
 
-    if agent_times:
-        top_fast = sorted(agent_times.items(), key=lambda x: x[1])[:5]
+    if ranking:
         content += "**Fastest Agents:**\n"
-        for agent, time in top_fast:
-            content += f"- {agent}: {time:.0f}ms\n"
+        for row in ranking[:5]:
+            content += f"- {row['name']}: {row['median']:.0f}ms "
+            content += f"({RANKING_LEVEL * 100:g}% CI {format_ci(row)}ms, tier {row['tier']})\n"
+        tied = [row["name"] for row in ranking[1:] if row["tier"] == 1]
+        if tied:
+            content += f"\n{ranking[0]['name']} is statistically tied with: {', '.join(tied)}\n"
         content += "\n"
 
     # Best streaming
@@ -453,12 +624,18 @@ def main():
         reports_dir / "BENCHMARK-SUMMARY.md"
     )
 
+    generate_wire_size_report(
+        results,
+        reports_dir / "WIRE-SIZE-ANALYSIS.md"
+    )
+
     print("\n✅ All reports generated successfully!")
     print("\n📋 Generated files:")
     print(f"  - {reports_dir}/EVENT-COVERAGE-MATRIX.md (26 events × agents)")
     print(f"  - {reports_dir}/FRAMEWORK-COMPARISON-MATRIX.md (capabilities)")
     print(f"  - {reports_dir}/EVENT-TYPE-ANALYSIS.md (event breakdown)")
     print(f"  - {reports_dir}/BENCHMARK-SUMMARY.md (overall stats)")
+    print(f"  - {reports_dir}/WIRE-SIZE-ANALYSIS.md (bytes per event type)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,181 @@
+"""
+Client-side measurement noise: GC pauses and event-loop lag.
+
+Every request is timed by the harness's own event loop, so a garbage
+collection of the large event lists or a loop starved by SSE parsing looks
+exactly like agent latency. ``NoiseMonitor`` records both kinds of pause as
+time intervals:
+
+- gc        every collection, via ``gc.callbacks``
+- loop lag  how late a high-frequency ticker woke up (anything that blocked
+            the loop: GC, parsing, JSON decoding, ...)
+
+``measure(start_ns, end_ns)`` returns the pause time that overlapped one
+request, so its latency can be flagged as noisy or corrected. The monitor
+is process-wide (GC callbacks are global); each worker process installs its
+own.
+
+    monitor = install(NoiseMonitor(trace_gc=True, tick_ms=2))
+    monitor.start()
+    ...
+    metrics.noise = current().measure(start_ns, end_ns)
+"""
+
+import asyncio
+import bisect
+import gc
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmark_metrics import ClientNoise
+from histogram import LatencyHistogram
+
+
+# Ticks later than this count as a pause; below it is timer jitter
+MIN_LAG_MS = 1.0
+
+# A request is noisy when client-side pauses cover this share of its total
+# time, or this many milliseconds
+NOISY_SHARE = 0.05
+NOISY_MS = 50.0
+
+GC = "gc"
+LOOP_LAG = "loop_lag"
+
+
+class NoiseMonitor:
+    """Records GC pauses and event-loop lag as (start_ns, end_ns) intervals."""
+
+    def __init__(self, trace_gc: bool = True, tick_ms: float = 0.0):
+        self.trace_gc = trace_gc
+        self.tick_ms = tick_ms
+        # Appended when each pause ends, so both lists are sorted by end time
+        self._ends: List[int] = []
+        self._pauses: List[Tuple[int, int, str]] = []
+        self._longest_ns = 0
+        self._gc_start_ns: Optional[int] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self.gc_pauses = LatencyHistogram()
+        self.gc_by_generation: Dict[int, int] = {}
+        self.loop_lag = LatencyHistogram()  # Every tick, including on-time ones
+        self.frozen = 0
+
+    @property
+    def recording(self) -> bool:
+        return self.trace_gc or self.tick_ms > 0
+
+    # --- recording ---
+
+    def _add(self, start_ns: int, end_ns: int, kind: str):
+        self._ends.append(end_ns)
+        self._pauses.append((start_ns, end_ns, kind))
+        self._longest_ns = max(self._longest_ns, end_ns - start_ns)
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]):
+        now = time.perf_counter_ns()
+        if phase == "start":
+            self._gc_start_ns = now
+        elif self._gc_start_ns is not None:
+            self._add(self._gc_start_ns, now, GC)
+            self.gc_pauses.record((now - self._gc_start_ns) / 1e6)
+            generation = info.get("generation", -1)
+            self.gc_by_generation[generation] = self.gc_by_generation.get(generation, 0) + 1
+            self._gc_start_ns = None
+
+    async def _tick(self):
+        interval_ns = int(self.tick_ms * 1e6)
+        expected = time.perf_counter_ns() + interval_ns
+        while True:
+            await asyncio.sleep(self.tick_ms / 1000)
+            now = time.perf_counter_ns()
+            lag_ms = max(0.0, (now - expected) / 1e6)
+            self.loop_lag.record(lag_ms)
+            if lag_ms >= MIN_LAG_MS:
+                self._add(expected, now, LOOP_LAG)
+            expected = now + interval_ns
+
+    def start(self):
+        """Install the GC callback and start the ticker (needs a running loop)."""
+        if self.trace_gc and self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+        if self.tick_ms > 0 and self._ticker is None:
+            self._ticker = asyncio.get_running_loop().create_task(self._tick())
+
+    async def stop(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+
+    def freeze(self):
+        """Move everything allocated so far out of the collector's reach."""
+        gc.collect()
+        gc.freeze()
+        self.frozen = gc.get_freeze_count()
+
+    # --- queries ---
+
+    def measure(self, start_ns: int, end_ns: int) -> ClientNoise:
+        """Client-side pause time overlapping [start_ns, end_ns]."""
+        noise = ClientNoise()
+        spans = []
+        i = bisect.bisect_right(self._ends, start_ns)
+        while i < len(self._pauses):
+            pause_start, pause_end, kind = self._pauses[i]
+            if pause_end - self._longest_ns > end_ns:
+                break  # Every later pause starts after the request ended
+            i += 1
+            lo, hi = max(pause_start, start_ns), min(pause_end, end_ns)
+            if hi <= lo:
+                continue
+            if kind == GC:
+                noise.gc_ms += (hi - lo) / 1e6
+                noise.gc_collections += 1
+            else:
+                noise.loop_lag_ms += (hi - lo) / 1e6
+            spans.append((lo, hi))
+
+        # A GC pause also delays the ticker; count the time once
+        covered_ns, reach = 0, start_ns
+        for lo, hi in sorted(spans):
+            lo = max(lo, reach)
+            if hi > lo:
+                covered_ns += hi - lo
+                reach = hi
+        noise.pause_ms = covered_ns / 1e6
+
+        total_ms = (end_ns - start_ns) / 1e6
+        noise.noisy = noise.pause_ms >= NOISY_MS or (
+            total_ms > 0 and noise.pause_ms / total_ms >= NOISY_SHARE)
+        return noise
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_gc": self.trace_gc,
+            "tick_ms": self.tick_ms,
+            "frozen_objects": self.frozen,
+            "gc_pause_ms": self.gc_pauses.summary(),
+            "gc_total_ms": self.gc_pauses.total,
+            "gc_by_generation": {str(g): n for g, n in sorted(self.gc_by_generation.items())},
+            "loop_lag_ms": self.loop_lag.summary() if self.tick_ms > 0 else None,
+            "noisy_threshold": {"share": NOISY_SHARE, "ms": NOISY_MS},
+        }
+
+
+_current: Optional[NoiseMonitor] = None
+
+
+def install(monitor: Optional[NoiseMonitor]) -> Optional[NoiseMonitor]:
+    """Make ``monitor`` the process-wide monitor used by ``test_agent``."""
+    global _current
+    _current = monitor
+    return monitor
+
+
+def current() -> Optional[NoiseMonitor]:
+    return _current
@@ -0,0 +1,232 @@
+"""
+Mergeable log-linear latency histograms (HDR-histogram style).
+
+Each power of two is split into equally sized sub-buckets, so every recorded
+value is represented within a fixed relative error (1% by default) whether
+it is a 2ms TTFB or a 40s tool-calling run. Buckets are stored sparsely,
+histograms with the same precision merge by adding counts, and they
+serialize to plain JSON, so percentiles can be recomputed across runs
+without keeping every sample.
+
+    hist = LatencyHistogram()
+    for m in metrics:
+        hist.record(m.total_time_ms)
+    hist.summary()  # count, min, max, mean, p50, p90, p99, p99.9
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+
+DEFAULT_RELATIVE_ERROR = 0.01
+
+SUMMARY_PERCENTILES = (("p50", 50.0), ("p90", 90.0), ("p99", 99.0), ("p99.9", 99.9))
+
+
+class LatencyHistogram:
+    """Log-linear histogram with bounded relative error."""
+
+    __slots__ = ("relative_error", "sub_buckets", "counts", "zero_count",
+                 "count", "total", "min", "max")
+
+    def __init__(self, relative_error: float = DEFAULT_RELATIVE_ERROR):
+        if not 0 < relative_error < 1:
+            raise ValueError(f"relative_error must be in (0, 1), got {relative_error}")
+        self.relative_error = relative_error
+        # Half a bucket width relative to the bucket's lower bound
+        self.sub_buckets = math.ceil(0.5 / relative_error)
+        self.counts: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def from_values(cls, values: Iterable[float],
+                    relative_error: float = DEFAULT_RELATIVE_ERROR) -> "LatencyHistogram":
+        hist = cls(relative_error)
+        for value in values:
+            hist.record(value)
+        return hist
+
+    # --- recording ---
+
+    def _index(self, value: float) -> int:
+        mantissa, exponent = math.frexp(value)  # value = mantissa * 2**exponent, mantissa in [0.5, 1)
+        return (exponent - 1) * self.sub_buckets + int((mantissa * 2 - 1) * self.sub_buckets)
+
+    def _value(self, index: int) -> float:
+        exponent, sub = divmod(index, self.sub_buckets)
+        return math.ldexp(1 + (sub + 0.5) / self.sub_buckets, exponent)
+
+    def record(self, value: Optional[float], count: int = 1):
+        """Add ``count`` occurrences of ``value`` (None and negatives are ignored)."""
+        if value is None or value < 0 or count <= 0:
+            return
+        if value == 0:
+            self.zero_count += count
+        else:
+            index = self._index(value)
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's counts into this one (same precision required)."""
+        if other.sub_buckets != self.sub_buckets:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    # --- queries ---
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Value at percentile ``q`` (0-100), within the relative error."""
+        if not self.count:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 100:
+            return self.max
+
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = self.zero_count
+        if seen >= rank:
+            return 0.0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                # Bucket midpoint, never outside the observed range
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Counts, extremes and the standard percentile set."""
+        stats = {
+            "count": self.count,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "mean": self.mean,
+        }
+        for label, q in SUMMARY_PERCENTILES:
+            stats[label] = self.percentile(q)
+        return stats
+
+    # --- persistence ---
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_error": self.relative_error,
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero_count": self.zero_count,
+            "buckets": {str(index): count for index, count in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        hist = cls(data.get("relative_error", DEFAULT_RELATIVE_ERROR))
+        hist.counts = {int(index): count for index, count in data.get("buckets", {}).items()}
+        hist.zero_count = data.get("zero_count", 0)
+        hist.count = data.get("count", 0)
+        hist.total = data.get("sum", 0.0)
+        if hist.count:
+            hist.min = data["min"]
+            hist.max = data["max"]
+        return hist
+
+    def __repr__(self) -> str:
+        return f"LatencyHistogram(count={self.count}, p50={self.percentile(50):.1f}, max={self.max if self.count else 0:.1f})"
+
+
+def latency_summary(values: Iterable[float]) -> Dict[str, float]:
+    """Histogram summary of a list of latencies."""
+    return LatencyHistogram.from_values(values).summary()
+
+
+class LatencyAggregator:
+    """Histograms of every latency metric, grouped along several dimensions.
+
+    ``groups[dimension][key][metric]``, e.g.
+    ``groups["agent"]["agno-anthropic"]["ttfc_ms"]``. Aggregators from
+    different runs (or worker processes) merge bucket by bucket.
+    """
+
+    METRICS = ("total_ms", "ttfb_ms", "ttfc_ms", "chunk_gap_ms",
+               "tpot_ms", "itl_ms", "output_tokens_per_sec",
+               "run_started_ms", "model_start_ms", "tool_args_ms", "tool_exec_ms",
+               "post_tool_ms", "finish_ms")
+
+    def __init__(self, relative_error: float = DEFAULT_RELATIVE_ERROR):
+        self.relative_error = relative_error
+        self.groups: Dict[str, Dict[str, Dict[str, LatencyHistogram]]] = {}
+
+    def histogram(self, dimension: str, key: str, metric: str) -> LatencyHistogram:
+        metrics = self.groups.setdefault(dimension, {}).setdefault(key, {})
+        hist = metrics.get(metric)
+        if hist is None:
+            hist = metrics[metric] = LatencyHistogram(self.relative_error)
+        return hist
+
+    def record(self, keys: Dict[str, str], metric: str, value: Optional[float]):
+        """Record one value under every ``dimension: key`` pair."""
+        for dimension, key in keys.items():
+            self.histogram(dimension, key, metric).record(value)
+
+    def record_histogram(self, keys: Dict[str, str], metric: str, hist: LatencyHistogram):
+        for dimension, key in keys.items():
+            self.histogram(dimension, key, metric).merge(hist)
+
+    def keys(self, dimension: str) -> List[str]:
+        return sorted(self.groups.get(dimension, {}))
+
+    def summary(self, dimension: str, key: str) -> Dict[str, Dict[str, float]]:
+        """Percentile summary of every metric for one group."""
+        metrics = self.groups.get(dimension, {}).get(key, {})
+        return {metric: metrics[metric].summary() if metric in metrics
+                else LatencyHistogram(self.relative_error).summary()
+                for metric in self.METRICS}
+
+    def summaries(self, dimension: str) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return {key: self.summary(dimension, key) for key in self.keys(dimension)}
+
+    def merge(self, other: "LatencyAggregator") -> "LatencyAggregator":
+        for dimension, keys in other.groups.items():
+            for key, metrics in keys.items():
+                for metric, hist in metrics.items():
+                    self.histogram(dimension, key, metric).merge(hist)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            dimension: {
+                key: {metric: hist.to_dict() for metric, hist in metrics.items()}
+                for key, metrics in keys.items()
+            }
+            for dimension, keys in self.groups.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyAggregator":
+        aggregator = cls()
+        for dimension, keys in data.items():
+            for key, metrics in keys.items():
+                for metric, hist in metrics.items():
+                    aggregator.groups.setdefault(dimension, {}).setdefault(key, {})[metric] = \
+                        LatencyHistogram.from_dict(hist)
+        return aggregator
@@ -0,0 +1,93 @@
+"""
+Connection-phase timing for harness requests via httpx trace hooks.
+
+httpx forwards the ``trace`` request extension to httpcore, which reports
+each phase of a request (``connection.connect_tcp.started``,
+``http11.send_request_headers.complete``, ...). The tracer turns those
+callbacks into a per-request breakdown so that time spent waiting for a
+free pooled connection or opening one is never mistaken for agent latency.
+
+httpcore has no trace point for pool acquisition, so pool wait is the time
+from the start of the request until the first connection or send phase
+begins.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from benchmark_metrics import ConnectionTiming
+
+
+# Matches httpx.Limits defaults
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+
+
+def build_limits(max_connections: Optional[int] = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive: Optional[int] = DEFAULT_MAX_KEEPALIVE,
+                 keepalive_expiry: float = 5.0) -> httpx.Limits:
+    """Connection pool limits for the harness client (0 or None = unlimited)."""
+    return httpx.Limits(
+        max_connections=max_connections or None,
+        max_keepalive_connections=max_keepalive or None,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+class ConnectionTracer:
+    """Collects phase timestamps for one request (pass ``extensions``)."""
+
+    def __init__(self, start_ns: int):
+        self.start_ns = start_ns
+        self.marks: Dict[str, int] = {}
+        self.first_body_ns: Optional[int] = None
+
+    @property
+    def extensions(self) -> Dict[str, Any]:
+        return {"trace": self.trace}
+
+    async def trace(self, event_name: str, info: Dict[str, Any]):
+        # "http11.send_request_headers.complete" -> "send_request_headers.complete"
+        _, _, phase = event_name.partition(".")
+        self.marks.setdefault(phase, time.perf_counter_ns())
+
+    def mark_first_byte(self, arrival_ns: int):
+        if self.first_body_ns is None:
+            self.first_body_ns = arrival_ns
+
+    def _span_ms(self, start: str, end: str) -> float:
+        if start in self.marks and end in self.marks:
+            return (self.marks[end] - self.marks[start]) / 1e6
+        return 0
+
+    def _offset_ms(self, mark: str) -> float:
+        if mark in self.marks:
+            return (self.marks[mark] - self.start_ns) / 1e6
+        return 0
+
+    def timing(self) -> ConnectionTiming:
+        marks = self.marks
+        reused = "connect_tcp.started" not in marks and "connect_unix_socket.started" not in marks
+
+        # First phase httpcore reports once a pooled connection is assigned
+        assigned_ns = None
+        for phase in ("connect_tcp.started", "connect_unix_socket.started",
+                      "send_request_headers.started"):
+            if phase in marks:
+                assigned_ns = marks[phase]
+                break
+
+        return ConnectionTiming(
+            pool_wait_ms=(assigned_ns - self.start_ns) / 1e6 if assigned_ns else 0,
+            connect_ms=self._span_ms("connect_tcp.started", "connect_tcp.complete"),
+            tls_ms=self._span_ms("start_tls.started", "start_tls.complete"),
+            request_write_ms=self._span_ms("send_request_headers.started", "send_request_body.complete"),
+            server_wait_ms=self._span_ms("send_request_body.complete", "receive_response_headers.complete"),
+            time_to_headers_ms=self._offset_ms("receive_response_headers.complete"),
+            time_to_first_byte_ms=(
+                (self.first_body_ns - self.start_ns) / 1e6 if self.first_body_ns else 0
+            ),
+            connection_reused=reused and bool(marks),
+        )
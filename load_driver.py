@@ -0,0 +1,227 @@
+"""
+Multi-process load driver for the AG-UI benchmark harness.
+
+One asyncio loop has to read every socket, decode every SSE frame and JSON
+payload and run the event processors for all concurrent streams. At high
+concurrency that loop becomes the bottleneck and its scheduling delay shows
+up as agent latency. With ``--processes N`` the workload is split across N
+worker processes, each with its own event loop and HTTP client. Workers
+stream each finished result back to the coordinator over a queue, so the
+coordinator prints progress and builds ``summary.json`` exactly as in a
+single-process run.
+
+Sharding:
+
+- benchmark   jobs are grouped by port and the groups spread over workers,
+              so per-agent and per-port limits still hold exactly; global
+              and per-provider limits (and rate limits) are divided between workers
+- open loop   arrivals are dealt round-robin, preserving the combined
+              arrival profile (open-loop, soak and capacity modes)
+- closed loop the sweep's N workers are divided between processes
+
+Worker processes are started with the ``spawn`` method and import
+test_agents themselves, so nothing from the coordinator's event loop is
+inherited.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import queue
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from http_trace import build_limits
+from load_modes import LoadSample, run_closed_loop, run_open_loop
+from scheduler import ScheduleConfig, TestJob, TestScheduler
+
+
+# Seconds allowed for workers to spawn and import before a shared start time
+START_DELAY_S = 3.0
+
+
+def shard_jobs(jobs: List[TestJob], processes: int) -> List[List[TestJob]]:
+    """Split jobs into per-process shards without splitting a port."""
+    by_port: Dict[Any, List[TestJob]] = {}
+    for job in jobs:
+        by_port.setdefault(job.config.get("port"), []).append(job)
+
+    shards: List[List[TestJob]] = [[] for _ in range(processes)]
+    # Largest groups first onto the least loaded shard
+    for group in sorted(by_port.values(), key=len, reverse=True):
+        min(shards, key=len).extend(group)
+    return [shard for shard in shards if shard]
+
+
+def shard_schedule(config: ScheduleConfig, processes: int) -> ScheduleConfig:
+    """Per-process share of the global and per-provider limits."""
+    def share(limit: int) -> int:
+        return math.ceil(limit / processes) if limit > 0 else 0
+    return replace(config, concurrency=share(config.concurrency),
+                   per_provider=share(config.per_provider))
+
+
+# === Worker processes ===
+
+def _client(args) -> httpx.AsyncClient:
+    return httpx.AsyncClient(limits=build_limits(args.max_connections, args.max_keepalive))
+
+
+def _benchmark_worker(worker_id: int, jobs: List[TestJob], schedule: ScheduleConfig,
+                      run_dir: Path, args, processes: int, results: "multiprocessing.Queue"):
+    async def run():
+        import test_agents
+
+        test_agents.start_noise_monitor(args)  # GC callbacks are per process
+        # Jobs are sharded by port, so each agent's timeout streak lives in one worker
+        timeouts = test_agents.timeouts_from_args(args)
+        quarantine = test_agents.Quarantine(args.quarantine_after)
+
+        async with _client(args) as client:
+            async def execute(job: TestJob):
+                return await test_agents.execute_job(client, job, run_dir, timeouts, quarantine)
+
+            def on_result(job: TestJob, result):
+                if isinstance(result, Exception):
+                    result = RuntimeError(str(result))  # Always picklable
+                results.put(("result", (job, result)))
+
+            # Every worker paces its share of each provider's limits
+            rate_limiter = test_agents.rate_limiter_from_args(args, share=processes)
+            await TestScheduler(schedule, rate_limiter).run(jobs, execute, on_result)
+
+    try:
+        asyncio.run(run())
+    finally:
+        results.put(("done", worker_id))
+
+
+def _load_worker(worker_id: int, task: Tuple, name: str, config: dict, args,
+                 start_at: float, results: "multiprocessing.Queue"):
+    async def run():
+        import test_agents
+
+        test_agents.start_noise_monitor(args)
+        async with _client(args) as client:
+            send = test_agents.make_load_sender(client, name, config, args,
+                                                run_prefix=f"{args.mode}-{name}-w{worker_id}")
+            await asyncio.sleep(max(0.0, start_at - time.time()))
+
+            def on_sample(sample: LoadSample):
+                results.put(("result", sample))
+
+            kind = task[0]
+            if kind == "open-loop":
+                await run_open_loop(send, task[1], on_sample=on_sample)
+            elif kind == "closed-loop":
+                for sample in await run_closed_loop(send, task[1], task[2]):
+                    on_sample(sample)
+
+    try:
+        asyncio.run(run())
+    finally:
+        results.put(("done", worker_id))
+
+
+# === Coordinator ===
+
+async def _coordinate(target: Callable, worker_args: List[Tuple],
+                      on_message: Callable[[Any], None]):
+    """Start one process per entry of ``worker_args`` and feed every result
+    message to ``on_message`` until all workers have finished."""
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=target, args=(i, *a, results), daemon=True)
+             for i, a in enumerate(worker_args)]
+    for proc in procs:
+        proc.start()
+
+    def next_message():
+        try:
+            return results.get(timeout=1.0)
+        except queue.Empty:
+            return None
+
+    loop = asyncio.get_running_loop()
+    finished = set()
+    while len(finished) < len(procs):
+        message = await loop.run_in_executor(None, next_message)
+        if message is None:
+            for i, proc in enumerate(procs):
+                if i not in finished and not proc.is_alive() and results.empty():
+                    print(f"  ⚠️  Worker {i} exited with code {proc.exitcode} before finishing")
+                    finished.add(i)
+            continue
+        kind, payload = message
+        if kind == "done":
+            finished.add(payload)
+        else:
+            on_message(payload)
+
+    for proc in procs:
+        proc.join(timeout=5)
+
+
+async def run_jobs_sharded(jobs: List[TestJob], schedule: ScheduleConfig, run_dir: Path,
+                           args, on_result: Callable[[TestJob, Any], None]):
+    """Run benchmark jobs across ``args.processes`` worker processes."""
+    shards = shard_jobs(jobs, args.processes)
+    worker_schedule = shard_schedule(schedule, len(shards))
+    print(f"   Driver: {len(shards)} worker processes "
+          f"({', '.join(str(len(s)) for s in shards)} tests)")
+
+    await _coordinate(
+        _benchmark_worker,
+        [(shard, worker_schedule, run_dir, args, len(shards)) for shard in shards],
+        lambda payload: on_result(*payload),
+    )
+
+
+async def run_open_loop_sharded(args, name: str, config: dict, arrivals: List[float],
+                                on_sample: Optional[Callable[[LoadSample], None]] = None
+                                ) -> List[LoadSample]:
+    """Open-loop arrivals dealt round-robin across worker processes."""
+    processes = max(1, min(args.processes, len(arrivals)))
+    start_at = time.time() + START_DELAY_S
+    samples: List[LoadSample] = []
+
+    def collect(sample: LoadSample):
+        samples.append(sample)
+        if on_sample:
+            on_sample(sample)
+
+    await _coordinate(
+        _load_worker,
+        [(("open-loop", arrivals[i::processes]), name, config, args, start_at)
+         for i in range(processes)],
+        collect,
+    )
+    return _renumber(samples)
+
+
+async def run_closed_loop_sharded(args, name: str, config: dict, workers: int,
+                                  duration: float) -> List[LoadSample]:
+    """Closed-loop workers divided between worker processes."""
+    processes = max(1, min(args.processes, workers))
+    start_at = time.time() + START_DELAY_S
+    samples: List[LoadSample] = []
+    await _coordinate(
+        _load_worker,
+        [(("closed-loop", workers // processes + (1 if i < workers % processes else 0), duration),
+          name, config, args, start_at)
+         for i in range(processes)],
+        samples.append,
+    )
+    return _renumber(samples)
+
+
+def _renumber(samples: List[LoadSample]) -> List[LoadSample]:
+    # Each worker numbers its own requests; order the merged set by send time
+    samples.sort(key=lambda s: s.intended_s)
+    for seq, sample in enumerate(samples):
+        sample.seq = seq
+    return samples
@@ -0,0 +1,1279 @@
+"""
+Load-generation modes for the AG-UI benchmark harness.
+
+The default benchmark runs a fixed batch of tests. The modes in this module
+drive a single agent endpoint with a workload instead and report how its
+latency behaves under that load:
+
+- ``open-loop``  requests issued on a schedule (constant, Poisson, step or
+                 burst arrivals), independent of completions
+- ``sweep``      closed loop: N workers each sending back-to-back requests,
+                 for every N on a concurrency ladder, to find the knee
+- ``capacity``   binary search for the highest open-loop rate that still
+                 meets a latency / error-rate SLO
+- ``soak``       fixed moderate open-loop load for hours, streamed to a
+                 windowed time series and tested for early-vs-late drift
+- ``sessions``   virtual users holding multi-turn conversations on their
+                 own thread_id, with think time between turns
+- ``history``    conversations of 1..N turns sent back to back, with
+                 latency fitted against history length
+- ``ab``         paired comparison of two agents, requests interleaved in
+                 randomized order, with bootstrap CIs on the differences
+
+Each mode receives a ``send(seq, messages=None, thread_id=None)`` coroutine
+factory from test_agents.py, which performs one streamed AG-UI request
+(the configured prompt, or the given conversation history) and returns its
+TestMetrics, so this module stays free of HTTP and agent configuration
+details.
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from benchmark_metrics import TestMetrics
+from benchmark_stats import (
+    bootstrap_ci, linear_fit, mann_whitney_u, percentile, sign_test, two_proportion_z,
+)
+from histogram import latency_summary
+
+
+SendFn = Callable[..., Awaitable[TestMetrics]]
+SenderFactory = Callable[[str], SendFn]
+
+ARRIVAL_PROFILES = ("constant", "poisson", "step", "burst")
+
+
+@dataclass
+class LoadSample:
+    """Outcome of one request issued by a load mode."""
+    seq: int
+    intended_s: float  # Intended send time, seconds since the load started
+    start_lag_ms: float  # How late the request actually started
+    completed_s: float
+    success: bool
+    ttfb_ms: Optional[float] = None
+    ttfc_ms: Optional[float] = None
+    total_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+def latency_stats(values: List[float]) -> Dict[str, float]:
+    """Percentile summary used in every load-mode report."""
+    return latency_summary(values)
+
+
+# === Arrival schedules ===
+
+def parse_step_profile(spec: str) -> List[tuple]:
+    """Parse "10:1,10:2,20:4" into [(seconds, rps), ...]."""
+    steps = []
+    for part in spec.split(","):
+        duration, _, rate = part.partition(":")
+        steps.append((float(duration), float(rate)))
+    return steps
+
+
+def arrival_times(profile: str, rate: float, duration: float,
+                  seed: Optional[int] = None, steps: Optional[List[tuple]] = None,
+                  burst_size: int = 10, burst_every: float = 10.0) -> Iterator[float]:
+    """Yield intended send offsets (seconds) for an arrival profile."""
+    rng = random.Random(seed)
+
+    if profile == "constant":
+        if rate <= 0:
+            return
+        interval = 1.0 / rate
+        t = 0.0
+        while t < duration:
+            yield t
+            t += interval
+
+    elif profile == "poisson":
+        if rate <= 0:
+            return
+        t = rng.expovariate(rate)
+        while t < duration:
+            yield t
+            t += rng.expovariate(rate)
+
+    elif profile == "step":
+        start = 0.0
+        for step_duration, step_rate in steps or [(duration, rate)]:
+            if step_rate > 0:
+                interval = 1.0 / step_rate
+                t = start
+                while t < start + step_duration:
+                    yield t
+                    t += interval
+            start += step_duration
+
+    elif profile == "burst":
+        # Constant background rate plus burst_size simultaneous requests
+        # every burst_every seconds
+        background = list(arrival_times("constant", rate, duration))
+        bursts = []
+        t = burst_every
+        while t < duration:
+            bursts.extend([t] * burst_size)
+            t += burst_every
+        yield from sorted(background + bursts)
+
+    else:
+        raise ValueError(f"Unknown arrival profile: {profile}")
+
+
+def arrivals_from_args(args: argparse.Namespace, rate: Optional[float] = None,
+                       duration: Optional[float] = None) -> Tuple[List[float], float]:
+    """Arrival offsets and total duration for the command-line profile."""
+    rate = rate if rate is not None else args.rate
+    duration = duration if duration is not None else args.duration
+    steps = parse_step_profile(args.steps) if args.steps else None
+    if args.arrival == "step" and steps:
+        duration = sum(d for d, _ in steps)
+    arrivals = list(arrival_times(
+        args.arrival, rate, duration,
+        seed=args.seed,
+        steps=steps,
+        burst_size=args.burst_size,
+        burst_every=args.burst_every,
+    ))
+    return arrivals, duration
+
+
+# === Open loop ===
+
+def _sample_from_metrics(seq: int, intended_s: float, lag_ms: float, completed_s: float,
+                         metrics: Optional[TestMetrics], error: Optional[str] = None) -> LoadSample:
+    if metrics is None:
+        return LoadSample(seq=seq, intended_s=intended_s, start_lag_ms=lag_ms,
+                          completed_s=completed_s, success=False, error=error)
+
+    # Latencies are measured from the intended send time, so a request that
+    # had to wait behind a stalled dispatcher is not reported as fast
+    # (coordinated-omission correction)
+    def corrected(value: float) -> Optional[float]:
+        return value + lag_ms if value else None
+
+    return LoadSample(
+        seq=seq,
+        intended_s=intended_s,
+        start_lag_ms=lag_ms,
+        completed_s=completed_s,
+        success=metrics.success,
+        ttfb_ms=corrected(metrics.time_to_first_event_ms),
+        ttfc_ms=corrected(metrics.time_to_first_content_ms),
+        total_ms=metrics.total_time_ms + lag_ms,
+        error=metrics.error,
+    )
+
+
+async def run_open_loop(send: SendFn, arrivals: List[float],
+                        on_sample: Optional[Callable[[LoadSample], None]] = None
+                        ) -> List[LoadSample]:
+    """Issue one request per intended arrival time, never waiting for completions."""
+    samples: List[LoadSample] = []
+    t0 = time.perf_counter_ns()
+
+    async def fire(seq: int, intended_ns: int):
+        lag_ms = (time.perf_counter_ns() - intended_ns) / 1e6
+        intended_s = (intended_ns - t0) / 1e9
+        try:
+            metrics = await send(seq)
+            error = None
+        except Exception as e:
+            metrics, error = None, str(e)
+        completed_s = (time.perf_counter_ns() - t0) / 1e9
+        sample = _sample_from_metrics(seq, intended_s, lag_ms, completed_s, metrics, error)
+        samples.append(sample)
+        if on_sample:
+            on_sample(sample)
+
+    tasks = []
+    for seq, offset_s in enumerate(arrivals):
+        intended_ns = t0 + int(offset_s * 1e9)
+        delay = (intended_ns - time.perf_counter_ns()) / 1e9
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(fire(seq, intended_ns)))
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    samples.sort(key=lambda s: s.seq)
+    return samples
+
+
+async def drive_open_loop(args: argparse.Namespace, name: str, config: dict,
+                          make_sender: SenderFactory, arrivals: List[float],
+                          on_sample: Optional[Callable[[LoadSample], None]] = None
+                          ) -> List[LoadSample]:
+    """Run an open-loop schedule in this process or across --processes workers."""
+    if getattr(args, "processes", 1) > 1:
+        from load_driver import run_open_loop_sharded
+        return await run_open_loop_sharded(args, name, config, arrivals, on_sample)
+    return await run_open_loop(make_sender(name), arrivals, on_sample=on_sample)
+
+
+def summarize_samples(samples: List[LoadSample], duration_s: float) -> Dict[str, Any]:
+    """Offered/achieved rate, error rate and latency percentiles."""
+    ok = [s for s in samples if s.success]
+    errors = len(samples) - len(ok)
+    span_s = max([s.completed_s for s in samples], default=0.0)
+    return {
+        "requests": len(samples),
+        "successful": len(ok),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "offered_rps": len(samples) / duration_s if duration_s > 0 else 0.0,
+        "achieved_rps": len(ok) / span_s if span_s > 0 else 0.0,
+        "max_start_lag_ms": max([s.start_lag_ms for s in samples], default=0.0),
+        "ttfb_ms": latency_stats([s.ttfb_ms for s in ok if s.ttfb_ms is not None]),
+        "ttfc_ms": latency_stats([s.ttfc_ms for s in ok if s.ttfc_ms is not None]),
+        "total_ms": latency_stats([s.total_ms for s in ok if s.total_ms is not None]),
+    }
+
+
+def summarize_windows(samples: List[LoadSample], window_s: float) -> List[Dict[str, Any]]:
+    """Per-window statistics; requests are bucketed by intended send time,
+    throughput by completion time."""
+    if not samples or window_s <= 0:
+        return []
+
+    count = int(max(s.completed_s for s in samples) // window_s) + 1
+    by_window: List[List[LoadSample]] = [[] for _ in range(count)]
+    completions = [0] * count
+    for s in samples:
+        by_window[min(int(s.intended_s // window_s), count - 1)].append(s)
+        if s.success:
+            completions[min(int(s.completed_s // window_s), count - 1)] += 1
+
+    windows = []
+    for i, bucket in enumerate(by_window):
+        ok = [s for s in bucket if s.success]
+        windows.append({
+            "start_s": i * window_s,
+            "sent": len(bucket),
+            "errors": len(bucket) - len(ok),
+            "error_rate": (len(bucket) - len(ok)) / len(bucket) if bucket else 0.0,
+            "throughput_rps": completions[i] / window_s,
+            "ttfb_ms": latency_stats([s.ttfb_ms for s in ok if s.ttfb_ms is not None]),
+            "ttfc_ms": latency_stats([s.ttfc_ms for s in ok if s.ttfc_ms is not None]),
+            "total_ms": latency_stats([s.total_ms for s in ok if s.total_ms is not None]),
+        })
+    return windows
+
+
+def print_open_loop_report(agent: str, summary: Dict[str, Any], windows: List[Dict[str, Any]]):
+    print(f"\n{'─' * 100}")
+    print(f"🌊 OPEN LOOP: {agent}")
+    print(f"{'─' * 100}")
+    print(f"  Offered: {summary['offered_rps']:.2f} req/s   Achieved: {summary['achieved_rps']:.2f} req/s   "
+          f"Errors: {summary['errors']}/{summary['requests']} ({summary['error_rate'] * 100:.1f}%)")
+    for label, key in (("TTFB", "ttfb_ms"), ("TTFC", "ttfc_ms"), ("Total", "total_ms")):
+        stats = summary[key]
+        print(f"  {label:<6} p50 {stats['p50']:>7.0f}ms  p90 {stats['p90']:>7.0f}ms  "
+              f"p99 {stats['p99']:>7.0f}ms  max {stats['max']:>7.0f}ms")
+
+    print(f"\n  {'Window':<10} {'Sent':<6} {'Err':<5} {'Thru':<8} {'TTFC p50':<10} {'TTFC p99':<10} {'Total p99':<10}")
+    print(f"  {'-' * 65}")
+    for w in windows:
+        print(f"  {w['start_s']:>6.0f}s   {w['sent']:<6} {w['errors']:<5} {w['throughput_rps']:>5.2f}/s "
+              f"{w['ttfc_ms']['p50']:>7.0f}ms  {w['ttfc_ms']['p99']:>7.0f}ms  {w['total_ms']['p99']:>7.0f}ms")
+
+
+def _save_json(path: Path, data: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+async def run_open_loop_mode(args: argparse.Namespace, agents: Dict[str, dict],
+                             make_sender: SenderFactory, run_dir: Path) -> Dict[str, Any]:
+    """Drive each selected agent in turn with the configured arrival profile."""
+    results = {}
+    for name in agents:
+        arrivals, duration = arrivals_from_args(args)
+        print(f"\n🌊 {name}: {len(arrivals)} requests, {args.arrival} arrivals over {duration:.0f}s")
+
+        samples = await drive_open_loop(args, name, agents[name], make_sender, arrivals)
+        summary = summarize_samples(samples, duration)
+        windows = summarize_windows(samples, args.window)
+        print_open_loop_report(name, summary, windows)
+
+        results[name] = summary
+        _save_json(run_dir / "open-loop" / f"{name}.json", {
+            "agent": name,
+            "arrival": args.arrival,
+            "rate": args.rate,
+            "duration_s": duration,
+            "window_s": args.window,
+            "summary": summary,
+            "windows": windows,
+            "samples": [asdict(s) for s in samples],
+        })
+    return results
+
+
+# === Closed-loop concurrency sweep ===
+
+def parse_ladder(spec: str) -> List[int]:
+    """Parse "1,2,4,8" (or "1-256" for powers of two) into concurrency levels."""
+    if "-" in spec and "," not in spec:
+        low, _, high = spec.partition("-")
+        levels, n = [], int(low)
+        while n <= int(high):
+            levels.append(n)
+            n *= 2
+        return levels
+    return [int(part) for part in spec.split(",") if part.strip()]
+
+
+async def run_closed_loop(send: SendFn, workers: int, duration: float,
+                          seq_start: int = 0) -> List[LoadSample]:
+    """Run ``workers`` loops that each send the next request as soon as the
+    previous one finishes, until ``duration`` seconds have elapsed."""
+    samples: List[LoadSample] = []
+    t0 = time.perf_counter_ns()
+    deadline_ns = t0 + int(duration * 1e9)
+    seq = seq_start
+
+    async def worker():
+        nonlocal seq
+        while time.perf_counter_ns() < deadline_ns:
+            my_seq = seq
+            seq += 1
+            sent_s = (time.perf_counter_ns() - t0) / 1e9
+            try:
+                metrics, error = await send(my_seq), None
+            except Exception as e:
+                metrics, error = None, str(e)
+            completed_s = (time.perf_counter_ns() - t0) / 1e9
+            samples.append(_sample_from_metrics(my_seq, sent_s, 0.0, completed_s, metrics, error))
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    samples.sort(key=lambda s: s.seq)
+    return samples
+
+
+def find_knee(steps: List[Dict[str, Any]], min_efficiency: float = 0.25,
+              p99_factor: float = 2.0) -> Optional[int]:
+    """Concurrency after which the agent stops scaling.
+
+    A step is past the knee when doubling (or otherwise growing) concurrency
+    returns less than ``min_efficiency`` of the ideal throughput gain while
+    p99 total latency has grown by ``p99_factor`` over the best p99 seen so
+    far. The knee is the last concurrency level before that step.
+    """
+    best_p99 = None
+    for prev, step in zip(steps, steps[1:]):
+        p99 = prev["total_ms"]["p99"]
+        if p99 > 0:
+            best_p99 = p99 if best_p99 is None else min(best_p99, p99)
+
+        prev_rps = prev["achieved_rps"]
+        growth = step["concurrency"] / prev["concurrency"] - 1
+        if prev_rps <= 0 or growth <= 0:
+            continue
+        efficiency = (step["achieved_rps"] - prev_rps) / (prev_rps * growth)
+        p99_blowup = best_p99 is not None and step["total_ms"]["p99"] > p99_factor * best_p99
+        if (efficiency < min_efficiency and p99_blowup) or step["error_rate"] > 0.5:
+            return prev["concurrency"]
+    return None
+
+
+def print_sweep_report(agent: str, steps: List[Dict[str, Any]], knee: Optional[int]):
+    print(f"\n{'─' * 100}")
+    print(f"📈 CONCURRENCY SWEEP: {agent}")
+    print(f"{'─' * 100}")
+    print(f"  {'Workers':<9} {'Reqs':<6} {'Err':<5} {'Thru':<10} {'TTFC p50':<10} {'TTFC p99':<10} "
+          f"{'Total p50':<10} {'Total p99':<10}")
+    print(f"  {'-' * 75}")
+    for step in steps:
+        marker = "  ◀ knee" if step["concurrency"] == knee else ""
+        print(f"  {step['concurrency']:<9} {step['requests']:<6} {step['errors']:<5} "
+              f"{step['achieved_rps']:>6.2f}/s  {step['ttfc_ms']['p50']:>7.0f}ms  "
+              f"{step['ttfc_ms']['p99']:>7.0f}ms  {step['total_ms']['p50']:>7.0f}ms  "
+              f"{step['total_ms']['p99']:>7.0f}ms{marker}")
+    if knee is None:
+        print("\n  No knee found: throughput kept scaling across the ladder")
+    else:
+        print(f"\n  Knee at {knee} concurrent requests")
+
+
+async def run_sweep_mode(args: argparse.Namespace, agents: Dict[str, dict],
+                         make_sender: SenderFactory, run_dir: Path) -> Dict[str, Any]:
+    """Closed-loop sweep over the concurrency ladder for each selected agent."""
+    ladder = parse_ladder(args.ladder)
+    max_connections = getattr(args, "max_connections", 0)
+    if max_connections and max(ladder) > max_connections:
+        print(f"⚠️  Ladder goes up to {max(ladder)} workers but the client pool allows "
+              f"{max_connections} connections; raise --max-connections to avoid measuring pool waits")
+    results = {}
+    for name in agents:
+        send = make_sender(name)
+        print(f"\n📈 {name}: concurrency {ladder}, {args.step_duration:.0f}s per step")
+
+        steps, seq = [], 0
+        for workers in ladder:
+            if getattr(args, "processes", 1) > 1:
+                from load_driver import run_closed_loop_sharded
+                samples = await run_closed_loop_sharded(args, name, agents[name], workers,
+                                                        args.step_duration)
+            else:
+                samples = await run_closed_loop(send, workers, args.step_duration, seq_start=seq)
+            seq += len(samples)
+            step = {"concurrency": workers, **summarize_samples(samples, args.step_duration)}
+            steps.append(step)
+            print(f"   {workers:>4} workers: {step['achieved_rps']:.2f} req/s, "
+                  f"p99 {step['total_ms']['p99']:.0f}ms, {step['errors']} errors")
+            if step["requests"] and step["error_rate"] >= args.abort_error_rate:
+                print(f"   ⚠️  Stopping sweep: error rate {step['error_rate'] * 100:.0f}%")
+                break
+
+        knee = find_knee(steps)
+        print_sweep_report(name, steps, knee)
+        results[name] = {"knee_concurrency": knee, "steps": steps}
+        _save_json(run_dir / "sweep" / f"{name}.json", {
+            "agent": name,
+            "ladder": ladder,
+            "step_duration_s": args.step_duration,
+            "knee_concurrency": knee,
+            "steps": steps,
+        })
+    return results
+
+
+# === SLO capacity finder ===
+
+SLO_METRICS = {"ttfb": "ttfb_ms", "ttfc": "ttfc_ms", "total": "total_ms"}
+
+
+@dataclass
+class SLO:
+    """Latency percentile bound plus maximum error rate."""
+    metric: str = "ttfc"
+    percentile: float = 95.0
+    threshold_ms: float = 2000.0
+    max_error_rate: float = 0.01
+
+    def describe(self) -> str:
+        return (f"p{self.percentile:g} {self.metric.upper()} < {self.threshold_ms:.0f}ms, "
+                f"errors < {self.max_error_rate * 100:g}%")
+
+    def evaluate(self, samples: List[LoadSample], offered_rps: float,
+                 min_throughput_ratio: float = 0.9) -> Dict[str, Any]:
+        """Check one trial against the SLO."""
+        field = SLO_METRICS[self.metric]
+        ok = [s for s in samples if s.success]
+        values = [getattr(s, field) for s in ok if getattr(s, field) is not None]
+        errors = len(samples) - len(ok)
+        error_rate = errors / len(samples) if samples else 1.0
+        latency = percentile(values, self.percentile) if values else float("inf")
+        span_s = max([s.completed_s for s in samples], default=0.0)
+        achieved = len(ok) / span_s if span_s > 0 else 0.0
+
+        # Keeping up matters as much as latency: an agent that only completes
+        # half the offered load is not sustaining that rate
+        keeping_up = achieved >= min_throughput_ratio * offered_rps
+        return {
+            "offered_rps": offered_rps,
+            "achieved_rps": achieved,
+            "requests": len(samples),
+            "error_rate": error_rate,
+            "latency_ms": latency if values else None,
+            "passed": latency < self.threshold_ms and error_rate < self.max_error_rate and keeping_up,
+        }
+
+
+async def find_capacity(drive: Callable[[List[float]], Awaitable[List[LoadSample]]],
+                        slo: SLO, start_rps: float, max_rps: float,
+                        trial_duration: float, precision: float = 0.1,
+                        arrival: str = "constant", seed: Optional[int] = None) -> Dict[str, Any]:
+    """Highest sustained rate meeting ``slo``: double until a trial fails,
+    then bisect between the last passing and first failing rate until they
+    are within ``precision`` (relative) of each other. ``drive`` runs one
+    open-loop trial over the given arrival offsets."""
+    trials: List[Dict[str, Any]] = []
+    seq = 0
+
+    async def trial(rate: float) -> bool:
+        nonlocal seq
+        arrivals = list(arrival_times(arrival, rate, trial_duration, seed=seed))
+        samples = await drive(arrivals)
+        for s in samples:
+            s.seq += seq
+        seq += len(samples)
+        result = slo.evaluate(samples, rate)
+        trials.append(result)
+        verdict = "✅ meets SLO" if result["passed"] else "❌ violates SLO"
+        latency = f"{result['latency_ms']:.0f}ms" if result["latency_ms"] is not None else "n/a"
+        print(f"   {rate:>7.2f} req/s: p{slo.percentile:g} {slo.metric} {latency}, "
+              f"errors {result['error_rate'] * 100:.1f}%, achieved {result['achieved_rps']:.2f} req/s  {verdict}")
+        return result["passed"]
+
+    low, high = 0.0, None
+    rate = min(start_rps, max_rps)
+    while True:
+        if not await trial(rate):
+            high = rate
+            break
+        low = rate
+        if rate >= max_rps:
+            break
+        rate = min(rate * 2, max_rps)
+
+    if high is None:
+        # Never failed within the search range
+        return {"max_sustained_rps": low, "bounded": False, "trials": trials}
+
+    if low == 0.0:
+        # Failed at the starting rate; search downward
+        low_bound = start_rps / 16
+        if not await trial(low_bound):
+            return {"max_sustained_rps": 0.0, "bounded": True, "trials": trials}
+        low = low_bound
+
+    while (high - low) / high > precision:
+        mid = (low + high) / 2
+        if await trial(mid):
+            low = mid
+        else:
+            high = mid
+
+    return {"max_sustained_rps": low, "bounded": True, "trials": trials}
+
+
+async def run_capacity_mode(args: argparse.Namespace, agents: Dict[str, dict],
+                            make_sender: SenderFactory, run_dir: Path) -> Dict[str, Any]:
+    """Find the maximum SLO-compliant request rate of each selected agent."""
+    slo = SLO(metric=args.slo_metric, percentile=args.slo_percentile,
+              threshold_ms=args.slo_ms, max_error_rate=args.slo_error_rate)
+    results = {}
+    for name in agents:
+        print(f"\n🎯 {name}: searching for max rate with {slo.describe()}")
+        async def drive(arrivals: List[float]) -> List[LoadSample]:
+            return await drive_open_loop(args, name, agents[name], make_sender, arrivals)
+
+        found = await find_capacity(
+            drive, slo,
+            start_rps=args.rate,
+            max_rps=args.max_rate,
+            trial_duration=args.duration,
+            precision=args.precision,
+            arrival=args.arrival if args.arrival in ("constant", "poisson") else "constant",
+            seed=args.seed,
+        )
+        limit = "" if found["bounded"] else f" (never violated up to {args.max_rate:g} req/s)"
+        print(f"   ➜ Max sustained rate: {found['max_sustained_rps']:.2f} req/s{limit}")
+
+        results[name] = {"slo": asdict(slo), **found}
+        _save_json(run_dir / "capacity" / f"{name}.json", {"agent": name, **results[name]})
+
+    print(f"\n{'─' * 100}")
+    print(f"🎯 CAPACITY ({slo.describe()})")
+    print(f"{'─' * 100}")
+    for name, result in sorted(results.items(), key=lambda x: -x[1]["max_sustained_rps"]):
+        bound = "" if result["bounded"] else "+"
+        print(f"  {name:<30} {result['max_sustained_rps']:>8.2f}{bound} req/s")
+    return results
+
+
+# === Soak ===
+
+TIMESERIES_FIELDS = (
+    "window", "start_s", "completed", "errors", "error_rate", "throughput_rps",
+    "ttfb_p50_ms", "ttfb_p99_ms",
+    "ttfc_p50_ms", "ttfc_p90_ms", "ttfc_p99_ms",
+    "total_p50_ms", "total_p90_ms", "total_p99_ms", "total_max_ms",
+)
+
+
+class TimeSeriesWriter:
+    """Buckets samples by completion time and appends one CSV row per window
+    once a later window has started completing, so hours of soak never sit
+    only in memory."""
+
+    def __init__(self, path: Path, window_s: float):
+        self.path = path
+        self.window_s = window_s
+        self.pending: Dict[int, List[LoadSample]] = {}
+        self.next_window = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=TIMESERIES_FIELDS)
+        self._writer.writeheader()
+
+    def add(self, sample: LoadSample):
+        # A straggler for an already written window lands in the next one
+        window = max(int(sample.completed_s // self.window_s), self.next_window)
+        self.pending.setdefault(window, []).append(sample)
+        # One window of grace for results still in flight from other workers
+        self.flush_until(sample.completed_s - self.window_s)
+
+    def flush_until(self, elapsed_s: float):
+        """Write every window that ended before ``elapsed_s``."""
+        while (self.next_window + 1) * self.window_s <= elapsed_s:
+            self._write(self.next_window, self.pending.pop(self.next_window, []))
+            self.next_window += 1
+
+    def close(self):
+        """Write the remaining windows, including the partial last one."""
+        last = max(self.pending, default=self.next_window - 1)
+        while self.next_window <= last:
+            self._write(self.next_window, self.pending.pop(self.next_window, []))
+            self.next_window += 1
+        self._file.close()
+
+    def _write(self, window: int, samples: List[LoadSample]):
+        ok = [s for s in samples if s.success]
+        ttfb = [s.ttfb_ms for s in ok if s.ttfb_ms is not None]
+        ttfc = [s.ttfc_ms for s in ok if s.ttfc_ms is not None]
+        total = [s.total_ms for s in ok if s.total_ms is not None]
+        errors = len(samples) - len(ok)
+        self._writer.writerow({
+            "window": window,
+            "start_s": round(window * self.window_s, 3),
+            "completed": len(samples),
+            "errors": errors,
+            "error_rate": round(errors / len(samples), 4) if samples else 0,
+            "throughput_rps": round(len(ok) / self.window_s, 3),
+            "ttfb_p50_ms": round(percentile(ttfb, 50), 1),
+            "ttfb_p99_ms": round(percentile(ttfb, 99), 1),
+            "ttfc_p50_ms": round(percentile(ttfc, 50), 1),
+            "ttfc_p90_ms": round(percentile(ttfc, 90), 1),
+            "ttfc_p99_ms": round(percentile(ttfc, 99), 1),
+            "total_p50_ms": round(percentile(total, 50), 1),
+            "total_p90_ms": round(percentile(total, 90), 1),
+            "total_p99_ms": round(percentile(total, 99), 1),
+            "total_max_ms": round(max(total), 1) if total else 0,
+        })
+        self._file.flush()
+
+
+def detect_drift(samples: List[LoadSample], duration_s: float, fraction: float = 0.2,
+                 alpha: float = 0.01, min_change: float = 0.1) -> Dict[str, Any]:
+    """Compare the first and last ``fraction`` of the soak.
+
+    Latency drift is flagged when a Mann-Whitney U test rejects "same
+    distribution" at ``alpha`` and the median moved by at least
+    ``min_change`` (relative), so a statistically significant but
+    negligible shift on a large sample is not reported. Error-rate drift
+    uses a two-proportion z test. Both directions are flagged.
+    """
+    cutoff = duration_s * fraction
+    early = [s for s in samples if s.completed_s < cutoff]
+    late = [s for s in samples if s.completed_s >= duration_s - cutoff]
+
+    result: Dict[str, Any] = {
+        "fraction": fraction,
+        "alpha": alpha,
+        "min_change": min_change,
+        "early_requests": len(early),
+        "late_requests": len(late),
+    }
+    flagged = []
+    for key in ("ttfb_ms", "ttfc_ms", "total_ms"):
+        a = [getattr(s, key) for s in early if s.success and getattr(s, key) is not None]
+        b = [getattr(s, key) for s in late if s.success and getattr(s, key) is not None]
+        test = mann_whitney_u(a, b)
+        early_p50, late_p50 = percentile(a, 50), percentile(b, 50)
+        change = (late_p50 - early_p50) / early_p50 if early_p50 > 0 else 0.0
+        drifted = bool(a and b) and test["p_value"] < alpha and abs(change) >= min_change
+        result[key] = {
+            "early_p50": early_p50,
+            "late_p50": late_p50,
+            "early_p99": percentile(a, 99),
+            "late_p99": percentile(b, 99),
+            "relative_change": change,
+            "p_value": test["p_value"],
+            "drift": drifted,
+        }
+        if drifted:
+            flagged.append(key)
+
+    early_errors = sum(1 for s in early if not s.success)
+    late_errors = sum(1 for s in late if not s.success)
+    test = two_proportion_z(early_errors, len(early), late_errors, len(late))
+    drifted = test["p_value"] < alpha
+    result["error_rate"] = {
+        "early": early_errors / len(early) if early else 0.0,
+        "late": late_errors / len(late) if late else 0.0,
+        "p_value": test["p_value"],
+        "drift": drifted,
+    }
+    if drifted:
+        flagged.append("error_rate")
+
+    result["drift_detected"] = bool(flagged)
+    result["flagged"] = flagged
+    return result
+
+
+def print_drift_report(agent: str, drift: Dict[str, Any]):
+    print(f"\n{'─' * 100}")
+    print(f"⏳ SOAK DRIFT: {agent} (first vs last {drift['fraction'] * 100:.0f}%, "
+          f"{drift['early_requests']} vs {drift['late_requests']} requests)")
+    print(f"{'─' * 100}")
+    for label, key in (("TTFB", "ttfb_ms"), ("TTFC", "ttfc_ms"), ("Total", "total_ms")):
+        d = drift[key]
+        flag = "⚠️  DRIFT" if d["drift"] else "ok"
+        print(f"  {label:<6} p50 {d['early_p50']:>7.0f}ms → {d['late_p50']:>7.0f}ms "
+              f"({d['relative_change'] * 100:+.0f}%)  p={d['p_value']:.3g}  {flag}")
+    d = drift["error_rate"]
+    flag = "⚠️  DRIFT" if d["drift"] else "ok"
+    print(f"  Errors {d['early'] * 100:>6.1f}% → {d['late'] * 100:>6.1f}%  p={d['p_value']:.3g}  {flag}")
+
+
+async def run_soak_mode(args: argparse.Namespace, agents: Dict[str, dict],
+                        make_sender: SenderFactory, run_dir: Path) -> Dict[str, Any]:
+    """Fixed open-loop load per agent with a streamed time series and drift test."""
+    results = {}
+    for name in agents:
+        arrivals, duration = arrivals_from_args(args)
+        print(f"\n⏳ {name}: soaking at {args.rate:g} req/s ({args.arrival}) for "
+              f"{duration / 3600:.2f}h, {args.window:g}s windows")
+
+        series_path = run_dir / "soak" / f"{name}.csv"
+        series = TimeSeriesWriter(series_path, args.window)
+        try:
+            samples = await drive_open_loop(args, name, agents[name], make_sender,
+                                            arrivals, on_sample=series.add)
+        finally:
+            series.close()
+
+        summary = summarize_samples(samples, duration)
+        drift = detect_drift(samples, duration, fraction=args.drift_fraction,
+                             alpha=args.drift_alpha, min_change=args.drift_min_change)
+        print_drift_report(name, drift)
+
+        results[name] = {
+            "rate": args.rate,
+            "duration_s": duration,
+            "window_s": args.window,
+            "timeseries": str(series_path.relative_to(run_dir)),
+            "summary": summary,
+            "drift": drift,
+        }
+        _save_json(run_dir / "soak" / f"{name}.json", {"agent": name, **results[name]})
+
+    drifting = [name for name, r in results.items() if r["drift"]["drift_detected"]]
+    if drifting:
+        print(f"\n⚠️  Drift detected for: {', '.join(drifting)}")
+    else:
+        print("\n✅ No significant drift detected")
+    return results
+
+
+# === Virtual-user sessions ===
+
+# Scripted conversations; each user message is sent as one turn with the
+# full history so far. Override with --scenarios <file.json> in the same shape.
+DEFAULT_SCENARIOS: Dict[str, List[str]] = {
+    "memory": [
+        "My favorite programming language is Python. Remember this.",
+        "What is my favorite programming language?",
+        "Suggest one library in that language for building web APIs.",
+    ],
+    "calculation": [
+        "Calculate 42 * 17 using the calculator tool.",
+        "Now add 100 to that result.",
+        "Divide the new number by 2 and tell me all three results.",
+        "Summarize what we computed in one sentence.",
+    ],
+    "planning": [
+        "I am planning a weekend trip to Lisbon. What should I see on day one?",
+        "What about day two? Keep it walkable.",
+        "Where should I eat near the places you mentioned?",
+        "What is the current time? Use the time tool to check.",
+        "Make a short checklist of everything we discussed.",
+    ],
+}
+
+
+def load_scenarios(path: Optional[str]) -> Dict[str, List[str]]:
+    if not path:
+        return DEFAULT_SCENARIOS
+    with open(path) as f:
+        scenarios = json.load(f)
+    if not isinstance(scenarios, dict) or not all(
+            isinstance(turns, list) and turns for turns in scenarios.values()):
+        raise ValueError(f"{path}: expected {{\"scenario\": [\"user turn\", ...]}}")
+    return scenarios
+
+
+@dataclass
+class TurnSample:
+    """One turn of a virtual user's conversation."""
+    user: int
+    session: int
+    scenario: str
+    turn: int  # 1-based turn index within the conversation
+    history_messages: int  # Messages sent in this request, including the new turn
+    started_s: float
+    success: bool
+    ttfb_ms: Optional[float] = None
+    ttfc_ms: Optional[float] = None
+    total_ms: Optional[float] = None
+    request_bytes: int = 0  # Request body, history included
+    error: Optional[str] = None
+
+
+async def _send_turn(send: SendFn, seqs: Iterator[int], samples: List[TurnSample],
+                     messages: List[Dict[str, str]], thread_id: str, t0: float,
+                     **fields) -> Optional[TestMetrics]:
+    """Send one conversation turn and record it; returns its metrics if it succeeded.
+
+    ``seqs`` is shared by every user of an agent, so concurrent turns never
+    get the same sequence number (and run_id).
+    """
+    started_s = time.perf_counter() - t0
+    try:
+        metrics, error = await send(next(seqs), messages=list(messages), thread_id=thread_id), None
+    except Exception as e:
+        metrics, error = None, str(e)
+
+    sample = TurnSample(history_messages=len(messages), started_s=started_s,
+                        success=bool(metrics and metrics.success), error=error, **fields)
+    if metrics is not None:
+        sample.ttfb_ms = metrics.time_to_first_event_ms or None
+        sample.ttfc_ms = metrics.time_to_first_content_ms or None
+        sample.total_ms = metrics.total_time_ms
+        sample.request_bytes = metrics.request_bytes
+        sample.error = metrics.error
+    samples.append(sample)
+    return metrics if sample.success else None
+
+
+async def run_virtual_user(send: SendFn, user: int, scenarios: Dict[str, List[str]],
+                           deadline: float, t0: float, rng: random.Random,
+                           think_min: float, think_max: float, thread_prefix: str,
+                           seqs: Iterator[int], samples: List[TurnSample]):
+    """Hold conversations back to back until the deadline passes."""
+    session = 0
+    while time.perf_counter() < deadline:
+        session += 1
+        scenario = rng.choice(sorted(scenarios))
+        thread_id = f"{thread_prefix}-u{user}-s{session}"
+        messages: List[Dict[str, str]] = []
+
+        for turn, content in enumerate(scenarios[scenario], start=1):
+            if time.perf_counter() >= deadline:
+                return
+            messages.append({"id": f"msg-{len(messages) + 1}", "role": "user", "content": content})
+            metrics = await _send_turn(send, seqs, samples, messages, thread_id, t0, user=user,
+                                       session=session, scenario=scenario, turn=turn)
+            if metrics is None:
+                break  # A broken conversation is abandoned like a real user would
+
+            messages.append({"id": f"msg-{len(messages) + 1}", "role": "assistant",
+                             "content": metrics.final_response})
+            await asyncio.sleep(rng.uniform(think_min, think_max))
+
+
+def summarize_turns(samples: List[TurnSample]) -> List[Dict[str, Any]]:
+    """Latency and error statistics per turn index."""
+    by_turn: Dict[int, List[TurnSample]] = {}
+    for s in samples:
+        by_turn.setdefault(s.turn, []).append(s)
+
+    turns = []
+    for turn in sorted(by_turn):
+        bucket = by_turn[turn]
+        ok = [s for s in bucket if s.success]
+        turns.append({
+            "turn": turn,
+            "requests": len(bucket),
+            "errors": len(bucket) - len(ok),
+            "avg_history_messages": sum(s.history_messages for s in bucket) / len(bucket),
+            "avg_request_bytes": sum(s.request_bytes for s in bucket) / len(bucket),
+            "ttfb_ms": latency_stats([s.ttfb_ms for s in ok if s.ttfb_ms is not None]),
+            "ttfc_ms": latency_stats([s.ttfc_ms for s in ok if s.ttfc_ms is not None]),
+            "total_ms": latency_stats([s.total_ms for s in ok if s.total_ms is not None]),
+        })
+    return turns
+
+
+def print_sessions_report(agent: str, users: int, turns: List[Dict[str, Any]], sessions: int):
+    print(f"\n{'─' * 100}")
+    print(f"👥 SESSIONS: {agent} ({users} virtual users, {sessions} conversations)")
+    print(f"{'─' * 100}")
+    print(f"  {'Turn':<6} {'Reqs':<6} {'Err':<5} {'History':<9} {'TTFC p50':<10} {'TTFC p90':<10} "
+          f"{'Total p50':<10} {'Total p90':<10}")
+    print(f"  {'-' * 70}")
+    for t in turns:
+        print(f"  {t['turn']:<6} {t['requests']:<6} {t['errors']:<5} {t['avg_history_messages']:>5.1f}    "
+              f"{t['ttfc_ms']['p50']:>7.0f}ms  {t['ttfc_ms']['p90']:>7.0f}ms  "
+              f"{t['total_ms']['p50']:>7.0f}ms  {t['total_ms']['p90']:>7.0f}ms")
+
+
+async def run_sessions_mode(args: argparse.Namespace, agents: Dict[str, dict],
+                            make_sender: SenderFactory, run_dir: Path) -> Dict[str, Any]:
+    """N virtual users per agent running scripted conversations with think time."""
+    scenarios = load_scenarios(args.scenarios)
+    results = {}
+    for name in agents:
+        send = make_sender(name)
+        print(f"\n👥 {name}: {args.users} virtual users for {args.duration:.0f}s, "
+              f"think time {args.think_min:g}-{args.think_max:g}s, scenarios {sorted(scenarios)}")
+
+        samples: List[TurnSample] = []
+        t0 = time.perf_counter()
+        deadline = t0 + args.duration
+        base_seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+        seqs = itertools.count()
+
+        async def start_user(user: int):
+            # Stagger arrivals over the ramp-up so users do not move in lockstep
+            if args.ramp_up > 0:
+                await asyncio.sleep(args.ramp_up * user / args.users)
+            await run_virtual_user(send, user, scenarios, deadline, t0,
+                                   random.Random(base_seed + user),
+                                   args.think_min, args.think_max,
+                                   f"vu-{name}-{int(time.time())}", seqs, samples)
+
+        await asyncio.gather(*(start_user(u) for u in range(args.users)))
+
+        turns = summarize_turns(samples)
+        sessions = len({(s.user, s.session) for s in samples})
+        print_sessions_report(name, args.users, turns, sessions)
+
+        results[name] = {
+            "users": args.users,
+            "duration_s": args.duration,
+            "think_s": [args.think_min, args.think_max],
+            "scenarios": sorted(scenarios),
+            "conversations": sessions,
+            "requests": len(samples),
+            "errors": sum(1 for s in samples if not s.success),
+            "turns": turns,
+        }
+        _save_json(run_dir / "sessions" / f"{name}.json", {
+            "agent": name,
+            **results[name],
+            "samples": [asdict(s) for s in samples],
+        })
+    return results
+
+
+# === History-length scaling ===
+
+# Asks for a one-sentence answer, so output length stays flat and latency
+# follows the history that is sent
+HISTORY_TURN = "In one short sentence, tell me a fact about the number {turn}."
+
+
+async def run_history_conversation(send: SendFn, conversation: int, max_turns: int,
+                                   thread_id: str, t0: float, seqs: Iterator[int],
+                                   samples: List[TurnSample]):
+    """One conversation of up to ``max_turns`` turns, sent back to back."""
+    messages: List[Dict[str, str]] = []
+    for turn in range(1, max_turns + 1):
+        messages.append({"id": f"msg-{len(messages) + 1}", "role": "user",
+                         "content": HISTORY_TURN.format(turn=turn)})
+        metrics = await _send_turn(send, seqs, samples, messages, thread_id, t0, user=0,
+                                   session=conversation, scenario="history", turn=turn)
+        if metrics is None:
+            return  # Later turns would build on a broken history
+        messages.append({"id": f"msg-{len(messages) + 1}", "role": "assistant",
+                         "content": metrics.final_response})
+
+
+def fit_history(samples: List[TurnSample], level: float = 0.95) -> Dict[str, Any]:
+    """Fit TTFC and total time against the turn number and the request size."""
+    ok = [s for s in samples if s.success]
+    fits = {}
+    for metric in ("ttfc_ms", "total_ms"):
+        points = [s for s in ok if getattr(s, metric)]
+        values = [getattr(s, metric) for s in points]
+        fits[metric] = {
+            "per_turn": linear_fit([s.turn for s in points], values, level),
+            "per_kb": linear_fit([s.request_bytes / 1024 for s in points], values, level),
+        }
+    return fits
+
+
+def _format_slope(fit: Optional[Dict[str, Any]]) -> str:
+    if fit is None:
+        return "n/a"
+    if fit["slope_ci_low"] is None:
+        return f"{fit['slope']:+.1f}"
+    return f"{fit['slope']:+.1f} [{fit['slope_ci_low']:+.1f}, {fit['slope_ci_high']:+.1f}]"
+
+
+def print_history_report(agent: str, turns: List[Dict[str, Any]], fits: Dict[str, Any]):
+    print(f"\n{'─' * 100}")
+    print(f"📈 HISTORY SCALING: {agent}")
+    print(f"{'─' * 100}")
+    print(f"  {'Turn':<6} {'Reqs':<6} {'Err':<5} {'Request':>9}  {'TTFC p50':<10} {'Total p50':<10}")
+    print(f"  {'-' * 60}")
+    # Every turn for short conversations, about ten rows for long ones
+    every = max(1, len(turns) // 10)
+    for t in turns:
+        if t["turn"] != 1 and t["turn"] % every and t is not turns[-1]:
+            continue
+        print(f"  {t['turn']:<6} {t['requests']:<6} {t['errors']:<5} {t['avg_request_bytes']:>8.0f}B  "
+              f"{t['ttfc_ms']['p50']:>7.0f}ms  {t['total_ms']['p50']:>7.0f}ms")
+    for metric, label in (("ttfc_ms", "TTFC"), ("total_ms", "Total")):
+        per_turn = fits[metric]["per_turn"]
+        r_squared = f"R²={per_turn['r_squared']:.2f}" if per_turn else ""
+        print(f"  {label:<6} ms/turn {_format_slope(per_turn)}   "
+              f"ms/KB {_format_slope(fits[metric]['per_kb'])}   {r_squared}")
+
+
+def print_history_comparison(results: Dict[str, Any]):
+    """Per-turn latency growth of every agent, flattest first."""
+    if len(results) < 2:
+        return
+    print(f"\n{'─' * 100}")
+    print("📈 HISTORY SCALING BY FRAMEWORK (slope of the least-squares fit, 95% CI)")
+    print(f"{'─' * 100}")
+    print(f"  {'Agent':<28} {'Framework':<18} {'Total ms/turn':<24} {'TTFC ms/turn':<24} {'R²':>5}")
+    print(f"  {'-' * 100}")
+
+    def slope(item):
+        fit = item[1]["fits"]["total_ms"]["per_turn"]
+        return fit["slope"] if fit else float("inf")
+
+    for name, result in sorted(results.items(), key=slope):
+        total = result["fits"]["total_ms"]["per_turn"]
+        r_squared = f"{total['r_squared']:.2f}" if total else "-"
+        print(f"  {name:<28} {result['framework']:<18} {_format_slope(total):<24} "
+              f"{_format_slope(result['fits']['ttfc_ms']['per_turn']):<24} {r_squared:>5}")
+
+
+async def run_history_mode(args: argparse.Namespace, agents: Dict[str, dict],
+                           make_sender: SenderFactory, run_dir: Path) -> Dict[str, Any]:
+    """Conversations of 1..--max-turns turns per agent, latency fitted against history."""
+    results = {}
+    for name, config in agents.items():
+        send = make_sender(name)
+        print(f"\n📈 {name}: {args.conversations} conversations of up to {args.max_turns} turns")
+
+        samples: List[TurnSample] = []
+        seqs = itertools.count()
+        t0 = time.perf_counter()
+        for conversation in range(1, args.conversations + 1):
+            await run_history_conversation(send, conversation, args.max_turns,
+                                           f"history-{name}-{int(time.time())}-c{conversation}",
+                                           t0, seqs, samples)
+
+        turns = summarize_turns(samples)
+        fits = fit_history(samples)
+        print_history_report(name, turns, fits)
+
+        results[name] = {
+            "framework": config.get("framework", name),
+            "model": config.get("model"),
+            "conversations": args.conversations,
+            "max_turns": args.max_turns,
+            "requests": len(samples),
+            "errors": sum(1 for s in samples if not s.success),
+            "turns": turns,
+            "fits": fits,
+        }
+        _save_json(run_dir / "history" / f"{name}.json", {
+            "agent": name,
+            **results[name],
+            "samples": [asdict(s) for s in samples],
+        })
+
+    print_history_comparison(results)
+    return results
+
+
+# === Paired A/B comparison ===
+
+AB_METRICS = (("total_ms", "total_time_ms"), ("ttfb_ms", "time_to_first_event_ms"),
+              ("ttfc_ms", "time_to_first_content_ms"))
+
+
+async def run_ab_pairs(send_a: SendFn, send_b: SendFn, pairs: int,
+                       rng: random.Random) -> List[Dict[str, Any]]:
+    """Run ``pairs`` A/B pairs back to back, each in a random order, so both
+    sides of a pair see the same provider and network conditions."""
+    results = []
+    for i in range(pairs):
+        order = rng.choice(("AB", "BA"))
+        pair: Dict[str, Any] = {"pair": i, "order": order}
+        for j, side in enumerate(order):
+            send = send_a if side == "A" else send_b
+            try:
+                metrics, error = await send(2 * i + j), None
+            except Exception as e:
+                metrics, error = None, str(e)
+            pair[side] = {
+                "success": bool(metrics and metrics.success),
+                "error": metrics.error if metrics else error,
+                **{key: getattr(metrics, field) if metrics else None for key, field in AB_METRICS},
+            }
+        results.append(pair)
+    return results
+
+
+def compare_pairs(pairs: List[Dict[str, Any]], level: float = 0.95,
+                  resamples: int = 5000, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Paired differences (B - A) with bootstrap CIs and a verdict per metric."""
+    both = [p for p in pairs if p["A"]["success"] and p["B"]["success"]]
+    comparison: Dict[str, Any] = {
+        "pairs": len(pairs),
+        "paired": len(both),
+        "a_errors": sum(1 for p in pairs if not p["A"]["success"]),
+        "b_errors": sum(1 for p in pairs if not p["B"]["success"]),
+        "level": level,
+        "metrics": {},
+    }
+    for key, _ in AB_METRICS:
+        usable = [p for p in both if p["A"][key] and p["B"][key]]
+        diffs = [p["B"][key] - p["A"][key] for p in usable]
+        ratios = [p["B"][key] / p["A"][key] for p in usable]
+        if not diffs:
+            comparison["metrics"][key] = None
+            continue
+
+        median_ci = bootstrap_ci(diffs, level=level, resamples=resamples, seed=seed)
+        ratio_ci = bootstrap_ci(ratios, level=level, resamples=resamples, seed=seed)
+        signs = sign_test(diffs)
+        if median_ci is None:
+            verdict = "insufficient data"
+        elif median_ci[1] < 0:
+            verdict = "B faster"
+        elif median_ci[0] > 0:
+            verdict = "B slower"
+        else:
+            verdict = "no significant difference"
+
+        comparison["metrics"][key] = {
+            "a_median": percentile([p["A"][key] for p in usable], 50),
+            "b_median": percentile([p["B"][key] for p in usable], 50),
+            "median_diff": percentile(diffs, 50),
+            "median_diff_ci": list(median_ci) if median_ci else None,
+            "mean_diff": sum(diffs) / len(diffs),
+            "median_ratio": percentile(ratios, 50),
+            "median_ratio_ci": list(ratio_ci) if ratio_ci else None,
+            "b_slower_pairs": signs["positive"],
+            "b_faster_pairs": signs["negative"],
+            "sign_test_p": signs["p_value"],
+            "verdict": verdict,
+        }
+    return comparison
+
+
+def print_ab_report(a: str, b: str, comparison: Dict[str, Any]):
+    print(f"\n{'─' * 100}")
+    print(f"⚖️  A/B: A = {a}, B = {b} ({comparison['paired']}/{comparison['pairs']} complete pairs, "
+          f"{comparison['level'] * 100:g}% bootstrap CIs)")
+    print(f"{'─' * 100}")
+    print(f"  {'Metric':<8} {'A p50':>9} {'B p50':>9} {'Δ p50 (B-A)':>13} {'CI':>22} {'B/A':>7}  Verdict")
+    print(f"  {'-' * 95}")
+    for label, key in (("Total", "total_ms"), ("TTFB", "ttfb_ms"), ("TTFC", "ttfc_ms")):
+        m = comparison["metrics"].get(key)
+        if not m:
+            print(f"  {label:<8} {'n/a':>9}")
+            continue
+        ci = m["median_diff_ci"]
+        ci_str = f"[{ci[0]:+.0f}, {ci[1]:+.0f}]ms" if ci else "n/a"
+        print(f"  {label:<8} {m['a_median']:>7.0f}ms {m['b_median']:>7.0f}ms {m['median_diff']:>+11.0f}ms "
+              f"{ci_str:>22} {m['median_ratio']:>6.2f}x  {m['verdict']} (sign test p={m['sign_test_p']:.3g})")
+    if comparison["a_errors"] or comparison["b_errors"]:
+        print(f"\n  Errors: A {comparison['a_errors']}, B {comparison['b_errors']}")
+
+
+async def run_ab_mode(args: argparse.Namespace, agents: Dict[str, dict],
+                      make_sender: SenderFactory, run_dir: Path) -> Dict[str, Any]:
+    """Paired, interleaved comparison of the two --agent entries (A first)."""
+    names = [name for name in args.agent if name in agents]
+    if len(names) != 2:
+        print(f"❌ A/B mode needs two healthy agents, got: {', '.join(names) or 'none'}")
+        return {}
+    a, b = names
+    rng = random.Random(args.seed)
+    print(f"\n⚖️  {a} (A) vs {b} (B): {args.pairs} pairs of '{args.prompt}', randomized order")
+
+    pairs = await run_ab_pairs(make_sender(a), make_sender(b), args.pairs, rng)
+    comparison = compare_pairs(pairs, level=args.ab_level, seed=args.seed)
+    print_ab_report(a, b, comparison)
+
+    result = {"a": a, "b": b, "prompt": args.prompt, **comparison}
+    _save_json(run_dir / "ab" / f"{a}-vs-{b}.json", {**result, "samples": pairs})
+    return result
+
+
+def add_load_arguments(parser: argparse.ArgumentParser):
+    """Register the load-mode command-line options."""
+    load = parser.add_argument_group("load modes")
+    load.add_argument("--prompt", default="simple",
+                      help="TEST_PROMPTS entry sent by load modes (default: simple)")
+    load.add_argument("--arrival", choices=ARRIVAL_PROFILES, default="constant",
+                      help="Open-loop arrival profile (default: constant)")
+    load.add_argument("--rate", type=float, default=1.0,
+                      help="Open-loop request rate in req/s (default: 1)")
+    load.add_argument("--duration", type=float, default=60.0,
+                      help="Open-loop duration in seconds (default: 60)")
+    load.add_argument("--steps", default=None,
+                      help='Step profile as "seconds:rps,..." e.g. "30:1,30:2,30:4"')
+    load.add_argument("--burst-size", type=int, default=10,
+                      help="Requests per burst for --arrival burst (default: 10)")
+    load.add_argument("--burst-every", type=float, default=10.0,
+                      help="Seconds between bursts for --arrival burst (default: 10)")
+    load.add_argument("--window", type=float, default=10.0,
+                      help="Reporting window in seconds (default: 10)")
+    load.add_argument("--ladder", default="1,2,4,8,16,32,64,128,256",
+                      help='Sweep concurrency levels, "1,2,4" or "1-256" (default: 1..256)')
+    load.add_argument("--step-duration", type=float, default=30.0,
+                      help="Seconds spent at each sweep concurrency level (default: 30)")
+    load.add_argument("--slo-metric", choices=list(SLO_METRICS), default="ttfc",
+                      help="Latency the capacity SLO is defined on (default: ttfc)")
+    load.add_argument("--slo-percentile", type=float, default=95.0,
+                      help="SLO latency percentile (default: 95)")
+    load.add_argument("--slo-ms", type=float, default=2000.0,
+                      help="SLO latency threshold in ms (default: 2000)")
+    load.add_argument("--slo-error-rate", type=float, default=0.01,
+                      help="SLO maximum error rate (default: 0.01)")
+    load.add_argument("--max-rate", type=float, default=64.0,
+                      help="Upper bound of the capacity search in req/s (default: 64)")
+    load.add_argument("--precision", type=float, default=0.1,
+                      help="Relative precision of the capacity search (default: 0.1)")
+    load.add_argument("--drift-fraction", type=float, default=0.2,
+                      help="Soak: share of the run compared at start vs end (default: 0.2)")
+    load.add_argument("--drift-alpha", type=float, default=0.01,
+                      help="Soak: significance level of the drift tests (default: 0.01)")
+    load.add_argument("--drift-min-change", type=float, default=0.1,
+                      help="Soak: minimum relative median change flagged as drift (default: 0.1)")
+    load.add_argument("--users", type=int, default=10,
+                      help="Sessions: number of virtual users (default: 10)")
+    load.add_argument("--think-min", type=float, default=1.0,
+                      help="Sessions: minimum think time between turns in seconds (default: 1)")
+    load.add_argument("--think-max", type=float, default=5.0,
+                      help="Sessions: maximum think time between turns in seconds (default: 5)")
+    load.add_argument("--ramp-up", type=float, default=10.0,
+                      help="Sessions: seconds over which users start (default: 10)")
+    load.add_argument("--scenarios", default=None,
+                      help='Sessions: JSON file {"name": ["turn 1", "turn 2", ...]} (default: built-in)')
+    load.add_argument("--max-turns", type=int, default=50,
+                      help="History: turns per conversation (default: 50)")
+    load.add_argument("--conversations", type=int, default=3,
+                      help="History: conversations per agent (default: 3)")
+    load.add_argument("--pairs", type=int, default=30,
+                      help="A/B: number of interleaved request pairs (default: 30)")
+    load.add_argument("--ab-level", type=float, default=0.95,
+                      help="A/B: confidence level of the bootstrap CIs (default: 0.95)")
+    load.add_argument("--abort-error-rate", type=float, default=0.5,
+                      help="Stop the sweep once a step's error rate reaches this (default: 0.5)")
+
+
+LOAD_MODES = {
+    "open-loop": run_open_loop_mode,
+    "sweep": run_sweep_mode,
+    "capacity": run_capacity_mode,
+    "soak": run_soak_mode,
+    "sessions": run_sessions_mode,
+    "history": run_history_mode,
+    "ab": run_ab_mode,
+}
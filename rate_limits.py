@@ -0,0 +1,149 @@
+"""
+Provider-aware pacing of benchmark dispatch.
+
+Every agent calls one of four upstream providers. When the whole grid is
+queued at once, Anthropic or OpenAI start answering 429 and the frameworks
+retry internally, so whichever agent hits the limit first looks slow or
+broken. ``RateLimiter`` keeps a request bucket and a token bucket per
+provider and holds each job back until both have room. The hold is
+reported as the job's ``throttle_wait_ms``, separate from scheduler queue
+wait and from agent latency.
+
+Token use is only known after a request finishes. Each job reserves the
+mean token count seen so far for its agent x prompt cell (or the provider
+default), and ``settle`` charges or refunds the difference once the usage
+is known.
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from histogram import LatencyHistogram
+from scheduler import TestJob
+
+
+# Seconds of traffic a bucket may release at once
+BURST_S = 10.0
+
+
+@dataclass
+class ProviderLimit:
+    """Sustained limits for one provider (0 = unlimited)."""
+    rpm: float = 0  # Requests per minute
+    tpm: float = 0  # Tokens (input + output) per minute
+    tokens_per_request: int = 1500  # Reservation before a cell's usage is known
+
+
+class TokenBucket:
+    """Continuously refilled bucket; waiters are served in arrival order."""
+
+    def __init__(self, per_minute: float, burst_s: float = BURST_S, min_capacity: float = 1):
+        self.rate = per_minute / 60
+        self.capacity = max(min_capacity, self.rate * burst_s)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def take(self, amount: float):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.level < amount:
+                await asyncio.sleep((amount - self.level) / self.rate)
+                self._refill()
+            self.level -= amount
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) tokens after the fact; may go into debt."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class RateLimiter:
+    """Per-provider request and token buckets for ``TestScheduler``."""
+
+    def __init__(self, limits: Dict[str, ProviderLimit], share: int = 1):
+        # With several worker processes each one paces its share of the limit
+        self.limits = limits
+        self.share = max(1, share)
+        self._requests: Dict[str, TokenBucket] = {}
+        self._tokens: Dict[str, TokenBucket] = {}
+        self._usage: Dict[Tuple[str, str], List[int]] = {}  # Cell -> [tokens, requests]
+        self._reserved: Dict[int, int] = {}
+        self.waits: Dict[str, LatencyHistogram] = {}
+
+    def _buckets(self, provider: str) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        limit = self.limits.get(provider)
+        if limit is None:
+            return None, None
+        if provider not in self._requests:
+            self._requests[provider] = (TokenBucket(limit.rpm / self.share)
+                                        if limit.rpm else None)
+            self._tokens[provider] = (TokenBucket(limit.tpm / self.share,
+                                                  min_capacity=limit.tokens_per_request)
+                                      if limit.tpm else None)
+        return self._requests[provider], self._tokens[provider]
+
+    def estimate(self, job: TestJob) -> int:
+        tokens, requests = self._usage.get((job.name, job.prompt_type), (0, 0))
+        if requests:
+            return round(tokens / requests)
+        limit = self.limits.get(job.provider)
+        return limit.tokens_per_request if limit else 0
+
+    async def acquire(self, job: TestJob) -> float:
+        """Wait until the job's provider has room; returns the wait in ms."""
+        requests, tokens = self._buckets(job.provider)
+        if requests is None and tokens is None:
+            return 0.0
+        start_ns = time.perf_counter_ns()
+        if requests is not None:
+            await requests.take(1)
+        if tokens is not None:
+            reserved = self.estimate(job)
+            self._reserved[id(job)] = reserved
+            await tokens.take(reserved)
+        wait_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        self.waits.setdefault(job.provider, LatencyHistogram()).record(wait_ms)
+        return wait_ms
+
+    def settle(self, job: TestJob, result: Any):
+        """Replace the job's token reservation with its reported usage (``result`` may be None)."""
+        reserved = self._reserved.pop(id(job), None)
+        used = (getattr(result, "total_tokens", 0)
+                or (getattr(result, "input_tokens", 0) or 0) + (getattr(result, "output_tokens", 0) or 0))
+        if not used:
+            return  # No usage reported; the reservation stands
+        cell = self._usage.setdefault((job.name, job.prompt_type), [0, 0])
+        cell[0] += used
+        cell[1] += 1
+        if reserved is not None:
+            tokens = self._tokens.get(job.provider)
+            if tokens is not None:
+                tokens.adjust(used - reserved)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "burst_s": BURST_S,
+            "share": self.share,
+            "providers": {provider: asdict(limit) for provider, limit in self.limits.items()},
+        }
+
+
+def parse_provider_limit(spec: str) -> Tuple[str, float, float]:
+    """'anthropic=50:40000' -> ('anthropic', 50, 40000); either side may be empty."""
+    provider, sep, values = spec.partition("=")
+    rpm, _, tpm = values.partition(":")
+    try:
+        if not sep or not provider:
+            raise ValueError
+        return provider, float(rpm or 0), float(tpm or 0)
+    except ValueError:
+        raise ValueError(f"--provider-limit expects PROVIDER=RPM:TPM, got {spec!r}") from None
@@ -0,0 +1,135 @@
+"""
+Append-only, crash-safe log of benchmark results.
+
+A full run is hundreds of streaming requests. Writing ``summary.json`` only
+at the end means a crash loses the whole run. ``main()`` therefore appends
+every finished ``TestMetrics`` to ``<run-dir>/results.jsonl``, one JSON line
+per request, flushed and fsynced before the next result is accepted. The
+summary is rebuilt from this log, and ``--resume <run-dir>`` reads it to
+run only the cells that are missing or failed.
+
+The log round-trips the complete ``TestMetrics``, nested dataclasses and
+histograms included, so a rebuilt summary has the same statistics the
+original run would have written.
+"""
+
+import dataclasses
+import json
+import os
+import typing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from benchmark_metrics import TestMetrics
+from histogram import LatencyHistogram
+
+
+RESULTS_LOG = "results.jsonl"
+
+CellKey = Tuple[str, str, int]  # (agent name, prompt type, run number)
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, LatencyHistogram):
+        return value.to_dict()
+    if dataclasses.is_dataclass(value):
+        return {f.name: _encode(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _encode(v) for k, v in value.items()}
+    return value
+
+
+def _decode(tp: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    origin = typing.get_origin(tp)
+    if origin is typing.Union:  # Optional[X]
+        tp = next(arg for arg in typing.get_args(tp) if arg is not type(None))
+        origin = typing.get_origin(tp)
+    if tp is LatencyHistogram:
+        return LatencyHistogram.from_dict(value)
+    if dataclasses.is_dataclass(tp):
+        hints = typing.get_type_hints(tp)
+        return tp(**{f.name: _decode(hints[f.name], value[f.name])
+                     for f in dataclasses.fields(tp) if f.name in value})
+    if tp is set or origin is set:
+        return set(value)
+    if origin is list:
+        (item,) = typing.get_args(tp)
+        return [_decode(item, v) for v in value]
+    if origin is dict:
+        key, item = typing.get_args(tp)
+        return {key(k): _decode(item, v) for k, v in value.items()}
+    return value
+
+
+def metrics_to_record(metrics: TestMetrics) -> Dict[str, Any]:
+    return _encode(metrics)
+
+
+def record_to_metrics(record: Dict[str, Any]) -> TestMetrics:
+    return _decode(TestMetrics, record)
+
+
+def cell_key(metrics: TestMetrics) -> CellKey:
+    return (metrics.name, metrics.prompt_type, metrics.run_num)
+
+
+class ResultsLog:
+    """Durable per-run results log (``<run-dir>/results.jsonl``)."""
+
+    def __init__(self, run_dir: Path):
+        self.path = Path(run_dir) / RESULTS_LOG
+        self._terminated = False
+
+    def _terminate_torn_line(self, f):
+        # A crash can leave half a line; never glue the next record onto it
+        if self.path.stat().st_size:
+            with open(self.path, "rb") as tail:
+                tail.seek(-1, os.SEEK_END)
+                if tail.read(1) != b"\n":
+                    f.write("\n")
+        self._terminated = True
+
+    def append(self, metrics: TestMetrics):
+        """Write one result and make sure it reached the disk."""
+        line = json.dumps(metrics_to_record(metrics), default=str)
+        with open(self.path, "a") as f:
+            if not self._terminated:
+                self._terminate_torn_line(f)
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load(self) -> List[TestMetrics]:
+        """Every logged result, in log order.
+
+        A torn last line (crash mid-write) is skipped. When a cell was
+        rerun, only its latest result is kept.
+        """
+        if not self.path.exists():
+            return []
+        latest: Dict[CellKey, TestMetrics] = {}
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    metrics = record_to_metrics(json.loads(line))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+                key = cell_key(metrics)
+                latest.pop(key, None)  # Move reruns to the end
+                latest[key] = metrics
+        return list(latest.values())
+
+
+def group_by_agent(results: Iterable[TestMetrics],
+                   order: Iterable[str] = ()) -> Dict[str, List[TestMetrics]]:
+    """``all_metrics``-style grouping, agents in ``order`` first."""
+    grouped: Dict[str, List[TestMetrics]] = {name: [] for name in order}
+    for metrics in results:
+        grouped.setdefault(metrics.name, []).append(metrics)
+    return {name: metrics_list for name, metrics_list in grouped.items() if metrics_list}
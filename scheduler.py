@@ -0,0 +1,173 @@
+"""
+Concurrency-controlled scheduling of benchmark tests.
+
+Firing every agent x prompt combination at once measures how agents behave
+while four providers and a handful of shared ports are saturated, not how
+fast they are. The scheduler makes the amount of contention an explicit,
+recorded choice:
+
+- ``sequential``  one test at a time (isolated latency)
+- ``per-agent``   each agent's tests run one after another, agents in parallel
+- ``random``      shuffled order under the global concurrency limit, so no
+                  agent systematically gets the quiet or the busy slots
+- ``bounded``     declaration order under the global concurrency limit
+
+Independently of the mode, per-agent, per-port and per-provider semaphores
+cap how many requests can be in flight against each shared resource, and
+an optional ``RateLimiter`` (rate_limits.py) paces dispatch per provider. All
+runs are queued up front, so run N+1 starts filling free slots while the
+stragglers of run N finish instead of waiting behind a barrier.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+SCHEDULE_MODES = ("sequential", "per-agent", "random", "bounded")
+
+
+@dataclass
+class TestJob:
+    """One agent x prompt x run cell to execute."""
+    name: str
+    config: dict
+    prompt_type: str
+    prompt: Any
+    run_num: int
+    provider: str = ""
+
+    # Filled in by the scheduler when the job starts
+    queue_wait_ms: float = 0
+    throttle_wait_ms: float = 0  # Held back by the provider's rate limit
+    in_flight_at_start: int = 0
+
+
+@dataclass
+class ScheduleConfig:
+    """Scheduler settings (0 means unlimited)."""
+    mode: str = "bounded"
+    concurrency: int = 16
+    per_agent: int = 0
+    per_port: int = 0
+    per_provider: int = 0
+    seed: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "concurrency": self.concurrency,
+            "per_agent": self.per_agent,
+            "per_port": self.per_port,
+            "per_provider": self.per_provider,
+            "seed": self.seed,
+        }
+
+
+class _KeyedSemaphores:
+    """Lazily created semaphore per key (agent name, port or provider)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._sems: Dict[Any, asyncio.Semaphore] = {}
+
+    def get(self, key: Any) -> Optional[asyncio.Semaphore]:
+        if self.limit <= 0:
+            return None
+        sem = self._sems.get(key)
+        if sem is None:
+            sem = self._sems[key] = asyncio.Semaphore(self.limit)
+        return sem
+
+
+class TestScheduler:
+    """Runs TestJobs under the configured mode and resource limits."""
+
+    def __init__(self, config: ScheduleConfig, rate_limiter=None):
+        if config.mode not in SCHEDULE_MODES:
+            raise ValueError(f"Unknown schedule mode: {config.mode}")
+        self.config = config
+        self.rate_limiter = rate_limiter
+
+        concurrency = config.concurrency
+        per_agent = config.per_agent
+        if config.mode == "sequential":
+            concurrency = 1
+        elif config.mode == "per-agent":
+            per_agent = 1
+
+        self._global = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+        self._agents = _KeyedSemaphores(per_agent)
+        self._ports = _KeyedSemaphores(config.per_port)
+        self._providers = _KeyedSemaphores(config.per_provider)
+        self.in_flight = 0
+
+    def order(self, jobs: List[TestJob]) -> List[TestJob]:
+        """Dispatch order for the configured mode."""
+        if self.config.mode == "random":
+            jobs = list(jobs)
+            random.Random(self.config.seed).shuffle(jobs)
+        return jobs
+
+    def _semaphores(self, job: TestJob) -> List[asyncio.Semaphore]:
+        # Narrowest resource first and always in the same order, so a job
+        # never holds a global slot while it waits for its own agent
+        sems = [
+            self._agents.get(job.name),
+            self._ports.get(job.config.get("port")),
+            self._providers.get(job.provider),
+        ]
+        return [s for s in sems if s is not None]
+
+    async def _run_job(self, job: TestJob, execute: Callable[[TestJob], Awaitable[Any]]) -> Any:
+        queued_ns = time.perf_counter_ns()
+        acquired = []
+        result = None
+        try:
+            for sem in self._semaphores(job):
+                await sem.acquire()
+                acquired.append(sem)
+            # Rate-limit pacing before the global slot, so a throttled
+            # provider does not block the others
+            if self.rate_limiter is not None:
+                job.throttle_wait_ms = await self.rate_limiter.acquire(job)
+            if self._global is not None:
+                await self._global.acquire()
+                acquired.append(self._global)
+            job.queue_wait_ms = (time.perf_counter_ns() - queued_ns) / 1e6 - job.throttle_wait_ms
+            job.in_flight_at_start = self.in_flight
+            self.in_flight += 1
+            try:
+                result = await execute(job)
+            finally:
+                self.in_flight -= 1
+            return result
+        finally:
+            # Also on errors and cancellation, so no reservation outlives its job
+            if self.rate_limiter is not None:
+                self.rate_limiter.settle(job, result)
+            for sem in reversed(acquired):
+                sem.release()
+
+    async def run(self, jobs: List[TestJob],
+                  execute: Callable[[TestJob], Awaitable[Any]],
+                  on_result: Optional[Callable[[TestJob, Any], None]] = None
+                  ) -> List[Tuple[TestJob, Any]]:
+        """Execute all jobs; exceptions are returned in place of results."""
+        ordered = self.order(jobs)
+        tasks = {asyncio.ensure_future(self._run_job(job, execute)): job for job in ordered}
+        results: List[Tuple[TestJob, Any]] = []
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                job = tasks[task]
+                result = task.exception() if task.exception() else task.result()
+                results.append((job, result))
+                if on_result:
+                    on_result(job, result)
+
+        return results
@@ -0,0 +1,254 @@
+"""
+Incremental Server-Sent Events decoding for the AG-UI benchmark harness.
+
+The parser consumes raw network reads (``response.aiter_bytes()``) and emits
+each event as soon as its terminating blank line arrives, stamped with the
+monotonic ``perf_counter_ns`` time of the read that completed it. This keeps
+every latency derived from event timing measured rather than reconstructed
+after the stream has been fully buffered.
+
+Implements the SSE field grammar from the HTML Living Standard:
+- lines end in CRLF, LF or a lone CR (also when split across reads)
+- multiple ``data:`` lines are joined with ``\\n``
+- ``event:``, ``id:`` and ``retry:`` fields, ``:`` comment lines
+- a single space after the colon is stripped
+
+Events are kept as compact ``StreamEvent`` records rather than dicts: the
+AG-UI type is sniffed from the raw bytes and interned, and the JSON payload
+is only decoded when a consumer asks for it. Once it has been decoded and
+every processor has seen the event, ``release_data`` drops the raw bytes,
+so a record holds one copy of its payload. Consumed bytes are dropped
+from the parser buffer after every read, so memory tracks the events that
+are still referenced rather than the full response body.
+"""
+
+import json
+import re
+import sys
+from typing import Any, Dict, List, Optional
+
+
+# Matches payloads that start with the type key, which is how every AG-UI
+# encoder in this repo (and the official SDKs) serialises events
+_TYPE_PREFIX = re.compile(rb'\s*\{\s*"type"\s*:\s*"([A-Za-z0-9_.:-]*)"')
+
+# Raw type bytes -> interned str, so each record shares one type string
+_TYPE_CACHE: Dict[bytes, str] = {}
+
+_UNDECODED = object()
+
+
+def _intern_type(raw_type: bytes) -> str:
+    event_type = _TYPE_CACHE.get(raw_type)
+    if event_type is None:
+        event_type = sys.intern(raw_type.decode("utf-8", errors="replace"))
+        _TYPE_CACHE[raw_type] = event_type
+    return event_type
+
+
+class StreamEvent:
+    """One AG-UI event as received on the wire."""
+
+    __slots__ = ("type", "arrival_ns", "offset", "wire_bytes", "index", "data", "event", "id",
+                 "_payload")
+
+    def __init__(self, data: bytes, event: str, id: str, arrival_ns: int, offset: int,
+                 wire_bytes: int = 0):
+        self.data = data
+        self.event = event
+        self.id = id
+        self.arrival_ns = arrival_ns
+        self.offset = offset  # Byte offset of the event's first line in the stream
+        # Bytes from the first line through the terminating blank line: field
+        # names, line endings and any comment lines before the event included
+        self.wire_bytes = wire_bytes
+        self.index = -1
+        self._payload = _UNDECODED
+
+        match = _TYPE_PREFIX.match(data)
+        if match:
+            self.type = _intern_type(match.group(1))
+        else:
+            payload = self.payload
+            event_type = payload.get("type") if payload else None
+            self.type = sys.intern(event_type) if isinstance(event_type, str) else ""
+
+    @property
+    def payload(self) -> Optional[Dict[str, Any]]:
+        """The decoded JSON object, or None if the data is not one."""
+        if self._payload is _UNDECODED:
+            try:
+                payload = json.loads(self.data)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                payload = None
+            if not isinstance(payload, dict):
+                payload = None
+            elif "type" not in payload and self.event != "message":
+                # AG-UI puts the type in the payload; fall back to the SSE event name
+                payload["type"] = self.event
+            self._payload = payload
+        return self._payload
+
+    @property
+    def is_json(self) -> bool:
+        """Whether this is an AG-UI JSON event (as opposed to e.g. ``[DONE]``)."""
+        return bool(self.type) or self.payload is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Shortcut for ``payload.get`` that tolerates non-JSON events."""
+        payload = self.payload
+        if payload is None:
+            return default
+        return payload.get(key, default)
+
+    def contains(self, needle: bytes) -> bool:
+        """Cheap raw-bytes check used to skip decoding irrelevant payloads."""
+        return needle in self.data
+
+    def release_data(self):
+        """Drop the raw bytes if the payload has been decoded (raw checks then no longer work)."""
+        if self._payload is not _UNDECODED:
+            self.data = None
+
+    def to_record(self, start_ns: int) -> Dict[str, Any]:
+        """Payload plus timing annotations, as written to response.jsonl."""
+        record = dict(self.payload or {})
+        record["_timestamp"] = self.arrival_ns / 1e9
+        record["_offset_ms"] = (self.arrival_ns - start_ns) / 1e6
+        record["_byte_offset"] = self.offset
+        record["_wire_bytes"] = self.wire_bytes
+        record["_index"] = self.index
+        return record
+
+
+class SSEParser:
+    """Incremental SSE decoder fed with raw bytes from the network."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._buffer_offset = 0  # Stream offset of self._buffer[0]
+        self._skip_lf = False  # previous read ended in CR; swallow a leading LF
+        self._cr_event: Optional[StreamEvent] = None  # Dispatched by that CR; owns the LF
+        self._data: List[bytes] = []
+        self._has_data = False
+        self._event_offset = -1
+        self._event = ""
+        self._last_id = ""
+        self.retry_ms: Optional[int] = None
+        self.bytes_received = 0
+
+    def feed(self, chunk: bytes, arrival_ns: int) -> List[StreamEvent]:
+        """Consume one network read and return the events it completed."""
+        if not chunk:
+            return []
+
+        self.bytes_received += len(chunk)
+        buf = self._buffer
+        buf += chunk
+        events = []
+        pos = 0
+
+        if self._skip_lf:
+            self._skip_lf = False
+            if buf[:1] == b"\n":
+                pos = 1
+                if self._cr_event is not None:
+                    self._cr_event.wire_bytes += 1
+        self._cr_event = None
+
+        end = len(buf)
+        while pos < end:
+            lf = buf.find(b"\n", pos)
+            cr = buf.find(b"\r", pos, lf if lf != -1 else end)
+            if cr != -1:
+                eol, next_pos = cr, cr + 1
+                if next_pos < end:
+                    if buf[next_pos] == 0x0A:
+                        next_pos += 1
+                else:
+                    self._skip_lf = True
+            elif lf != -1:
+                eol, next_pos = lf, lf + 1
+            else:
+                break
+
+            event = self._process_line(bytes(buf[pos:eol]), self._buffer_offset + pos,
+                                       self._buffer_offset + next_pos, arrival_ns)
+            if event is not None:
+                events.append(event)
+            pos = next_pos
+
+        # Release everything that has been parsed
+        del buf[:pos]
+        self._buffer_offset += pos
+        return events
+
+    def flush(self, arrival_ns: int) -> List[StreamEvent]:
+        """Dispatch whatever is pending once the stream has ended.
+
+        The spec discards an unterminated trailing event; several agent
+        servers close the stream right after the last ``data:`` line, so
+        the harness keeps it instead of silently losing RUN_FINISHED.
+        """
+        events = []
+        if self._buffer:
+            line = bytes(self._buffer)
+            offset = self._buffer_offset
+            self._buffer_offset += len(self._buffer)
+            self._buffer.clear()
+            event = self._process_line(line, offset, self._buffer_offset, arrival_ns)
+            if event is not None:
+                events.append(event)
+        event = self._dispatch(arrival_ns, self._buffer_offset)
+        if event is not None:
+            events.append(event)
+        return events
+
+    def _process_line(self, line: bytes, offset: int, end_offset: int,
+                      arrival_ns: int) -> Optional[StreamEvent]:
+        if not line:
+            return self._dispatch(arrival_ns, end_offset)
+
+        if self._event_offset < 0:
+            self._event_offset = offset
+        if line[:1] == b":":
+            return None
+
+        field_name, sep, value = line.partition(b":")
+        if sep and value[:1] == b" ":
+            value = value[1:]
+
+        if field_name == b"data":
+            self._data.append(value)
+            self._has_data = True
+        elif field_name == b"event":
+            self._event = value.decode("utf-8", errors="replace")
+        elif field_name == b"id":
+            if b"\0" not in value:
+                self._last_id = value.decode("utf-8", errors="replace")
+        elif field_name == b"retry":
+            if value.isdigit():
+                self.retry_ms = int(value)
+        return None
+
+    def _dispatch(self, arrival_ns: int, end_offset: int) -> Optional[StreamEvent]:
+        offset = self._event_offset
+        self._event_offset = -1
+        if not self._has_data:
+            self._event = ""
+            return None
+        data = self._data[0] if len(self._data) == 1 else b"\n".join(self._data)
+        event = StreamEvent(
+            data=data,
+            event=self._event or "message",
+            id=self._last_id,
+            arrival_ns=arrival_ns,
+            offset=offset,
+            wire_bytes=end_offset - offset,
+        )
+        self._data = []
+        self._has_data = False
+        self._event = ""
+        if self._skip_lf:
+            self._cr_event = event  # A CRLF split across reads; see feed()
+        return event
@@ -0,0 +1,182 @@
+"""
+Stall detection for AG-UI streams.
+
+A single request-wide timeout lets one hung stream (AG2 and CrewAI can
+hang) hold a scheduler slot for minutes. ``StreamTimeouts`` bounds each
+phase of a request separately:
+
+- connect        TCP/TLS connect to the agent
+- first event    request start -> first SSE event (includes response headers)
+- first content  request start -> first text (the stream is alive but the
+                 model never answers)
+- idle           gap between consecutive events once the stream has started
+- total          wall-clock cap for the whole request
+
+When a limit fires, ``StallGuard`` raises ``StreamTimeout``. The caller aborts
+the stream but keeps the events received so far. Every failed request is put
+into one of the classes below (``TestMetrics.failure``), and ``Quarantine``
+stops sending to agents that keep timing out.
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+
+# Failure classes (TestMetrics.failure, metadata.json "failure.kind")
+CONNECT_TIMEOUT = "connect_timeout"
+FIRST_EVENT_TIMEOUT = "first_event_timeout"
+FIRST_CONTENT_TIMEOUT = "first_content_timeout"
+IDLE_TIMEOUT = "idle_timeout"
+TOTAL_TIMEOUT = "total_timeout"
+HTTP_ERROR = "http_error"  # Non-200 response
+CONNECTION_ERROR = "connection_error"  # Refused, reset, protocol errors
+PROTOCOL_ERROR = "protocol_error"  # Stream ended without valid AG-UI events
+RATE_LIMITED = "rate_limited"  # HTTP 429, or a RUN_ERROR reporting an upstream limit
+RUN_ERROR = "run_error"  # Any other RUN_ERROR: a framework or model failure
+EXCEPTION = "exception"
+QUARANTINED = "quarantined"  # Not sent: agent kept timing out
+
+TIMEOUT_FAILURES = (CONNECT_TIMEOUT, FIRST_EVENT_TIMEOUT, FIRST_CONTENT_TIMEOUT,
+                    IDLE_TIMEOUT, TOTAL_TIMEOUT)
+
+
+class StreamTimeout(Exception):
+    """A phase limit fired; ``kind`` is one of the *_TIMEOUT classes."""
+
+    def __init__(self, kind: str, limit_s: float):
+        super().__init__(f"{kind.replace('_', ' ')} after {limit_s:g}s")
+        self.kind = kind
+        self.limit_s = limit_s
+
+
+@dataclass
+class StreamTimeouts:
+    """Per-phase limits in seconds (0 disables a limit)."""
+    connect_s: float = 10.0
+    first_event_s: float = 60.0
+    first_content_s: float = 90.0
+    idle_s: float = 30.0
+    total_s: float = 300.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+    def httpx_timeout(self) -> httpx.Timeout:
+        """Client-side limits; read deadlines are enforced by ``StallGuard``."""
+        return httpx.Timeout(None, connect=self.connect_s or None)
+
+    def deadline(self, start_ns: int, first_event_ns: Optional[int],
+                 first_content_ns: Optional[int],
+                 last_event_ns: Optional[int]) -> Tuple[Optional[int], str, float]:
+        """Earliest limit that applies in the current phase: (deadline_ns, kind, limit_s)."""
+        candidates = []
+        if self.total_s:
+            candidates.append((start_ns + int(self.total_s * 1e9), TOTAL_TIMEOUT, self.total_s))
+        if first_event_ns is None:
+            if self.first_event_s:
+                candidates.append((start_ns + int(self.first_event_s * 1e9),
+                                   FIRST_EVENT_TIMEOUT, self.first_event_s))
+        else:
+            if first_content_ns is None and self.first_content_s:
+                candidates.append((start_ns + int(self.first_content_s * 1e9),
+                                   FIRST_CONTENT_TIMEOUT, self.first_content_s))
+            if self.idle_s:
+                candidates.append(((last_event_ns or first_event_ns) + int(self.idle_s * 1e9),
+                                   IDLE_TIMEOUT, self.idle_s))
+        return min(candidates) if candidates else (None, "", 0.0)
+
+
+class StallGuard:
+    """Applies ``StreamTimeouts`` to one request.
+
+    ``ctx`` is the request's ``StreamContext``, whose first-event,
+    first-content and last-event times the pipeline keeps up to date.
+    """
+
+    def __init__(self, timeouts: StreamTimeouts, ctx):
+        self.timeouts = timeouts
+        self.ctx = ctx
+
+    def _remaining(self) -> Tuple[Optional[float], str, float]:
+        ctx = self.ctx
+        deadline_ns, kind, limit_s = self.timeouts.deadline(
+            ctx.start_ns, ctx.first_event_ns, ctx.first_content_ns, ctx.last_event_ns)
+        if deadline_ns is None:
+            return None, kind, limit_s
+        return max(0.0, (deadline_ns - time.perf_counter_ns()) / 1e9), kind, limit_s
+
+    async def send(self, client: httpx.AsyncClient, request: httpx.Request) -> httpx.Response:
+        """Send ``request`` in streaming mode; waiting for headers counts towards the first event."""
+        remaining, kind, limit_s = self._remaining()
+        try:
+            return await asyncio.wait_for(client.send(request, stream=True), remaining)
+        except asyncio.TimeoutError:
+            raise StreamTimeout(kind, limit_s) from None
+        except httpx.ConnectTimeout:
+            raise StreamTimeout(CONNECT_TIMEOUT, self.timeouts.connect_s) from None
+
+    async def read(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Yield network reads until the stream ends or a phase limit fires."""
+        iterator = chunks.__aiter__()
+        while True:
+            remaining, kind, limit_s = self._remaining()
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), remaining)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise StreamTimeout(kind, limit_s) from None
+            yield chunk
+
+
+# Provider rate-limit and overload signatures as frameworks relay them in RUN_ERROR
+_RATE_LIMIT = re.compile(
+    r"\b429\b|\b529\b|rate[ _-]?limit|too many requests|quota|resource[ _]exhausted|overloaded",
+    re.IGNORECASE,
+)
+
+
+def classify_run_error(message: str, code: str = "") -> str:
+    """RATE_LIMITED when a RUN_ERROR looks like an upstream limit, else RUN_ERROR."""
+    return RATE_LIMITED if _RATE_LIMIT.search(f"{code} {message}") else RUN_ERROR
+
+
+def classify_exception(error: Exception) -> str:
+    """Failure class for an exception raised while sending or streaming."""
+    if isinstance(error, StreamTimeout):
+        return error.kind
+    if isinstance(error, httpx.ConnectTimeout):
+        return CONNECT_TIMEOUT
+    if isinstance(error, httpx.TransportError):
+        return CONNECTION_ERROR
+    return EXCEPTION
+
+
+class Quarantine:
+    """Stops sending to an agent after ``threshold`` consecutive timeouts (0 disables)."""
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.streaks: Dict[str, int] = {}
+        self.quarantined: Dict[str, str] = {}  # Agent -> failure that tripped it
+
+    def blocked(self, name: str) -> bool:
+        return name in self.quarantined
+
+    def record(self, name: str, failure: Optional[str]) -> bool:
+        """Count one result; True when it put the agent into quarantine."""
+        if not self.threshold or name in self.quarantined:
+            return False
+        if failure in TIMEOUT_FAILURES:
+            self.streaks[name] = self.streaks.get(name, 0) + 1
+            if self.streaks[name] >= self.threshold:
+                self.quarantined[name] = failure
+                return True
+        else:
+            self.streaks[name] = 0
+        return False
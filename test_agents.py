@@ -9,16 +9,36 @@ Run with: python test_agents.py
 """
 
 import httpx
+import argparse
 import asyncio
 import json
+import shutil
 import sys
 import time
 import statistics
+from dataclasses import asdict, replace
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
 from datetime import datetime
 
+import harness_noise
+from adaptive_sampling import CI_METRICS, AdaptiveConfig, AdaptiveSampler, print_adaptive_report
+from benchmark_metrics import TestMetrics, TurnMetrics
+from benchmark_stats import median_ci, rank_tiers
+from load_driver import run_jobs_sharded
+from load_modes import LOAD_MODES, add_load_arguments
+from http_trace import DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_KEEPALIVE, ConnectionTracer, build_limits
+from event_processors import EventPipeline
+from histogram import LatencyAggregator, LatencyHistogram, latency_summary
+from rate_limits import ProviderLimit, RateLimiter, parse_provider_limit
+from results_log import RESULTS_LOG, ResultsLog, cell_key, group_by_agent
+from scheduler import SCHEDULE_MODES, ScheduleConfig, TestJob, TestScheduler
+from sse_stream import SSEParser, StreamEvent
+from stream_guard import (
+    EXCEPTION, HTTP_ERROR, PROTOCOL_ERROR, QUARANTINED, RATE_LIMITED, Quarantine, StallGuard,
+    StreamTimeout, StreamTimeouts, classify_exception, classify_run_error,
+)
+
 
 # Number of runs per test for statistical significance
 NUM_RUNS = 3
@@ -35,6 +55,24 @@ MODELS = {
     "cerebras": "llama-3.3-70b",  # Cerebras: fastest LLM inference
 }
 
+# Upstream provider behind each model key (shared rate limits and quotas)
+MODEL_PROVIDERS = {
+    "claude": "anthropic",
+    "openai": "openai",
+    "gemini": "google",
+    "cerebras": "cerebras",
+}
+
+# Sustained upstream limits used by --rate-limit (requests / tokens per
+# minute). Defaults are low-tier API limits; set them to your account's
+# tier here or with --provider-limit PROVIDER=RPM:TPM.
+PROVIDER_LIMITS = {
+    "anthropic": ProviderLimit(rpm=50, tpm=50_000),
+    "openai": ProviderLimit(rpm=500, tpm=200_000),
+    "google": ProviderLimit(rpm=1000, tpm=1_000_000),
+    "cerebras": ProviderLimit(rpm=30, tpm=60_000),
+}
+
 # Model pricing (per 1M tokens) as of 2026-02
 # Prices in USD
 MODEL_PRICING = {
@@ -385,6 +423,7 @@ TEST_PROMPTS = {
             {"role": "user", "content": "My favorite programming language is Python. Remember this."},
             {"role": "user", "content": "What is my favorite programming language?"},
         ],
+        "expect": "python",  # The last answer must contain this to count as context retained
         "validates": ["context_retention", "MESSAGES_SNAPSHOT", "STATE_SNAPSHOT"],
     },
 
@@ -435,101 +474,6 @@ SIMPLE_TEST_PROMPTS = {
 }
 
 
-@dataclass
-class ToolCallDetail:
-    """Detailed metrics for a single tool call."""
-    tool_call_id: str
-    name: str
-    start_ms: float
-    args_complete_ms: float = 0
-    end_ms: float = 0
-    result_ms: float = 0
-    success: bool = False
-    result: str = ""
-    args: str = ""
-
-    @property
-    def duration_ms(self) -> float:
-        """Total time from start to result."""
-        if self.result_ms > 0:
-            return self.result_ms - self.start_ms
-        return 0
-
-    @property
-    def execution_time_ms(self) -> float:
-        """Time spent executing (end to result)."""
-        if self.result_ms > 0 and self.end_ms > 0:
-            return self.result_ms - self.end_ms
-        return 0
-
-
-@dataclass
-class StreamingMetrics:
-    """Streaming performance metrics."""
-    total_chars: int = 0
-    total_chunks: int = 0
-    duration_ms: float = 0
-    throughput_chars_per_sec: float = 0
-    avg_gap_ms: float = 0
-    p95_gap_ms: float = 0
-    stalls: int = 0  # Gaps > 500ms
-    stall_time_ms: float = 0
-
-
-@dataclass
-class TestMetrics:
-    """Metrics collected during a test run."""
-    name: str
-    prompt_type: str
-    prompt: str
-    success: bool = False
-    error: str = None
-
-    # Timing metrics (in milliseconds)
-    total_time_ms: float = 0
-    time_to_first_event_ms: float = 0
-    time_to_first_content_ms: float = 0
-    time_to_complete_ms: float = 0
-
-    # Tool metrics
-    tool_calls: int = 0
-    tool_call_time_ms: float = 0
-    tool_calls_detail: List[ToolCallDetail] = field(default_factory=list)
-
-    # Response metrics
-    response_chars: int = 0
-    response_tokens_approx: int = 0
-
-    # Token usage (for cost calculation)
-    input_tokens: int = 0
-    output_tokens: int = 0
-    total_tokens: int = 0
-
-    # Event counts
-    total_events: int = 0
-    event_types: set = field(default_factory=set)
-
-    # Streaming performance
-    streaming: Optional[StreamingMetrics] = None
-
-    # The actual response
-    final_response: str = ""
-
-    # === NEW: Feature detection ===
-    has_thinking: bool = False
-    has_artifacts: bool = False
-    has_hitl: bool = False
-    has_state_snapshot: bool = False
-    has_error_events: bool = False
-    thinking_time_ms: float = 0
-    hitl_response_time_ms: float = 0
-
-    # Multi-turn tracking
-    is_multi_turn: bool = False
-    turn_count: int = 1
-    context_retained: bool = False
-
-
 class HITLMockHandler:
     """Handles Human-in-the-Loop emulation for testing."""
 
@@ -558,19 +502,6 @@ class HITLMockHandler:
             return {"input": "I don't know"}
 
 
-def parse_sse_events(text: str) -> List[Dict[str, Any]]:
-    """Parse SSE formatted text into list of events."""
-    events = []
-    for line in text.split("\n"):
-        if line.startswith("data: "):
-            try:
-                data = json.loads(line[6:])
-                events.append(data)
-            except json.JSONDecodeError:
-                pass
-    return events
-
-
 async def check_health(client: httpx.AsyncClient, name: str, config: dict) -> bool:
     """Check if agent is healthy."""
     try:
@@ -584,15 +515,14 @@ async def check_health(client: httpx.AsyncClient, name: str, config: dict) -> bo
 
 def save_test_data(run_dir: Path, agent_name: str, run_num: int,
                    prompt_type: str, request_body: dict,
-                   events: List[Dict[str, Any]], metrics: TestMetrics):
+                   events: List[StreamEvent], metrics: TestMetrics,
+                   start_ns: int = 0, turn: int = 0):
     """Save test request, streaming response, and metadata to disk."""
-    # Create agent directory
-    agent_dir = run_dir / agent_name
-    agent_dir.mkdir(exist_ok=True)
-
-    # Create test directory
-    test_dir = agent_dir / f"run{run_num}-{prompt_type}"
-    test_dir.mkdir(exist_ok=True)
+    # Create test directory (one subdirectory per turn of a conversation)
+    test_dir = run_dir / agent_name / f"run{run_num}-{prompt_type}"
+    if turn:
+        test_dir = test_dir / f"turn{turn}"
+    test_dir.mkdir(parents=True, exist_ok=True)
 
     # Save request payload
     with open(test_dir / "request.json", "w") as f:
@@ -601,16 +531,24 @@ def save_test_data(run_dir: Path, agent_name: str, run_num: int,
     # Save streaming events as JSONL (JSON Lines - one event per line)
     with open(test_dir / "response.jsonl", "w") as f:
         for event in events:
-            f.write(json.dumps(event) + "\n")
+            f.write(json.dumps(event.to_record(start_ns)) + "\n")
 
     # Save test metadata
+    framing = metrics.read_framing
     metadata = {
         "agent": agent_name,
         "run_number": run_num,
         "prompt_type": prompt_type,
         "prompt": metrics.prompt,
+        "request_bytes": metrics.request_bytes,
         "success": metrics.success,
         "error": metrics.error,
+        "failure": {
+            "kind": metrics.failure,
+            "partial": metrics.total_events > 0,  # response.jsonl holds the events before the abort
+            "events_received": metrics.total_events,
+            "chars_received": metrics.response_chars,
+        } if metrics.failure else None,
         "timing": {
             "total_time_ms": metrics.total_time_ms,
             "time_to_first_event_ms": metrics.time_to_first_event_ms,
@@ -644,11 +582,57 @@ def save_test_data(run_dir: Path, agent_name: str, run_num: int,
             "input_tokens": metrics.input_tokens,
             "output_tokens": metrics.output_tokens,
             "total_tokens": metrics.total_tokens,
+            "timing": {
+                "generated_chars": metrics.token_timing.generated_chars,
+                "chars_per_token": metrics.token_timing.chars_per_token,
+                "decode_ms": metrics.token_timing.decode_ms,
+                "tpot_ms": metrics.token_timing.tpot_ms,
+                "output_tokens_per_sec": metrics.token_timing.output_tokens_per_sec,
+                "itl_ms": metrics.token_timing.itl_histogram.summary(),
+            } if metrics.token_timing else None,
         },
         "events": {
             "total_events": metrics.total_events,
             "event_types": sorted(list(metrics.event_types)),
         },
+        "run_error": {
+            "message": metrics.run_error,
+            "kind": classify_run_error(metrics.run_error),
+        } if metrics.run_error is not None else None,
+        "schedule": {
+            "queue_wait_ms": metrics.queue_wait_ms,
+            "throttle_wait_ms": metrics.throttle_wait_ms,
+            "in_flight_at_start": metrics.in_flight_at_start,
+        },
+        "connection": asdict(metrics.connection) if metrics.connection else None,
+        "client_noise": asdict(metrics.noise) if metrics.noise else None,
+        "phases": asdict(metrics.phases) if metrics.phases else None,
+        "wire": {
+            "bytes": metrics.wire.bytes,
+            "event_bytes": metrics.wire.event_bytes,
+            "payload_bytes": metrics.wire.payload_bytes,
+            "framing_bytes": metrics.wire.framing_bytes,
+            "other_bytes": metrics.wire.other_bytes,
+            "raw_event_bytes": metrics.wire.raw_event_bytes,
+            "bytes_per_char": metrics.wire.bytes_per_char,
+            "payload_bytes_per_char": metrics.wire.payload_bytes_per_char,
+            "by_type": {event_type: asdict(size)
+                        for event_type, size in sorted(metrics.wire.by_type.items())},
+        } if metrics.wire else None,
+        "read_framing": {
+            "reads": framing.reads,
+            "bytes": framing.bytes,
+            "bytes_per_read": framing.bytes_per_read.summary(),
+            "events_per_read": {str(k): v for k, v in sorted(framing.events_per_read.items())},
+            "max_events_per_read": framing.max_events_per_read,
+            "content_events": framing.content_events,
+            "content_reads": framing.content_reads,
+            "buffering_score": framing.buffering_score,
+            "burst_reads": framing.burst_reads,
+            "burst_events": framing.burst_events,
+            "max_held_ms": framing.max_held_ms,
+            "buffered": framing.buffered,
+        } if framing else None,
         "streaming": {
             "total_chars": metrics.streaming.total_chars,
             "total_chunks": metrics.streaming.total_chunks,
@@ -657,7 +641,8 @@ def save_test_data(run_dir: Path, agent_name: str, run_num: int,
             "avg_gap_ms": metrics.streaming.avg_gap_ms,
             "p95_gap_ms": metrics.streaming.p95_gap_ms,
             "stalls": metrics.streaming.stalls,
-            "stall_time_ms": metrics.streaming.stall_time_ms
+            "stall_time_ms": metrics.streaming.stall_time_ms,
+            "gap_ms": metrics.streaming.gap_histogram.summary() if metrics.streaming.gap_histogram else None,
         } if metrics.streaming else None
     }
 
@@ -676,73 +661,48 @@ def calculate_cost(model_id: str, input_tokens: int, output_tokens: int) -> floa
     return input_cost + output_cost
 
 
-def calculate_streaming_metrics(events: List[dict]) -> Optional[StreamingMetrics]:
-    """Calculate streaming performance metrics from events."""
-    import statistics
-
-    text_events = [e for e in events if e.get("type") == "TEXT_MESSAGE_CONTENT"]
-
-    if len(text_events) < 2:
-        return None
-
-    # Calculate gaps between text chunks
-    gaps = []
-    for i in range(1, len(text_events)):
-        prev_offset = text_events[i-1].get("_offset_ms", 0)
-        curr_offset = text_events[i].get("_offset_ms", 0)
-        gap_ms = curr_offset - prev_offset
-        if gap_ms > 0:
-            gaps.append(gap_ms)
-
-    if not gaps:
-        return None
-
-    # Identify stalls (gaps > 500ms)
-    stalls = [g for g in gaps if g > 500]
+def _append_event(events: List[StreamEvent], event: StreamEvent) -> bool:
+    """Keep an AG-UI event record, skipping non-JSON data such as [DONE]."""
+    if not event.is_json:
+        return False
+    event.index = len(events)
+    events.append(event)
+    return True
 
-    # Calculate throughput
-    total_chars = sum(len(e.get("delta", "")) for e in text_events)
-    first_offset = text_events[0].get("_offset_ms", 0)
-    last_offset = text_events[-1].get("_offset_ms", 0)
-    duration_ms = last_offset - first_offset
 
-    throughput_cps = 0
-    if duration_ms > 0:
-        throughput_cps = (total_chars / duration_ms) * 1000  # chars per second
-
-    # Calculate percentiles
-    avg_gap = statistics.mean(gaps) if gaps else 0
-    p95_gap = 0
-    if len(gaps) >= 20:
-        try:
-            p95_gap = statistics.quantiles(gaps, n=20)[18]  # 95th percentile
-        except:
-            p95_gap = max(gaps)
-    elif gaps:
-        p95_gap = max(gaps)
-
-    return StreamingMetrics(
-        total_chars=total_chars,
-        total_chunks=len(text_events),
-        duration_ms=duration_ms,
-        throughput_chars_per_sec=throughput_cps,
-        avg_gap_ms=avg_gap,
-        p95_gap_ms=p95_gap,
-        stalls=len(stalls),
-        stall_time_ms=sum(stalls)
-    )
+def _finish_partial(parser: Optional[SSEParser], pipeline: EventPipeline,
+                    events: List[StreamEvent]):
+    """Measure an aborted stream from the events received so far."""
+    end_ns = time.perf_counter_ns()
+    if parser is not None:
+        pipeline.process_flush([e for e in parser.flush(end_ns) if _append_event(events, e)])
+    pipeline.finish(end_ns)
 
 
 async def test_agent(client: httpx.AsyncClient, name: str, config: dict,
                      prompt_type: str, prompt: str, run_dir: Path = None,
-                     run_num: int = 1) -> TestMetrics:
-    """Test an agent with a prompt and collect detailed metrics."""
-    metrics = TestMetrics(name=name, prompt_type=prompt_type, prompt=prompt)
+                     run_num: int = 1, job: Optional[TestJob] = None,
+                     run_id: Optional[str] = None, thread_id: Optional[str] = None,
+                     messages: Optional[List[dict]] = None,
+                     timeouts: Optional[StreamTimeouts] = None, turn: int = 0) -> TestMetrics:
+    """Test an agent with a prompt and collect detailed metrics.
+
+    ``messages`` replaces the single user message with a full conversation
+    history (``prompt`` is then only recorded in the metrics), and ``turn``
+    saves the request under ``turn<N>/`` of its test directory. When a
+    ``timeouts`` limit fires the stream is aborted, and the events received
+    so far are still measured and saved.
+    """
+    metrics = TestMetrics(name=name, prompt_type=prompt_type, prompt=prompt, run_num=run_num)
+    if job is not None:
+        metrics.queue_wait_ms = job.queue_wait_ms
+        metrics.throttle_wait_ms = job.throttle_wait_ms
+        metrics.in_flight_at_start = job.in_flight_at_start
 
     request_body = {
-        "thread_id": f"test-thread-{name}",
-        "run_id": f"test-run-{name}-{prompt_type}",
-        "messages": [{
+        "thread_id": thread_id or f"test-thread-{name}",
+        "run_id": run_id or f"test-run-{name}-{prompt_type}",
+        "messages": messages or [{
             "id": "msg-1",
             "role": "user",
             "content": prompt
@@ -757,177 +717,255 @@ async def test_agent(client: httpx.AsyncClient, name: str, config: dict,
     if "model_override" in config:
         request_body["model"] = config["model_override"]
 
-    start_time = time.perf_counter()
-    first_event_time = None
-    first_content_time = None
-    tool_start_time = None
+    start_ns = time.perf_counter_ns()
+    tracer = ConnectionTracer(start_ns)
     events = []  # Store all events for saving
+    pipeline = EventPipeline(metrics, start_ns)
+    guard = StallGuard(timeouts or StreamTimeouts(), pipeline.ctx)
+    response = None
+    parser = None  # Set once the response body starts streaming
 
     try:
-        async with client.stream(
+        request = client.build_request(
             "POST",
             config["url"],
             json=request_body,
             headers={"Accept": "text/event-stream"},
-            timeout=120.0
-        ) as response:
-            # Check HTTP status code
-            if response.status_code != 200:
-                metrics.error = f"HTTP {response.status_code}: {response.reason_phrase}"
-                metrics.total_time_ms = (time.perf_counter() - start_time) * 1000
-                return metrics
-
-            full_text = ""
-            async for chunk in response.aiter_text():
-                current_time = time.perf_counter()
-                full_text += chunk
-
-                if first_event_time is None and chunk.strip():
-                    first_event_time = current_time
-
-            end_time = time.perf_counter()
-
-            events = parse_sse_events(full_text)
-            metrics.total_events = len(events)
-            metrics.event_types = {e.get("type") for e in events if "type" in e}
-
-            # Add timestamps to all events
-            for i, event in enumerate(events):
-                event["_timestamp"] = start_time + (i * 0.001)  # Approximate timestamp
-                event["_offset_ms"] = i * 1.0  # Approximate offset
-                event["_index"] = i
-
-            response_parts = []
-            tool_calls_map = {}  # Track tool calls by ID
-
-            for event in events:
-                event_type = event.get("type", "")
-
-                if event_type == "TEXT_MESSAGE_CONTENT" and first_content_time is None:
-                    first_content_time = time.perf_counter()
-
-                if event_type == "TEXT_MESSAGE_CONTENT":
-                    delta = event.get("delta", "")
-                    response_parts.append(delta)
-
-                # Extract token usage from various event types
-                # Different frameworks report usage in different places
-
-                # Check for USAGE_METADATA event (raw API wrappers)
-                if event_type == "USAGE_METADATA":
-                    metrics.input_tokens = max(metrics.input_tokens, event.get("input_tokens", 0))
-                    metrics.output_tokens = max(metrics.output_tokens, event.get("output_tokens", 0))
-                    metrics.total_tokens = max(metrics.total_tokens, event.get("total_tokens", 0))
-
-                # Check for usage_metadata field (some frameworks)
-                if "usage_metadata" in event:
-                    usage = event["usage_metadata"]
-                    if isinstance(usage, dict):
-                        metrics.input_tokens = max(metrics.input_tokens, usage.get("input_tokens", 0))
-                        metrics.output_tokens = max(metrics.output_tokens, usage.get("output_tokens", 0))
-                        metrics.total_tokens = max(metrics.total_tokens, usage.get("total_tokens", 0))
-
-                # Check for usage in rawEvent (LangGraph pattern)
-                if "rawEvent" in event:
-                    raw = event["rawEvent"]
-                    if isinstance(raw, dict) and "data" in raw:
-                        data = raw["data"]
-                        if isinstance(data, dict):
-                            # LangGraph usage_metadata in chunk
-                            if "chunk" in data:
-                                chunk = data["chunk"]
-                                if isinstance(chunk, dict) and "usage_metadata" in chunk:
-                                    usage = chunk["usage_metadata"]
-                                    if isinstance(usage, dict):
-                                        metrics.input_tokens = max(metrics.input_tokens, usage.get("input_tokens", 0))
-                                        metrics.output_tokens = max(metrics.output_tokens, usage.get("output_tokens", 0))
-                                        metrics.total_tokens = max(metrics.total_tokens, usage.get("total_tokens", 0))
-                            # LangGraph usage_metadata in output
-                            if "output" in data:
-                                output = data["output"]
-                                if isinstance(output, dict) and "usage_metadata" in output:
-                                    usage = output["usage_metadata"]
-                                    if isinstance(usage, dict):
-                                        metrics.input_tokens = max(metrics.input_tokens, usage.get("input_tokens", 0))
-                                        metrics.output_tokens = max(metrics.output_tokens, usage.get("output_tokens", 0))
-                                        metrics.total_tokens = max(metrics.total_tokens, usage.get("total_tokens", 0))
-
-                elif event_type == "MESSAGES_SNAPSHOT":
-                    messages = event.get("messages", [])
-                    for msg in reversed(messages):
-                        if isinstance(msg, dict) and msg.get("role") == "assistant":
-                            content = msg.get("content", "")
-                            if content and content not in response_parts:
-                                response_parts.append(content)
-                                if first_content_time is None:
-                                    first_content_time = time.perf_counter()
-                            break
-
-                elif event_type == "TOOL_CALL_START":
-                    metrics.tool_calls += 1
-                    tool_call_id = event.get("toolCallId", f"tool_{metrics.tool_calls}")
-                    tool_name = event.get("toolCallName", "unknown")
-                    offset_ms = event.get("_offset_ms", 0)
-
-                    tool_detail = ToolCallDetail(
-                        tool_call_id=tool_call_id,
-                        name=tool_name,
-                        start_ms=offset_ms
-                    )
-                    tool_calls_map[tool_call_id] = tool_detail
-                    metrics.tool_calls_detail.append(tool_detail)
-
-                elif event_type == "TOOL_CALL_END":
-                    tool_call_id = event.get("toolCallId", "")
-                    if tool_call_id in tool_calls_map:
-                        offset_ms = event.get("_offset_ms", 0)
-                        tool_calls_map[tool_call_id].end_ms = offset_ms
-
-                elif event_type == "TOOL_CALL_RESULT":
-                    tool_call_id = event.get("toolCallId", "")
-                    if tool_call_id in tool_calls_map:
-                        offset_ms = event.get("_offset_ms", 0)
-                        tool_calls_map[tool_call_id].result_ms = offset_ms
-                        tool_calls_map[tool_call_id].result = event.get("result", "")
-                        tool_calls_map[tool_call_id].success = True
-                        # Update aggregate time
-                        duration = tool_calls_map[tool_call_id].duration_ms
-                        if duration > 0:
-                            metrics.tool_call_time_ms += duration
-
-            metrics.final_response = "".join(response_parts)
-            metrics.response_chars = len(metrics.final_response)
-            metrics.response_tokens_approx = metrics.response_chars // 4
-
-            # Calculate streaming performance metrics
-            metrics.streaming = calculate_streaming_metrics(events)
-
-            metrics.total_time_ms = (end_time - start_time) * 1000
-            if first_event_time:
-                metrics.time_to_first_event_ms = (first_event_time - start_time) * 1000
-            if first_content_time:
-                metrics.time_to_first_content_ms = (first_content_time - start_time) * 1000
-            metrics.time_to_complete_ms = metrics.total_time_ms
+            timeout=guard.timeouts.httpx_timeout(),
+            extensions=tracer.extensions,
+        )
+        metrics.request_bytes = len(request.content)
+        response = await guard.send(client, request)
+
+        # Check HTTP status code; an error response is saved like any other failure
+        if response.status_code != 200:
+            metrics.error = f"HTTP {response.status_code}: {response.reason_phrase}"
+            metrics.failure = RATE_LIMITED if response.status_code == 429 else HTTP_ERROR
+            metrics.total_time_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        else:
+            # Decode events as each network read arrives and run the metric
+            # processors inline, so every event carries its real arrival time
+            parser = SSEParser()
+            async for chunk in guard.read(response.aiter_bytes()):
+                arrival_ns = time.perf_counter_ns()
+                tracer.mark_first_byte(arrival_ns)
+                completed = [e for e in parser.feed(chunk, arrival_ns) if _append_event(events, e)]
+                pipeline.process_read(arrival_ns, len(chunk), completed)
+
+            end_ns = time.perf_counter_ns()
+            pipeline.process_flush([e for e in parser.flush(end_ns) if _append_event(events, e)])
+
+            pipeline.finish(end_ns)
 
             # Validate we got meaningful events
             if metrics.total_events == 0:
                 metrics.error = "No AG-UI events received"
+                metrics.failure = PROTOCOL_ERROR
+            elif metrics.run_error is not None and classify_run_error(metrics.run_error) == RATE_LIMITED:
+                # The provider refused the request; not the framework's latency or failure
+                metrics.error = f"Rate limited upstream: {metrics.run_error}"
+                metrics.failure = RATE_LIMITED
             elif not metrics.event_types or "RUN_STARTED" not in metrics.event_types:
                 metrics.error = "Missing required RUN_STARTED event"
+                metrics.failure = PROTOCOL_ERROR
             else:
                 metrics.success = True
 
-    except Exception as e:
+    except StreamTimeout as e:
+        # Abort, but keep the partial stream's metrics and events
+        _finish_partial(parser, pipeline, events)
         metrics.error = str(e)
-        metrics.total_time_ms = (time.perf_counter() - start_time) * 1000
+        metrics.failure = e.kind
+    except Exception as e:
+        if parser is not None:
+            # Dropped mid-stream: measure what arrived, like a timeout abort
+            _finish_partial(parser, pipeline, events)
+        else:
+            metrics.total_time_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        metrics.error = str(e) or type(e).__name__
+        metrics.failure = classify_exception(e)
+    finally:
+        if response is not None:
+            await response.aclose()
+
+    metrics.connection = tracer.timing()
+    monitor = harness_noise.current()
+    if monitor is not None and monitor.recording:
+        metrics.noise = monitor.measure(start_ns, time.perf_counter_ns())
 
     # Save test data if run_dir is provided
     if run_dir and run_num:
-        save_test_data(run_dir, name, run_num, prompt_type, request_body, events, metrics)
+        save_test_data(run_dir, name, run_num, prompt_type, request_body, events, metrics, start_ns,
+                       turn=turn)
+
+    return metrics
+
+
+def get_prompt(test_config: Any) -> Any:
+    """Extract the prompt string from a TEST_PROMPTS entry (a conversation's last user turn)."""
+    if isinstance(test_config, dict) and "prompt" in test_config:
+        return test_config["prompt"]
+    if isinstance(test_config, dict) and "messages" in test_config:
+        return get_user_turns(test_config)[-1]
+    return test_config  # Fallback for simple string prompts
+
+
+def get_user_turns(test_config: dict) -> List[str]:
+    """The user messages of a ``type: multi`` TEST_PROMPTS entry, one per turn."""
+    return [m["content"] for m in test_config["messages"] if m.get("role", "user") == "user"]
+
+
+async def run_conversation(client: httpx.AsyncClient, name: str, config: dict,
+                           prompt_type: str, turns: List[str], run_dir: Path = None,
+                           run_num: int = 1, job: Optional[TestJob] = None,
+                           timeouts: Optional[StreamTimeouts] = None,
+                           expect: Optional[str] = None) -> TestMetrics:
+    """Hold a real multi-turn conversation: one request per user turn.
+
+    Each request carries the whole history so far, the agent's earlier
+    answers included, on one thread_id. The returned metrics are those of
+    the last request (the turn that depends on the history) with every
+    turn in ``turns``; token counts are summed over the conversation so
+    cost covers all of it. A failed turn ends the conversation.
+    """
+    thread_id = f"test-thread-{name}-{prompt_type}-run{run_num}"
+    messages: List[dict] = []
+    turn_metrics: List[TurnMetrics] = []
+    metrics = None
+    for turn, content in enumerate(turns, start=1):
+        messages.append({"id": f"msg-{len(messages) + 1}", "role": "user", "content": content})
+        metrics = await test_agent(client, name, config, prompt_type, content, run_dir, run_num,
+                                   job=job, run_id=f"test-run-{name}-{prompt_type}-turn{turn}",
+                                   thread_id=thread_id, messages=list(messages),
+                                   timeouts=timeouts, turn=turn)
+        turn_metrics.append(TurnMetrics(
+            turn=turn,
+            history_messages=len(messages),
+            request_bytes=metrics.request_bytes,
+            success=metrics.success,
+            ttfb_ms=metrics.time_to_first_event_ms,
+            ttfc_ms=metrics.time_to_first_content_ms,
+            total_ms=metrics.total_time_ms,
+            response_chars=metrics.response_chars,
+            input_tokens=metrics.input_tokens,
+            output_tokens=metrics.output_tokens,
+            error=metrics.error,
+        ))
+        if not metrics.success:
+            metrics.error = f"Turn {turn}/{len(turns)}: {metrics.error}"
+            break
+        messages.append({"id": f"msg-{len(messages) + 1}", "role": "assistant",
+                         "content": metrics.final_response})
+
+    metrics.is_multi_turn = True
+    metrics.turn_count = len(turn_metrics)
+    metrics.turns = turn_metrics
+    metrics.input_tokens = sum(t.input_tokens for t in turn_metrics)
+    metrics.output_tokens = sum(t.output_tokens for t in turn_metrics)
+    metrics.total_tokens = metrics.input_tokens + metrics.output_tokens
+    if expect and metrics.success:
+        metrics.context_retained = expect.lower() in metrics.final_response.lower()
 
+    if run_dir and run_num:
+        save_conversation_data(run_dir, name, run_num, prompt_type, metrics)
     return metrics
 
 
+def save_conversation_data(run_dir: Path, agent_name: str, run_num: int,
+                           prompt_type: str, metrics: TestMetrics):
+    """Save the conversation's result next to its ``turn<N>/`` directories.
+
+    The test directory holds the last turn's request and response, so
+    reports read a conversation like any other test, and its metadata adds
+    the per-turn timings and payload sizes.
+    """
+    test_dir = run_dir / agent_name / f"run{run_num}-{prompt_type}"
+    test_dir.mkdir(parents=True, exist_ok=True)
+    last_dir = test_dir / f"turn{metrics.turn_count}"
+    for filename in ("request.json", "response.jsonl"):
+        if (last_dir / filename).exists():
+            shutil.copyfile(last_dir / filename, test_dir / filename)
+    if (last_dir / "metadata.json").exists():
+        with open(last_dir / "metadata.json") as f:
+            metadata = json.load(f)
+    else:
+        # Nothing was saved for the last turn; the per-turn timings still are
+        metadata = {
+            "agent": agent_name,
+            "run_number": run_num,
+            "prompt_type": prompt_type,
+            "prompt": metrics.prompt,
+            "success": metrics.success,
+            "failure": {"kind": metrics.failure} if metrics.failure else None,
+            "tokens": {},
+        }
+
+    metadata["error"] = metrics.error
+    metadata["tokens"].update(input_tokens=metrics.input_tokens, output_tokens=metrics.output_tokens,
+                              total_tokens=metrics.total_tokens)
+    metadata["conversation"] = {
+        "turn_count": metrics.turn_count,
+        "context_retained": metrics.context_retained,
+        "turns": [asdict(t) for t in metrics.turns],
+    }
+    with open(test_dir / "metadata.json", "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def build_jobs(agents: Dict[str, dict], num_runs: int,
+               prompt_types: Optional[List[str]] = None) -> List[TestJob]:
+    """Create one job per run x agent x prompt, in run-major order."""
+    jobs = []
+    for run_num in range(1, num_runs + 1):
+        for name, config in agents.items():
+            for prompt_type, test_config in TEST_PROMPTS.items():
+                if prompt_types and prompt_type not in prompt_types:
+                    continue
+                jobs.append(TestJob(
+                    name=name,
+                    config=config,
+                    prompt_type=prompt_type,
+                    prompt=get_prompt(test_config),
+                    run_num=run_num,
+                    provider=MODEL_PROVIDERS.get(config.get("model"), config.get("model", "")),
+                ))
+    return jobs
+
+
+def describe_schedule(schedule: ScheduleConfig) -> str:
+    """One-line description of the scheduling setup for the console."""
+    parts = [schedule.mode]
+    if schedule.mode == "sequential":
+        parts.append("1 in flight")
+    elif schedule.concurrency > 0:
+        parts.append(f"max {schedule.concurrency} in flight")
+    else:
+        parts.append("unbounded")
+    for label, limit in (("agent", schedule.per_agent), ("port", schedule.per_port),
+                         ("provider", schedule.per_provider)):
+        if limit > 0:
+            parts.append(f"{limit}/{label}")
+    return ", ".join(parts)
+
+
+def print_run_results(run_num: int, agent_results: Dict[str, List[TestMetrics]],
+                      healthy_agents: Dict[str, dict], num_runs: int = NUM_RUNS):
+    """Print the per-agent results of one completed run, grouped by model."""
+    print(f"\n  === Run {run_num}/{num_runs} ===")
+    for model_key in MODELS.keys():
+        model_agents = [n for n in healthy_agents if healthy_agents[n].get("model") == model_key]
+        if not model_agents:
+            continue
+
+        print(f"\n  [{model_key.upper()}]")
+        for name in model_agents:
+            agent_res = agent_results[name]
+            passed = sum(1 for r in agent_res if r.success)
+            times = [f"{r.total_time_ms:.0f}ms" for r in agent_res]
+            status = "✅" if passed == len(agent_res) else "⚠️"
+            print(f"    {status} {name}: {passed}/{len(agent_res)} ({', '.join(times)})")
+
+
 def median(values: List[float]) -> float:
     """Calculate median of a list of values."""
     if not values:
@@ -935,7 +973,145 @@ def median(values: List[float]) -> float:
     return statistics.median(values)
 
 
-def print_comparison_by_model(all_metrics: Dict[str, List[TestMetrics]]):
+# (column label, PhaseTiming field) in the order the phases happen
+PHASES = (
+    ("→RUN_START", "run_started_ms"),
+    ("→Model", "model_start_ms"),
+    ("Tool args", "tool_args_ms"),
+    ("Tool exec", "tool_exec_ms"),
+    ("Post-tool", "post_tool_ms"),
+    ("→FINISHED", "finish_ms"),
+)
+
+
+def build_latency_aggregator(all_metrics: Dict[str, List[TestMetrics]]) -> LatencyAggregator:
+    """Histogram every successful test per agent, prompt type and model."""
+    latency = LatencyAggregator()
+    for name, metrics_list in all_metrics.items():
+        model = AGENTS.get(name, {}).get("model", "unknown")
+        for m in metrics_list:
+            if not m.success:
+                continue
+            keys = {"agent": name, "prompt": m.prompt_type, "model": model}
+            latency.record(keys, "total_ms", m.total_time_ms)
+            # 0 means the event never arrived, not an instant response
+            latency.record(keys, "ttfb_ms", m.time_to_first_event_ms or None)
+            latency.record(keys, "ttfc_ms", m.time_to_first_content_ms or None)
+            if m.streaming and m.streaming.gap_histogram:
+                latency.record_histogram(keys, "chunk_gap_ms", m.streaming.gap_histogram)
+            if m.phases:
+                for _, metric in PHASES:
+                    latency.record(keys, metric, getattr(m.phases, metric))
+            if m.token_timing:
+                latency.record(keys, "tpot_ms", m.token_timing.tpot_ms)
+                latency.record(keys, "output_tokens_per_sec", m.token_timing.output_tokens_per_sec)
+                latency.record_histogram(keys, "itl_ms", m.token_timing.itl_histogram)
+    return latency
+
+
+# Confidence level for ranking intervals and tier significance tests
+RANKING_LEVEL = 0.95
+
+
+def build_ranking(all_metrics: Dict[str, List[TestMetrics]]) -> Dict[str, Any]:
+    """Rank agents by median total time with bootstrap CIs and significance tiers.
+
+    Agents in the same tier are statistically indistinguishable on total
+    time; ``intervals`` holds the CI of every agent's median total, TTFB
+    and TTFC.
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {metric: {} for metric in CI_METRICS}
+    for name, metrics_list in all_metrics.items():
+        successful = [m for m in metrics_list if m.success]
+        for metric, field in CI_METRICS.items():
+            # 0 means the event never arrived, not an instant response
+            values = [getattr(m, field) for m in successful if getattr(m, field)]
+            if values:
+                samples[metric][name] = values
+
+    tiers = rank_tiers(samples["total"], level=RANKING_LEVEL)
+    intervals = {}
+    for row in tiers:
+        intervals[row["name"]] = {
+            "total_ms": {k: row[k] for k in ("n", "median", "ci_low", "ci_high")},
+            "ttfb_ms": median_ci(samples["ttfb"].get(row["name"], []), RANKING_LEVEL),
+            "ttfc_ms": median_ci(samples["ttfc"].get(row["name"], []), RANKING_LEVEL),
+        }
+    return {
+        "metric": "total_ms",
+        "level": RANKING_LEVEL,
+        "test": "Mann-Whitney U vs previous rank and tier leader",
+        "tiers": tiers,
+        "intervals": intervals,
+    }
+
+
+def format_ci(low: Optional[float], high: Optional[float]) -> str:
+    return f"{low:.0f}-{high:.0f}ms" if low is not None else "n/a"
+
+
+def print_latency_percentiles(latency: LatencyAggregator):
+    """Print full latency distributions per prompt type and per model."""
+    for dimension, title in (("prompt", "PROMPT TYPE"), ("model", "MODEL")):
+        print("\n" + "=" * 120)
+        print(f"LATENCY PERCENTILES BY {title}")
+        print("=" * 120)
+        print(f"\n  {'Group':<20} {'Metric':<8} {'Count':>6} {'Min':>9} {'p50':>9} {'p90':>9} "
+              f"{'p99':>9} {'p99.9':>9} {'Max':>9}")
+        print(f"  {'-' * 100}")
+        for key in latency.keys(dimension):
+            summary = latency.summary(dimension, key)
+            for label, metric in (("Total", "total_ms"), ("TTFB", "ttfb_ms"),
+                                  ("TTFC", "ttfc_ms"), ("Gap", "chunk_gap_ms")):
+                stats = summary[metric]
+                if not stats["count"]:
+                    continue
+                print(f"  {key if label == 'Total' else '':<20} {label:<8} {stats['count']:>6} "
+                      f"{stats['min']:>7.0f}ms {stats['p50']:>7.0f}ms {stats['p90']:>7.0f}ms "
+                      f"{stats['p99']:>7.0f}ms {stats['p99.9']:>7.0f}ms {stats['max']:>7.0f}ms")
+
+
+def print_phase_breakdown(latency: LatencyAggregator):
+    """Print the median of every run phase per agent."""
+    print("\n" + "=" * 120)
+    print("PHASE BREAKDOWN BY AGENT (p50 over runs in which the phase occurred)")
+    print("=" * 120)
+    print(f"\n  {'Agent':<28} {'Total':>9}" + "".join(f" {label:>11}" for label, _ in PHASES))
+    print(f"  {'-' * 110}")
+
+    summaries = latency.summaries("agent")
+    for name, summary in sorted(summaries.items(), key=lambda item: item[1]["total_ms"]["p50"]):
+        cells = []
+        for _, metric in PHASES:
+            stats = summary[metric]
+            cells.append(f"{stats['p50']:>9.0f}ms" if stats["count"] else f"{'-':>11}")
+        print(f"  {name:<28} {summary['total_ms']['p50']:>7.0f}ms " + " ".join(cells))
+
+    print("\n  →RUN_START: request to RUN_STARTED   →Model: RUN_STARTED to first text/thinking/tool event")
+    print("  Post-tool: tool result to the model's next event   →FINISHED: last content to RUN_FINISHED")
+
+
+def print_token_timing(latency: LatencyAggregator):
+    """Print output-token throughput, TPOT and inter-token latency per agent and per model."""
+    for dimension, title in (("agent", "AGENT"), ("model", "MODEL")):
+        rows = [(key, latency.summary(dimension, key)) for key in latency.keys(dimension)]
+        rows = [(key, summary) for key, summary in rows if summary["tpot_ms"]["count"]]
+        if not rows:
+            continue
+        print("\n" + "=" * 120)
+        print(f"TOKEN TIMING BY {title} (runs reporting usage)")
+        print("=" * 120)
+        print(f"\n  {'Group':<30} {'Runs':>5} {'Tok/s p50':>10} {'TPOT p50':>10} {'TPOT p90':>10} "
+              f"{'ITL p50':>10} {'ITL p90':>10} {'ITL p99':>10}")
+        print(f"  {'-' * 100}")
+        rows.sort(key=lambda row: row[1]["tpot_ms"]["p50"])
+        for key, summary in rows:
+            tps, tpot, itl = summary["output_tokens_per_sec"], summary["tpot_ms"], summary["itl_ms"]
+            print(f"  {key:<30} {tpot['count']:>5} {tps['p50']:>10.0f} {tpot['p50']:>8.1f}ms "
+                  f"{tpot['p90']:>8.1f}ms {itl['p50']:>8.1f}ms {itl['p90']:>8.1f}ms {itl['p99']:>8.1f}ms")
+
+
+def print_comparison_by_model(all_metrics: Dict[str, List[TestMetrics]], latency: LatencyAggregator):
     """Print comparison tables grouped by model (same model, different frameworks)."""
     print("\n" + "=" * 120)
     print("COMPARISON BY MODEL (Same model, different frameworks)")
@@ -965,13 +1141,16 @@ def print_comparison_by_model(all_metrics: Dict[str, List[TestMetrics]]):
                 continue
 
             config = AGENTS[name]
+            summary = latency.summary("agent", name)
             agent_stats.append({
                 "name": name,
                 "framework": config.get("framework", name),
                 "type": config.get("type", "unknown"),
-                "median_time": median([m.total_time_ms for m in successful]),
-                "ttfb": median([m.time_to_first_event_ms for m in successful]),
-                "ttfc": median([m.time_to_first_content_ms for m in successful]),
+                "median_time": summary["total_ms"]["p50"],
+                "p90_time": summary["total_ms"]["p90"],
+                "p99_time": summary["total_ms"]["p99"],
+                "ttfb": summary["ttfb_ms"]["p50"],
+                "ttfc": summary["ttfc_ms"]["p50"],
                 "tools": sum(m.tool_calls for m in successful),
                 "chars": median([m.response_chars for m in successful]),
                 "tests": len(successful),
@@ -984,11 +1163,12 @@ def print_comparison_by_model(all_metrics: Dict[str, List[TestMetrics]]):
         # Sort by median time
         agent_stats.sort(key=lambda x: x["median_time"])
 
-        print(f"\n  {'Framework':<20} {'Type':<10} {'Median':<10} {'TTFB':<10} {'TTFC':<10} {'Tests':<8}")
-        print(f"  {'-' * 78}")
+        print(f"\n  {'Framework':<20} {'Type':<10} {'p50':<10} {'p90':<10} {'p99':<10} {'TTFB':<10} {'TTFC':<10} {'Tests':<8}")
+        print(f"  {'-' * 98}")
 
         for stat in agent_stats:
-            print(f"  {stat['framework']:<20} {stat['type']:<10} {stat['median_time']:>6.0f}ms  {stat['ttfb']:>6.0f}ms  {stat['ttfc']:>6.0f}ms  {stat['tests']:>4}")
+            print(f"  {stat['framework']:<20} {stat['type']:<10} {stat['median_time']:>6.0f}ms  {stat['p90_time']:>6.0f}ms  "
+                  f"{stat['p99_time']:>6.0f}ms  {stat['ttfb']:>6.0f}ms  {stat['ttfc']:>6.0f}ms  {stat['tests']:>4}")
 
         # Winner for this model
         if agent_stats:
@@ -996,7 +1176,7 @@ def print_comparison_by_model(all_metrics: Dict[str, List[TestMetrics]]):
             print(f"\n  🏆 Fastest {model_key}: {winner['framework']} ({winner['median_time']:.0f}ms)")
 
 
-def print_comparison_by_framework(all_metrics: Dict[str, List[TestMetrics]]):
+def print_comparison_by_framework(all_metrics: Dict[str, List[TestMetrics]], latency: LatencyAggregator):
     """Print comparison tables grouped by framework (same framework, different models)."""
     print("\n" + "=" * 120)
     print("COMPARISON BY FRAMEWORK (Same framework, different models)")
@@ -1027,12 +1207,14 @@ def print_comparison_by_framework(all_metrics: Dict[str, List[TestMetrics]]):
             if not successful:
                 continue
 
+            summary = latency.summary("agent", name)
             agent_stats.append({
                 "name": name,
                 "model": config.get("model", "unknown"),
                 "model_id": config.get("model_id", "unknown"),
-                "median_time": median([m.total_time_ms for m in successful]),
-                "ttfb": median([m.time_to_first_event_ms for m in successful]),
+                "median_time": summary["total_ms"]["p50"],
+                "p99_time": summary["total_ms"]["p99"],
+                "ttfb": summary["ttfb_ms"]["p50"],
                 "chars": median([m.response_chars for m in successful]),
                 "tests": len(successful),
             })
@@ -1043,58 +1225,57 @@ def print_comparison_by_framework(all_metrics: Dict[str, List[TestMetrics]]):
 
         agent_stats.sort(key=lambda x: x["median_time"])
 
-        print(f"\n  {'Model':<10} {'Model ID':<30} {'Median':<10} {'TTFB':<10} {'Resp Len':<10}")
-        print(f"  {'-' * 80}")
+        print(f"\n  {'Model':<10} {'Model ID':<30} {'p50':<10} {'p99':<10} {'TTFB':<10} {'Resp Len':<10}")
+        print(f"  {'-' * 90}")
 
         for stat in agent_stats:
-            print(f"  {stat['model']:<10} {stat['model_id']:<30} {stat['median_time']:>6.0f}ms  {stat['ttfb']:>6.0f}ms  {stat['chars']:>6.0f}")
+            print(f"  {stat['model']:<10} {stat['model_id']:<30} {stat['median_time']:>6.0f}ms  {stat['p99_time']:>6.0f}ms  "
+                  f"{stat['ttfb']:>6.0f}ms  {stat['chars']:>6.0f}")
 
 
-def print_overall_ranking(all_metrics: Dict[str, List[TestMetrics]]):
-    """Print overall ranking across all agents."""
+def print_overall_ranking(all_metrics: Dict[str, List[TestMetrics]], latency: LatencyAggregator,
+                          ranking: Dict[str, Any]):
+    """Print overall ranking across all agents, grouped into significance tiers."""
     print("\n" + "=" * 120)
     print("OVERALL RANKING (All framework+model combinations)")
     print("=" * 120)
 
-    agent_stats = []
-    for name, metrics_list in all_metrics.items():
-        successful = [m for m in metrics_list if m.success]
-        if not successful:
-            continue
-
-        config = AGENTS.get(name, {})
-        agent_stats.append({
-            "name": name,
-            "framework": config.get("framework", name),
-            "model": config.get("model", "unknown"),
-            "model_id": config.get("model_id", "unknown"),
-            "type": config.get("type", "unknown"),
-            "median_time": median([m.total_time_ms for m in successful]),
-            "ttfb": median([m.time_to_first_event_ms for m in successful]),
-            "ttfc": median([m.time_to_first_content_ms for m in successful]),
-            "tests": len(successful),
-            "passed": len(successful),
-            "total": len(metrics_list),
-        })
+    level = f"{ranking['level'] * 100:g}%"
+    print(f"\n{'Rank':<5} {'Tier':<5} {'Agent':<25} {'Framework':<15} {'p50':<8} {level + ' CI':<14} "
+          f"{'p90':<8} {'p99':<8} {'TTFB':<8} {'TTFC':<8} {'Tests':<8}")
+    print("-" * 120)
 
-    agent_stats.sort(key=lambda x: x["median_time"])
+    tier = None
+    for row in ranking["tiers"]:
+        name = row["name"]
+        if tier is not None and row["tier"] != tier:
+            print(f"{'':<11}{'·' * 40}")
+        tier = row["tier"]
 
-    print(f"\n{'Rank':<6} {'Agent':<25} {'Framework':<15} {'Model':<10} {'Median':<10} {'TTFB':<10} {'Tests':<8}")
-    print("-" * 100)
+        config = AGENTS.get(name, {})
+        summary = latency.summary("agent", name)
+        intervals = ranking["intervals"][name]
+        metrics_list = all_metrics.get(name, [])
+        passed = sum(1 for m in metrics_list if m.success)
+        print(f"{row['rank']:<5} {row['tier']:<5} {name:<25} {config.get('framework', name):<15} "
+              f"{row['median']:>6.0f}ms {format_ci(row['ci_low'], row['ci_high']):<14} "
+              f"{summary['total_ms']['p90']:>6.0f}ms {summary['total_ms']['p99']:>6.0f}ms "
+              f"{intervals['ttfb_ms']['median']:>6.0f}ms {intervals['ttfc_ms']['median']:>6.0f}ms "
+              f"{passed}/{len(metrics_list)}")
 
-    for i, stat in enumerate(agent_stats, 1):
-        print(f"{i:<6} {stat['name']:<25} {stat['framework']:<15} {stat['model']:<10} {stat['median_time']:>6.0f}ms  {stat['ttfb']:>6.0f}ms  {stat['passed']}/{stat['total']}")
+    print(f"\n  Agents in the same tier are not significantly different on total time "
+          f"(Mann-Whitney U, {level} confidence, bootstrap CIs of the median).")
 
 
 def print_test_breakdown(all_metrics: Dict[str, List[TestMetrics]]):
     """Print detailed breakdown by test type."""
     print("\n" + "-" * 120)
-    print(f"DETAILED BREAKDOWN BY TEST TYPE (Median of {NUM_RUNS} runs)")
+    print("DETAILED BREAKDOWN BY TEST TYPE (p50 across runs)")
     print("-" * 120)
 
     for prompt_type in TEST_PROMPTS.keys():
         print(f"\n📊 {prompt_type.upper()} TEST")
-        print(f"{'Agent':<25} {'Framework':<15} {'Model':<10} {'Median':<10} {'Tools':<8} {'Status':<8}")
+        print(f"{'Agent':<25} {'Framework':<15} {'Model':<10} {'p50':<10} {'Tools':<8} {'Status':<8}")
         print("-" * 90)
 
         type_results = []
@@ -1107,7 +1288,7 @@ def print_test_breakdown(all_metrics: Dict[str, List[TestMetrics]]):
             model = config.get("model", "unknown")
 
             if successful_runs:
-                median_time = median([m.total_time_ms for m in successful_runs])
+                median_time = latency_summary([m.total_time_ms for m in successful_runs])["p50"]
                 total_tools = sum(m.tool_calls for m in successful_runs)
                 type_results.append((name, framework, model, median_time, total_tools // len(successful_runs), True))
             elif runs:
@@ -1323,36 +1504,710 @@ def print_cost_breakdown(all_metrics: Dict[str, List[TestMetrics]]):
             print(f"\n📈 Estimated cost per 1,000 similar tests: ${cost_per_1k:.2f}")
 
 
-async def main():
-    print("🧪 AG-UI Multi-Framework Multi-Model Test Suite")
-    print("=" * 120)
-    print(f"Testing {len(AGENTS)} agent configurations across {len(MODELS)} models")
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="AG-UI multi-framework benchmark")
+    parser.add_argument("--mode", choices=["benchmark", *LOAD_MODES], default="benchmark",
+                        help="benchmark: fixed batch of all prompts (default); "
+                             "other modes drive the selected agents with a workload")
+    parser.add_argument("--agent", action="append", default=[], metavar="NAME",
+                        help="Only test this agent (repeatable)")
+    parser.add_argument("--model", action="append", default=[], choices=list(MODELS),
+                        help="Only test agents using this model (repeatable)")
+    parser.add_argument("--prompt-type", action="append", default=[], metavar="NAME",
+                        help="Only run this TEST_PROMPTS entry in benchmark mode (repeatable)")
+    parser.add_argument("--resume", type=Path, default=None, metavar="RUN_DIR",
+                        help="Continue a benchmark run: only run cells missing from or failed in "
+                             f"its {RESULTS_LOG}, then rebuild its summary")
+
+    sched = parser.add_argument_group("scheduling")
+    sched.add_argument("--schedule", choices=SCHEDULE_MODES, default="bounded",
+                       help="sequential: isolated latency; per-agent: one test per agent at a time; "
+                            "random: shuffled order; bounded: declaration order (default)")
+    sched.add_argument("--concurrency", type=int, default=16,
+                       help="Max tests in flight overall, 0 = unlimited (default: 16)")
+    sched.add_argument("--per-agent", type=int, default=0,
+                       help="Max tests in flight per agent, 0 = unlimited")
+    sched.add_argument("--per-port", type=int, default=0,
+                       help="Max tests in flight per agent server port, 0 = unlimited")
+    sched.add_argument("--per-provider", type=int, default=0,
+                       help="Max tests in flight per upstream provider, 0 = unlimited")
+    sched.add_argument("--seed", type=int, default=None,
+                       help="Random seed for --schedule random")
+    sched.add_argument("--rate-limit", action="store_true",
+                       help="Pace dispatch with per-provider request and token buckets (PROVIDER_LIMITS)")
+    sched.add_argument("--provider-limit", action="append", default=[], metavar="PROVIDER=RPM:TPM",
+                       help="Override one provider's limits, e.g. anthropic=50:40000 (implies --rate-limit)")
+
+    http = parser.add_argument_group("http client")
+    http.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                      help=f"Connection pool size, 0 = unlimited (default: {DEFAULT_MAX_CONNECTIONS})")
+    http.add_argument("--max-keepalive", type=int, default=DEFAULT_MAX_KEEPALIVE,
+                      help=f"Idle keep-alive connections kept in the pool (default: {DEFAULT_MAX_KEEPALIVE})")
+    http.add_argument("--processes", type=int, default=1,
+                      help="Worker processes, each with its own event loop and client (default: 1)")
+
+    adaptive = parser.add_argument_group("adaptive sampling")
+    adaptive.add_argument("--adaptive", action="store_true",
+                          help="Keep adding runs to each agent x prompt cell until its CI is tight enough")
+    adaptive.add_argument("--min-runs", type=int, default=NUM_RUNS,
+                          help=f"Runs every cell gets before the stopping rule applies (default: {NUM_RUNS})")
+    adaptive.add_argument("--max-runs", type=int, default=20,
+                          help="Run budget per cell (default: 20)")
+    adaptive.add_argument("--ci-metric", choices=list(CI_METRICS), default="total",
+                          help="Latency the confidence interval is computed on (default: total)")
+    adaptive.add_argument("--ci-percentile", type=float, default=50.0,
+                          help="Percentile whose CI is tracked (default: 50, the median)")
+    adaptive.add_argument("--ci-level", type=float, default=0.95,
+                          help="Confidence level (default: 0.95)")
+    adaptive.add_argument("--ci-target", type=float, default=0.2,
+                          help="Stop once CI width / estimate is at most this (default: 0.2)")
+    adaptive.add_argument("--cell-token-budget", type=int, default=0,
+                          help="Token budget per cell, 0 = unlimited (default: 0)")
+    adaptive.add_argument("--cell-cost-budget", type=float, default=0.0,
+                          help="Cost budget per cell in USD, 0 = unlimited (default: 0)")
+    adaptive.add_argument("--adaptive-batch", type=int, default=4,
+                          help="Max extra runs per cell per round (default: 4)")
+
+    noise = parser.add_argument_group("measurement noise")
+    noise.add_argument("--trace-gc", action="store_true",
+                       help="Record harness GC pauses and charge them to overlapping requests")
+    noise.add_argument("--loop-lag-tick", type=float, default=0.0, metavar="MS",
+                       help="Sample event-loop lag with a ticker every MS milliseconds (0 = off)")
+    noise.add_argument("--gc-freeze", action="store_true",
+                       help="gc.freeze() after setup so collections skip long-lived objects")
+
+    limits = parser.add_argument_group("timeouts (seconds, 0 disables)")
+    limits.add_argument("--connect-timeout", type=float, default=10.0,
+                        help="TCP/TLS connect to the agent (default: 10)")
+    limits.add_argument("--first-event-timeout", type=float, default=60.0,
+                        help="Request start to the first SSE event (default: 60)")
+    limits.add_argument("--first-content-timeout", type=float, default=90.0,
+                        help="Request start to the first text, while events still arrive (default: 90)")
+    limits.add_argument("--idle-timeout", type=float, default=30.0,
+                        help="Longest gap between events once streaming (default: 30)")
+    limits.add_argument("--total-timeout", type=float, default=300.0,
+                        help="Wall-clock cap per request (default: 300)")
+    limits.add_argument("--quarantine-after", type=int, default=3, metavar="N",
+                        help="Stop testing an agent after N consecutive timeouts (default: 3, 0 disables)")
+
+    warmup = parser.add_argument_group("warm-up")
+    warmup.add_argument("--warmup", type=int, default=0, metavar="N",
+                        help="Requests per agent before measuring; reported separately as cold metrics")
+    warmup.add_argument("--warmup-prompt", default="simple",
+                        help="TEST_PROMPTS entry used for warm-up requests (default: simple)")
+
+    add_load_arguments(parser)
+
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.agent if name not in AGENTS]
+    if unknown:
+        parser.error(f"unknown agent(s): {', '.join(unknown)}")
+    for prompt in (args.prompt, args.warmup_prompt, *args.prompt_type):
+        if prompt not in TEST_PROMPTS:
+            parser.error(f"unknown prompt: {prompt}")
+    for spec in args.provider_limit:
+        try:
+            parse_provider_limit(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.resume is not None:
+        if args.mode != "benchmark":
+            parser.error("--resume only applies to benchmark mode")
+        if not (args.resume / "run-metadata.json").exists():
+            parser.error(f"not a benchmark run directory: {args.resume}")
+    if args.processes > 1 and args.mode in ("sessions", "history", "ab"):
+        parser.error(f"--processes is not supported in {args.mode} mode")
+    if args.mode == "ab" and len(args.agent) != 2:
+        parser.error("ab mode compares exactly two agents: --agent A --agent B")
+    return args
+
+
+def adaptive_config_from_args(args: argparse.Namespace) -> AdaptiveConfig:
+    return AdaptiveConfig(
+        min_runs=args.min_runs,
+        max_runs=args.max_runs,
+        target_width=args.ci_target,
+        percentile=args.ci_percentile,
+        level=args.ci_level,
+        metric=args.ci_metric,
+        max_tokens=args.cell_token_budget,
+        max_cost=args.cell_cost_budget,
+        batch=args.adaptive_batch,
+    )
+
+
+def job_cost(job: TestJob, metrics: TestMetrics) -> float:
+    """USD cost of one test, from the agent's model pricing."""
+    return calculate_cost(job.config.get("model_id", ""), metrics.input_tokens, metrics.output_tokens)
 
-    # Create timestamped run directory
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    run_dir = BENCHMARK_RUNS_DIR / timestamp
-    run_dir.mkdir(parents=True, exist_ok=True)
-    print(f"\n📁 Saving detailed logs to: {run_dir}")
 
-    # Save run metadata
-    run_metadata = {
+def schedule_from_args(args: argparse.Namespace) -> ScheduleConfig:
+    return ScheduleConfig(
+        mode=args.schedule,
+        concurrency=args.concurrency,
+        per_agent=args.per_agent,
+        per_port=args.per_port,
+        per_provider=args.per_provider,
+        seed=args.seed,
+    )
+
+
+def rate_limiter_from_args(args: argparse.Namespace, share: int = 1) -> Optional[RateLimiter]:
+    """Provider buckets from PROVIDER_LIMITS and --provider-limit, or None when pacing is off."""
+    if not (args.rate_limit or args.provider_limit):
+        return None
+    limits = {provider: replace(limit) for provider, limit in PROVIDER_LIMITS.items()}
+    for spec in args.provider_limit:
+        provider, rpm, tpm = parse_provider_limit(spec)
+        limit = limits.setdefault(provider, ProviderLimit())
+        limit.rpm, limit.tpm = rpm, tpm
+    return RateLimiter(limits, share=share)
+
+
+def summarize_throttling(all_metrics: Dict[str, List[TestMetrics]]) -> Dict[str, Any]:
+    """Per-provider rate-limit wait and upstream rate-limit failures."""
+    providers: Dict[str, Dict[str, Any]] = {}
+    for name, metrics_list in all_metrics.items():
+        provider = MODEL_PROVIDERS.get(AGENTS.get(name, {}).get("model"), "unknown")
+        entry = providers.setdefault(provider, {"requests": 0, "throttled": 0, "rate_limited": 0,
+                                                "waits": []})
+        for m in metrics_list:
+            entry["requests"] += 1
+            entry["throttled"] += m.throttle_wait_ms >= 1  # Sub-ms is bucket bookkeeping
+            entry["rate_limited"] += m.failure == RATE_LIMITED
+            entry["waits"].append(m.throttle_wait_ms)
+    for entry in providers.values():
+        waits = entry.pop("waits")
+        entry["throttle_wait_ms"] = latency_summary(waits)
+        entry["total_wait_s"] = sum(waits) / 1000
+    return providers
+
+
+def print_throttle_report(throttling: Dict[str, Any]):
+    """Print how long each provider's requests were held back, and their 429s."""
+    print("\n" + "-" * 100)
+    print("PROVIDER RATE LIMITS (throttle wait is excluded from agent latency)")
+    print("-" * 100)
+    print(f"\n{'Provider':<14} {'Requests':>9} {'Throttled':>10} {'Wait p50':>10} {'Wait p99':>10} "
+          f"{'Total wait':>11} {'Rate-limited':>13}")
+    print("-" * 100)
+    for provider, entry in sorted(throttling.items()):
+        wait = entry["throttle_wait_ms"]
+        print(f"{provider:<14} {entry['requests']:>9} {entry['throttled']:>10} {wait['p50']:>8.0f}ms "
+              f"{wait['p99']:>8.0f}ms {entry['total_wait_s']:>10.1f}s {entry['rate_limited']:>13}")
+
+
+def start_noise_monitor(args: argparse.Namespace) -> Optional[harness_noise.NoiseMonitor]:
+    """Install and start this process's noise monitor, if any instrumentation is on.
+
+    Call it once setup is done: with ``--gc-freeze`` everything allocated so
+    far is frozen.
+    """
+    if not (args.trace_gc or args.loop_lag_tick > 0 or args.gc_freeze):
+        return None
+    monitor = harness_noise.install(harness_noise.NoiseMonitor(trace_gc=args.trace_gc,
+                                                               tick_ms=args.loop_lag_tick))
+    if args.gc_freeze:
+        monitor.freeze()
+    monitor.start()
+    return monitor
+
+
+def summarize_noise(all_metrics: Dict[str, List[TestMetrics]],
+                    monitor: harness_noise.NoiseMonitor) -> Dict[str, Any]:
+    """Harness pause statistics, noisy samples, and totals with the pauses removed."""
+    agents = {}
+    noisy_samples = []
+    for name, metrics_list in all_metrics.items():
+        measured = [m for m in metrics_list if m.success and m.noise]
+        if not measured:
+            continue
+        noisy = [m for m in measured if m.noise.noisy]
+        agents[name] = {
+            "runs": len(measured),
+            "noisy": len(noisy),
+            "pause_ms": latency_summary([m.noise.pause_ms for m in measured]),
+            "total_ms": latency_summary([m.total_time_ms for m in measured]),
+            # Upper bound on the harness's share: a pause only delays a
+            # request if its events were waiting to be read at the time
+            "corrected_total_ms": latency_summary(
+                [max(0.0, m.total_time_ms - m.noise.pause_ms) for m in measured]),
+        }
+        noisy_samples.extend({
+            "agent": name,
+            "prompt_type": m.prompt_type,
+            "run": m.run_num,
+            "total_ms": m.total_time_ms,
+            "pause_ms": m.noise.pause_ms,
+            "gc_ms": m.noise.gc_ms,
+            "loop_lag_ms": m.noise.loop_lag_ms,
+        } for m in noisy)
+    return {
+        "harness": monitor.summary(),
+        "agents": agents,
+        "noisy_samples": sorted(noisy_samples, key=lambda s: -s["pause_ms"]),
+    }
+
+
+def print_noise_report(noise: Dict[str, Any]):
+    """Print harness pauses and the requests they distorted."""
+    harness = noise["harness"]
+    print("\n" + "-" * 100)
+    print("CLIENT-SIDE NOISE (harness GC pauses and event-loop lag)")
+    print("-" * 100)
+    gc_pauses = harness["gc_pause_ms"]
+    if harness["trace_gc"]:
+        print(f"\n  GC: {gc_pauses['count']} collections, {harness['gc_total_ms']:.0f}ms total, "
+              f"p99 {gc_pauses['p99']:.1f}ms, max {gc_pauses['max']:.1f}ms "
+              f"(by generation: {harness['gc_by_generation'] or '-'})")
+    if harness["frozen_objects"]:
+        print(f"  gc.freeze(): {harness['frozen_objects']} objects frozen after setup")
+    lag = harness["loop_lag_ms"]
+    if lag:
+        print(f"  Loop lag ({harness['tick_ms']:g}ms ticker): p50 {lag['p50']:.2f}ms, "
+              f"p99 {lag['p99']:.2f}ms, max {lag['max']:.1f}ms")
+
+    print(f"\n{'Agent':<28} {'Noisy':>8} {'Pause p50':>10} {'Pause max':>10} "
+          f"{'Total p50':>10} {'Corrected p50':>14}")
+    print("-" * 100)
+    for name, entry in sorted(noise["agents"].items(), key=lambda item: -item[1]["noisy"]):
+        print(f"{name:<28} {entry['noisy']:>3}/{entry['runs']:<4} "
+              f"{entry['pause_ms']['p50']:>8.1f}ms {entry['pause_ms']['max']:>8.1f}ms "
+              f"{entry['total_ms']['p50']:>8.0f}ms {entry['corrected_total_ms']['p50']:>12.0f}ms")
+    if noise["noisy_samples"]:
+        threshold = harness["noisy_threshold"]
+        print(f"\n⚠️  {len(noise['noisy_samples'])} requests overlapped harness pauses of at least "
+              f"{threshold['share'] * 100:g}% of their time or {threshold['ms']:g}ms (see summary.json 'noise')")
+
+
+def timeouts_from_args(args: argparse.Namespace) -> StreamTimeouts:
+    return StreamTimeouts(
+        connect_s=args.connect_timeout,
+        first_event_s=args.first_event_timeout,
+        first_content_s=args.first_content_timeout,
+        idle_s=args.idle_timeout,
+        total_s=args.total_timeout,
+    )
+
+
+async def execute_job(client: httpx.AsyncClient, job: TestJob, run_dir: Path,
+                      timeouts: StreamTimeouts, quarantine: Quarantine) -> TestMetrics:
+    """Run one benchmark job unless its agent has been quarantined."""
+    if quarantine.blocked(job.name):
+        metrics = TestMetrics(name=job.name, prompt_type=job.prompt_type,
+                              prompt=job.prompt, run_num=job.run_num)
+        metrics.error = f"Not sent: quarantined after {quarantine.threshold} consecutive timeouts"
+        metrics.failure = QUARANTINED
+        return metrics
+
+    test_config = TEST_PROMPTS.get(job.prompt_type, {})
+    if test_config.get("type") == "multi":
+        metrics = await run_conversation(client, job.name, job.config, job.prompt_type,
+                                         get_user_turns(test_config), run_dir, job.run_num,
+                                         job=job, timeouts=timeouts, expect=test_config.get("expect"))
+    else:
+        metrics = await test_agent(client, job.name, job.config, job.prompt_type,
+                                   job.prompt, run_dir, job.run_num, job=job, timeouts=timeouts)
+    if quarantine.record(job.name, metrics.failure):
+        print(f"  🚧 {job.name}: quarantined for the rest of the run after "
+              f"{quarantine.threshold} consecutive timeouts (last: {metrics.failure})")
+    return metrics
+
+
+def make_load_sender(client: httpx.AsyncClient, name: str, config: dict,
+                     args: argparse.Namespace, run_prefix: Optional[str] = None):
+    """Build the ``send(seq, messages=None, thread_id=None)`` coroutine load modes drive."""
+    prompt = get_prompt(TEST_PROMPTS[args.prompt])
+    run_prefix = run_prefix or f"{args.mode}-{name}"
+    timeouts = timeouts_from_args(args)
+
+    async def send(seq: int, messages: Optional[List[dict]] = None,
+                   thread_id: Optional[str] = None) -> TestMetrics:
+        if messages:
+            return await test_agent(client, name, config, args.prompt, messages[-1]["content"],
+                                    run_id=f"{run_prefix}-{seq}",
+                                    thread_id=thread_id, messages=messages, timeouts=timeouts)
+        return await test_agent(client, name, config, args.prompt, prompt,
+                                run_id=f"{run_prefix}-{seq}", timeouts=timeouts)
+    return send
+
+
+async def run_warmup(client: httpx.AsyncClient, agents: Dict[str, dict],
+                     args: argparse.Namespace, run_dir: Path) -> Dict[str, List[TestMetrics]]:
+    """Send ``--warmup`` requests to every agent before anything is measured.
+
+    The first request to an agent pays for lazy imports, SDK client
+    construction and the upstream TLS handshake. Agents sharing a server are
+    warmed one after another, so each agent's first request is as cold as
+    it gets; servers are warmed in parallel. Results are saved under
+    ``warmup/`` and kept out of every steady-state statistic.
+    """
+    prompt_type = args.warmup_prompt
+    prompt = get_prompt(TEST_PROMPTS[prompt_type])
+    warmup_dir = run_dir / "warmup"
+    warmup_dir.mkdir(exist_ok=True)
+
+    by_port: Dict[Any, List[str]] = {}
+    for name, config in agents.items():
+        by_port.setdefault(config.get("port"), []).append(name)
+
+    cold: Dict[str, List[TestMetrics]] = {name: [] for name in agents}
+
+    async def warm_port(names: List[str]):
+        for name in names:
+            for i in range(1, args.warmup + 1):
+                cold[name].append(await test_agent(client, name, agents[name], prompt_type, prompt,
+                                                   warmup_dir, i, run_id=f"warmup-{name}-{i}",
+                                                   timeouts=timeouts_from_args(args)))
+
+    print(f"\n🔥 Warming up {len(agents)} agents ({args.warmup} x {prompt_type}, not measured)...")
+    await asyncio.gather(*(warm_port(names) for names in by_port.values()))
+    return cold
+
+
+def summarize_cold(cold: Dict[str, List[TestMetrics]],
+                   latency: Optional[LatencyAggregator] = None) -> Dict[str, Any]:
+    """First-request metrics per agent, with the penalty against warm p50 when known."""
+    summary = {}
+    for name, metrics_list in cold.items():
+        if not metrics_list:
+            continue
+        first = metrics_list[0]
+        entry = {
+            "runs": len(metrics_list),
+            "successes": sum(1 for m in metrics_list if m.success),
+            "first": {
+                "success": first.success,
+                "error": first.error,
+                "total_ms": first.total_time_ms,
+                "ttfb_ms": first.time_to_first_event_ms,
+                "ttfc_ms": first.time_to_first_content_ms,
+                "connect_ms": first.connection.connect_ms if first.connection else None,
+                "phases": asdict(first.phases) if first.phases else None,
+            },
+            "total_ms": [m.total_time_ms for m in metrics_list],
+            "warm_p50_ms": None,
+            "penalty_ms": None,
+        }
+        if latency is not None and name in latency.keys("agent"):
+            warm = latency.summary("agent", name)["total_ms"]["p50"]
+            entry["warm_p50_ms"] = warm
+            if first.success:
+                entry["penalty_ms"] = first.total_time_ms - warm
+        summary[name] = entry
+    return summary
+
+
+def print_cold_report(cold_summary: Dict[str, Any]):
+    """Print each agent's first (cold) request next to its warm latency."""
+    print("\n" + "-" * 100)
+    print("COLD VS WARM (first warm-up request per agent)")
+    print("-" * 100)
+    print(f"\n{'Agent':<28} {'Cold total':>11} {'Cold TTFB':>10} {'Cold TTFC':>10} "
+          f"{'→Model':>9} {'Warm p50':>10} {'Penalty':>10}")
+    print("-" * 100)
+
+    def fmt(value: Optional[float]) -> str:
+        return f"{value:.0f}ms" if value is not None else "-"
+
+    rows = sorted(cold_summary.items(), key=lambda item: -(item[1]["penalty_ms"] or 0))
+    for name, entry in rows:
+        first = entry["first"]
+        if not first["success"]:
+            print(f"{name:<28} ❌ {(first['error'] or 'failed')[:60]}")
+            continue
+        model_start = (first["phases"] or {}).get("model_start_ms")
+        print(f"{name:<28} {fmt(first['total_ms']):>11} {fmt(first['ttfb_ms']):>10} "
+              f"{fmt(first['ttfc_ms']):>10} {fmt(model_start):>9} {fmt(entry['warm_p50_ms']):>10} "
+              f"{fmt(entry['penalty_ms']):>10}")
+
+
+def summarize_buffering(all_metrics: Dict[str, List[TestMetrics]]) -> Dict[str, Any]:
+    """Per-agent read framing: events per read, buffering score and burst-delivered runs."""
+    summary = {}
+    for name, metrics_list in all_metrics.items():
+        framings = [m.read_framing for m in metrics_list if m.success and m.read_framing]
+        if not framings:
+            continue
+        bytes_per_read = LatencyHistogram()
+        events_per_read: Dict[int, int] = {}
+        for framing in framings:
+            bytes_per_read.merge(framing.bytes_per_read)
+            for events, reads in framing.events_per_read.items():
+                events_per_read[events] = events_per_read.get(events, 0) + reads
+        scores = [f.buffering_score for f in framings if f.buffering_score is not None]
+        buffered_runs = sum(1 for f in framings if f.buffered)
+        summary[name] = {
+            "runs": len(framings),
+            "reads": sum(f.reads for f in framings),
+            "bytes_per_read": bytes_per_read.summary(),
+            "events_per_read": {str(k): v for k, v in sorted(events_per_read.items())},
+            "events_per_read_mean": (sum(k * v for k, v in events_per_read.items())
+                                     / sum(events_per_read.values())),
+            "max_events_per_read": max(f.max_events_per_read for f in framings),
+            "buffering_score": statistics.median(scores) if scores else None,
+            "buffered_runs": buffered_runs,
+            "max_held_ms": max(f.max_held_ms for f in framings),
+            # Flagged when most runs deliver their deltas in held-back bursts
+            "buffered": buffered_runs * 2 > len(framings),
+        }
+    return summary
+
+
+def print_buffering_report(buffering: Dict[str, Any]):
+    """Print how each agent's events are framed into network reads."""
+    if not buffering:
+        return
+    print("\n" + "-" * 100)
+    print("SERVER BUFFERING (events per network read; score 0 = flushed per delta, 1 = one burst)")
+    print("-" * 100)
+    print(f"\n{'Agent':<28} {'Reads':>7} {'Bytes/read':>11} {'Events/read':>12} {'Max':>5} "
+          f"{'Score':>6} {'Bursty runs':>12} {'Held':>8}")
+    print("-" * 100)
+    rows = sorted(buffering.items(), key=lambda item: -(item[1]["buffering_score"] or 0))
+    for name, entry in rows:
+        score = entry["buffering_score"]
+        flag = "  ⚠️ buffered" if entry["buffered"] else ""
+        print(f"{name:<28} {entry['reads']:>7} {entry['bytes_per_read']['p50']:>10.0f}B "
+              f"{entry['events_per_read_mean']:>12.2f} {entry['max_events_per_read']:>5} "
+              f"{(f'{score:.2f}' if score is not None else '-'):>6} "
+              f"{entry['buffered_runs']:>6}/{entry['runs']:<5} {entry['max_held_ms']:>6.0f}ms{flag}")
+
+    flagged = [name for name, entry in buffering.items() if entry["buffered"]]
+    if flagged:
+        print(f"\n⚠️  Burst delivery (most runs held deltas back, then sent them at once): "
+              f"{', '.join(sorted(flagged))}")
+
+
+def summarize_conversations(all_metrics: Dict[str, List[TestMetrics]]) -> Dict[str, Any]:
+    """Per-turn latency and request size of the multi-turn tests, per agent."""
+    conversations = {}
+    for name, metrics_list in all_metrics.items():
+        multi = [m for m in metrics_list if m.is_multi_turn]
+        if not multi:
+            continue
+        by_turn: Dict[int, List[TurnMetrics]] = {}
+        for m in multi:
+            for t in m.turns:
+                by_turn.setdefault(t.turn, []).append(t)
+        conversations[name] = {
+            "conversations": len(multi),
+            "completed": sum(1 for m in multi if m.success),
+            "context_retained": sum(1 for m in multi if m.context_retained),
+            "turns": [{
+                "turn": turn,
+                "requests": len(turns),
+                "errors": sum(1 for t in turns if not t.success),
+                "request_bytes_mean": statistics.mean(t.request_bytes for t in turns),
+                # 0 means the event never arrived, not an instant response
+                "ttfc_ms": latency_summary([t.ttfc_ms for t in turns if t.success and t.ttfc_ms]),
+                "total_ms": latency_summary([t.total_ms for t in turns if t.success]),
+            } for turn, turns in sorted(by_turn.items())],
+        }
+    return conversations
+
+
+def print_conversation_report(conversations: Dict[str, Any]):
+    """Print each turn of the multi-turn tests: history sent and latency."""
+    if not conversations:
+        return
+    print("\n" + "-" * 100)
+    print("MULTI-TURN CONVERSATIONS (every turn resends the history)")
+    print("-" * 100)
+    print(f"\n{'Agent':<28} {'Turn':>5} {'Reqs':>5} {'Err':>4} {'Request':>9} {'TTFC p50':>10} "
+          f"{'Total p50':>10} {'Retained':>9}")
+    print("-" * 100)
+    for name, entry in sorted(conversations.items()):
+        for i, t in enumerate(entry["turns"]):
+            retained = f"{entry['context_retained']}/{entry['conversations']}" if i == 0 else ""
+            print(f"{name if i == 0 else '':<28} {t['turn']:>5} {t['requests']:>5} {t['errors']:>4} "
+                  f"{t['request_bytes_mean']:>8.0f}B {t['ttfc_ms']['p50']:>8.0f}ms "
+                  f"{t['total_ms']['p50']:>8.0f}ms {retained:>9}")
+
+
+def summarize_wire(all_metrics: Dict[str, List[TestMetrics]]) -> Dict[str, Any]:
+    """Per-agent bytes on the wire, per run and per event type."""
+    summary = {}
+    for name, metrics_list in all_metrics.items():
+        wires = [m.wire for m in metrics_list if m.success and m.wire]
+        if not wires:
+            continue
+        by_type: Dict[str, Dict[str, int]] = {}
+        for wire in wires:
+            for event_type, size in wire.by_type.items():
+                totals = by_type.setdefault(event_type, {"count": 0, "wire_bytes": 0, "payload_bytes": 0})
+                totals["count"] += size.count
+                totals["wire_bytes"] += size.wire_bytes
+                totals["payload_bytes"] += size.payload_bytes
+        total = sum(w.bytes for w in wires)
+        chars = sum(m.response_chars for m in metrics_list if m.success and m.wire)
+        summary[name] = {
+            "runs": len(wires),
+            "bytes": latency_summary([w.bytes for w in wires]),
+            "payload_share": sum(w.payload_bytes for w in wires) / total if total else None,
+            "framing_share": sum(w.framing_bytes for w in wires) / total if total else None,
+            "raw_event_bytes": sum(w.raw_event_bytes for w in wires),
+            "bytes_per_char": total / chars if chars else None,
+            "payload_bytes_per_char": sum(w.payload_bytes for w in wires) / chars if chars else None,
+            "by_type": dict(sorted(by_type.items(), key=lambda item: -item[1]["wire_bytes"])),
+        }
+    return summary
+
+
+def summarize_failures(all_metrics: Dict[str, List[TestMetrics]],
+                       quarantine_after: int) -> Dict[str, Any]:
+    """Failure counts per agent and class, and the agents that were quarantined."""
+    # Replaying results in arrival order reproduces each worker's quarantine decisions
+    replay = Quarantine(quarantine_after)
+    by_agent: Dict[str, Dict[str, int]] = {}
+    for name, metrics_list in all_metrics.items():
+        for m in metrics_list:
+            if m.failure == QUARANTINED:
+                replay.quarantined.setdefault(name, QUARANTINED)
+            else:
+                replay.record(name, m.failure)
+            if not m.success:
+                kind = m.failure or EXCEPTION
+                counts = by_agent.setdefault(name, {})
+                counts[kind] = counts.get(kind, 0) + 1
+    return {"by_agent": by_agent, "quarantined": replay.quarantined}
+
+
+def print_failure_report(failures: Dict[str, Any]):
+    """Print failed requests per agent, by failure class."""
+    by_agent = failures["by_agent"]
+    if not by_agent:
+        return
+    kinds = sorted({kind for counts in by_agent.values() for kind in counts})
+    print("\n" + "-" * 100)
+    print("FAILURES BY CLASS")
+    print("-" * 100)
+    print(f"\n{'Agent':<28} " + " ".join(f"{kind:>21}" for kind in kinds))
+    print("-" * 100)
+    for name, counts in sorted(by_agent.items(), key=lambda item: -sum(item[1].values())):
+        flag = "  🚧 quarantined" if name in failures["quarantined"] else ""
+        print(f"{name:<28} " + " ".join(f"{counts.get(kind, 0):>21}" for kind in kinds) + flag)
+
+
+async def run_load_mode(args: argparse.Namespace, client: httpx.AsyncClient,
+                        agents: Dict[str, dict], run_dir: Path,
+                        cold: Optional[Dict[str, List[TestMetrics]]] = None) -> Dict[str, Any]:
+    """Run one of the load modes against the selected agents."""
+    def make_sender(name: str):
+        return make_load_sender(client, name, agents[name], args)
+
+    results = await LOAD_MODES[args.mode](args, agents, make_sender, run_dir)
+
+    summary = {
+        "timestamp": run_dir.name,
+        "end_time": datetime.now().isoformat(),
+        "mode": args.mode,
+        "prompt": args.prompt,
+        args.mode: results,
+    }
+    if cold:
+        summary["cold"] = summarize_cold(cold)
+    with open(run_dir / "summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"\n📁 {args.mode} results saved to: {run_dir / args.mode}")
+    print(f"   - Run summary: summary.json")
+    return results
+
+
+def build_run_metadata(args: argparse.Namespace, timestamp: str, schedule: ScheduleConfig,
+                       selected_agents: Dict[str, dict], num_runs: int) -> Dict[str, Any]:
+    """Settings of a new run, saved as run-metadata.json."""
+    return {
         "timestamp": timestamp,
         "start_time": datetime.now().isoformat(),
-        "num_runs": NUM_RUNS,
+        "num_runs": num_runs,
+        "adaptive": adaptive_config_from_args(args).as_dict() if args.adaptive else None,
         "models": MODELS,
         "test_prompts": TEST_PROMPTS,
-        "total_agents": len(AGENTS),
+        "mode": args.mode,
+        "total_agents": len(selected_agents),
+        "schedule": schedule.as_dict(),
+        "http_limits": {
+            "max_connections": args.max_connections,
+            "max_keepalive": args.max_keepalive,
+        },
+        "processes": args.processes,
+        "warmup": {"runs": args.warmup, "prompt": args.warmup_prompt} if args.warmup else None,
+        "timeouts": timeouts_from_args(args).as_dict(),
+        "quarantine_after": args.quarantine_after,
+        "rate_limits": rate_limiter_from_args(args).as_dict() if args.rate_limit or args.provider_limit else None,
+        "noise": {"trace_gc": args.trace_gc, "loop_lag_tick_ms": args.loop_lag_tick,
+                  "gc_freeze": args.gc_freeze},
     }
-    with open(run_dir / "run-metadata.json", "w") as f:
-        json.dump(run_metadata, f, indent=2)
 
-    async with httpx.AsyncClient() as client:
+
+async def main(args: Optional[argparse.Namespace] = None):
+    if args is None:
+        args = parse_args([])
+    schedule = schedule_from_args(args)
+
+    print("🧪 AG-UI Multi-Framework Multi-Model Test Suite")
+    print("=" * 120)
+    selected_agents = {name: config for name, config in AGENTS.items()
+                       if (not args.agent or name in args.agent)
+                       and (not args.model or config.get("model") in args.model)}
+    print(f"Testing {len(selected_agents)} agent configurations across "
+          f"{len({config.get('model') for config in selected_agents.values()})} models")
+
+    if args.resume is not None:
+        run_dir = args.resume
+        timestamp = run_dir.name
+        with open(run_dir / "run-metadata.json") as f:
+            run_metadata = json.load(f)
+        num_runs = run_metadata.get("num_runs", NUM_RUNS)
+        print(f"\n📁 Resuming run: {run_dir}")
+    else:
+        # Create timestamped run directory
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        run_dir = BENCHMARK_RUNS_DIR / timestamp
+        run_dir.mkdir(parents=True, exist_ok=True)
+        num_runs = args.min_runs if args.adaptive else NUM_RUNS
+        print(f"\n📁 Saving detailed logs to: {run_dir}")
+
+    # Every finished test is appended here; the summary is rebuilt from it
+    results_log = ResultsLog(run_dir)
+    logged = results_log.load()
+
+    # The full grid (adaptive sampling extends it), and the cells still to run
+    grid = build_jobs(selected_agents, num_runs, args.prompt_type)
+    passed = {cell_key(m) for m in logged if m.success}
+    pending = [job for job in grid if (job.name, job.prompt_type, job.run_num) not in passed]
+    if args.resume is not None:
+        print(f"   {len(logged)} results logged, {len(grid) - len(pending)}/{len(grid)} selected cells "
+              f"passed, {len(pending)} to run")
+        run_metadata.setdefault("resumes", []).append({
+            "start_time": datetime.now().isoformat(),
+            "agents": args.agent,
+            "models": args.model,
+            "prompt_types": args.prompt_type,
+            "pending": len(pending),
+        })
+        with open(run_dir / "run-metadata.json", "w") as f:
+            json.dump(run_metadata, f, indent=2)
+    else:
+        with open(run_dir / "run-metadata.json", "w") as f:
+            json.dump(build_run_metadata(args, timestamp, schedule, selected_agents, num_runs),
+                      f, indent=2)
+
+    # Only agents with work left need to be up
+    selected_agents = {name: config for name, config in selected_agents.items()
+                       if any(job.name == name for job in pending)}
+
+    limits = build_limits(args.max_connections, args.max_keepalive)
+    async with httpx.AsyncClient(limits=limits) as client:
         # Step 1: Health checks (group by port to avoid duplicate checks)
         print("\n📡 Checking agent health...")
         checked_ports = {}
         healthy_agents = {}
 
-        for name, config in AGENTS.items():
+        for name, config in selected_agents.items():
             port = config["port"]
             if port in checked_ports:
                 # Already checked this port
@@ -1371,71 +2226,101 @@ async def main():
                 else:
                     print(f"  ❌ {name}: not reachable")
 
-        if not healthy_agents:
+        if not healthy_agents and args.resume is None:
             print("\n❌ No agents are running!")
             sys.exit(1)
 
-        print(f"\n✅ {len(healthy_agents)}/{len(AGENTS)} agents healthy")
+        print(f"\n✅ {len(healthy_agents)}/{len(selected_agents)} agents healthy")
+        pending = [job for job in pending if job.name in healthy_agents]
 
-        # Step 2: Run tests
-        total_tests = len(healthy_agents) * len(TEST_PROMPTS) * NUM_RUNS
-        print(f"\n🧪 Running AG-UI protocol tests ({NUM_RUNS} runs each, {total_tests} total)...")
-
-        all_metrics: Dict[str, List[TestMetrics]] = {name: [] for name in healthy_agents}
-
-        for run in range(NUM_RUNS):
-            print(f"\n  === Run {run + 1}/{NUM_RUNS} ===")
-
-            # Build all tasks for parallel execution
-            tasks = []
-            task_info = []  # Track (name, prompt_type) for each task
-
-            for name, config in healthy_agents.items():
-                for prompt_type, test_config in TEST_PROMPTS.items():
-                    # Extract actual prompt string from test config
-                    if isinstance(test_config, dict) and "prompt" in test_config:
-                        prompt = test_config["prompt"]
-                    else:
-                        prompt = test_config  # Fallback for simple string prompts
-
-                    tasks.append(test_agent(client, name, config, prompt_type, prompt, run_dir, run + 1))
-                    task_info.append((name, prompt_type))
-
-            # Run all tests in parallel
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Organize results by agent and model for display
-            agent_results: Dict[str, List[TestMetrics]] = {name: [] for name in healthy_agents}
-
-            for i, result in enumerate(results):
-                name, prompt_type = task_info[i]
-                if isinstance(result, Exception):
-                    # Extract prompt string from test config
-                    test_config = TEST_PROMPTS[prompt_type]
-                    prompt_str = test_config["prompt"] if isinstance(test_config, dict) and "prompt" in test_config else test_config
-                    metrics = TestMetrics(name=name, prompt_type=prompt_type, prompt=prompt_str)
-                    metrics.error = str(result)
-                    agent_results[name].append(metrics)
-                    all_metrics[name].append(metrics)
-                else:
-                    agent_results[name].append(result)
-                    all_metrics[name].append(result)
+        # Step 1b: Warm-up, reported as cold metrics
+        cold = await run_warmup(client, healthy_agents, args, run_dir) if args.warmup > 0 else {}
 
-            # Print results grouped by model
-            for model_key in MODELS.keys():
-                model_agents = [n for n in healthy_agents if healthy_agents[n].get("model") == model_key]
-                if not model_agents:
-                    continue
+        # Instrument only the measured requests
+        monitor = start_noise_monitor(args)
 
-                print(f"\n  [{model_key.upper()}]")
-                for name in model_agents:
-                    agent_res = agent_results[name]
-                    passed = sum(1 for r in agent_res if r.success)
-                    times = [f"{r.total_time_ms:.0f}ms" for r in agent_res]
-                    status = "✅" if passed == len(agent_res) else "⚠️"
-                    print(f"    {status} {name}: {passed}/{len(agent_res)} ({', '.join(times)})")
+        if args.mode != "benchmark":
+            await run_load_mode(args, client, healthy_agents, run_dir, cold)
+            if monitor:
+                await monitor.stop()
+            return
 
-        # Step 3: Analyze and report
+        # Step 2: Run tests
+        print(f"\n🧪 Running AG-UI protocol tests ({num_runs} runs each, {len(pending)} total)...")
+        print(f"   Schedule: {describe_schedule(schedule)}")
+
+        # Results kept from earlier sessions; cells about to be rerun start over
+        rerun = {(job.name, job.prompt_type, job.run_num) for job in pending}
+        cells: Dict[tuple, List[TestMetrics]] = {}
+        for m in logged:
+            if cell_key(m) not in rerun:
+                cells.setdefault((m.name, m.prompt_type), []).append(m)
+
+        # Queue every run up front; the scheduler pipelines them instead of
+        # waiting for the slowest test of run N before starting run N+1
+        jobs = pending
+        run_results: Dict[int, Dict[str, List[TestMetrics]]] = {
+            job.run_num: {name: [] for name in healthy_agents} for job in jobs
+        }
+        remaining: Dict[int, int] = {}
+        for job in jobs:
+            remaining[job.run_num] = remaining.get(job.run_num, 0) + 1
+
+        timeouts = timeouts_from_args(args)
+        quarantine = Quarantine(args.quarantine_after)
+        rate_limiter = rate_limiter_from_args(args)
+
+        async def execute(job: TestJob) -> TestMetrics:
+            return await execute_job(client, job, run_dir, timeouts, quarantine)
+
+        def record(job: TestJob, result) -> TestMetrics:
+            if isinstance(result, Exception):
+                metrics = TestMetrics(name=job.name, prompt_type=job.prompt_type,
+                                      prompt=job.prompt, run_num=job.run_num)
+                metrics.error = str(result)
+                result = metrics
+            results_log.append(result)
+            cells.setdefault((job.name, job.prompt_type), []).append(result)
+            return result
+
+        def on_result(job: TestJob, result):
+            result = record(job, result)
+            run_results[job.run_num][job.name].append(result)
+
+            remaining[job.run_num] -= 1
+            if remaining[job.run_num] == 0:
+                ran = {name: healthy_agents[name]
+                       for name, results in run_results[job.run_num].items() if results}
+                print_run_results(job.run_num, run_results[job.run_num], ran, num_runs)
+
+        async def run_batch(batch: List[TestJob], callback):
+            if args.processes > 1:
+                await run_jobs_sharded(batch, schedule, run_dir, args, callback)
+            else:
+                await TestScheduler(schedule, rate_limiter).run(batch, execute, callback)
+
+        await run_batch(jobs, on_result)
+
+        # Sequential sampling: more runs only for cells whose CI is still wide
+        adaptive_summary = None
+        if args.adaptive:
+            sampler = AdaptiveSampler(adaptive_config_from_args(args),
+                                      [job for job in grid if job.name in healthy_agents], job_cost)
+            while True:
+                extra = sampler.plan(cells)
+                if not extra:
+                    break
+                sampled = {(job.name, job.prompt_type) for job in extra}
+                print(f"\n  🔁 Adaptive round {sampler.rounds}: {len(extra)} more runs "
+                      f"for {len(sampled)}/{len(sampler.templates)} cells")
+                await run_batch(extra, record)
+            adaptive_summary = sampler.summary(cells)
+
+        if monitor:
+            await monitor.stop()
+
+        # Step 3: Analyze and report, from everything the run has logged
+        all_metrics = group_by_agent(results_log.load(), order=AGENTS)
         flat_results = [m for metrics_list in all_metrics.values() for m in metrics_list]
         analysis = analyze_results(flat_results)
 
@@ -1444,13 +2329,38 @@ async def main():
         print("=" * 120)
         print(f"\nTotal Tests: {analysis['total_tests']}")
         print(f"Passed: {analysis['successful']}")
-        print(f"Failed: {analysis['failed']}")
+        rate_limited = sum(1 for m in flat_results if m.failure == RATE_LIMITED)
+        print(f"Failed: {analysis['failed']}"
+              + (f" ({rate_limited} rate-limited upstream, not framework failures)" if rate_limited else ""))
+
+        latency = build_latency_aggregator(all_metrics)
+        ranking = build_ranking(all_metrics)
 
         # Print comparison reports
-        print_comparison_by_model(all_metrics)
-        print_comparison_by_framework(all_metrics)
-        print_overall_ranking(all_metrics)
+        print_comparison_by_model(all_metrics, latency)
+        print_comparison_by_framework(all_metrics, latency)
+        print_overall_ranking(all_metrics, latency, ranking)
         print_test_breakdown(all_metrics)
+        print_latency_percentiles(latency)
+        print_phase_breakdown(latency)
+        print_token_timing(latency)
+        if adaptive_summary:
+            print_adaptive_report(adaptive_summary)
+        cold_summary = summarize_cold(cold, latency) if cold else None
+        if cold_summary:
+            print_cold_report(cold_summary)
+        throttling = summarize_throttling(all_metrics)
+        if args.rate_limit or args.provider_limit or any(e["rate_limited"] for e in throttling.values()):
+            print_throttle_report(throttling)
+        conversations = summarize_conversations(all_metrics)
+        print_conversation_report(conversations)
+        buffering = summarize_buffering(all_metrics)
+        print_buffering_report(buffering)
+        failures = summarize_failures(all_metrics, args.quarantine_after)
+        print_failure_report(failures)
+        noise = summarize_noise(all_metrics, monitor) if monitor else None
+        if noise:
+            print_noise_report(noise)
         print_cost_breakdown(all_metrics)
         print_startup_times(load_startup_times())
 
@@ -1470,7 +2380,7 @@ async def main():
                 for name, metrics_list in model_agents.items():
                     successful = [m for m in metrics_list if m.success]
                     if successful:
-                        med = median([m.total_time_ms for m in successful])
+                        med = latency.summary("agent", name)["total_ms"]["p50"]
                         if med < best_time:
                             best_time = med
                             best = name
@@ -1478,43 +2388,52 @@ async def main():
                     framework = AGENTS.get(best, {}).get("framework", best)
                     print(f"  {model_key.upper()}: {framework} ({best_time:.0f}ms)")
 
-        # Overall best
-        all_times = {}
-        for name, metrics_list in all_metrics.items():
-            successful = [m for m in metrics_list if m.success]
-            if successful:
-                all_times[name] = median([m.total_time_ms for m in successful])
-
-        if all_times:
-            fastest = min(all_times.items(), key=lambda x: x[1])
-            slowest = max(all_times.items(), key=lambda x: x[1])
-            fastest_config = AGENTS.get(fastest[0], {})
-            slowest_config = AGENTS.get(slowest[0], {})
-            print(f"\n🥇 Overall Fastest: {fastest[0]} ({fastest[1]:.0f}ms) - {fastest_config.get('framework')} + {fastest_config.get('model')}")
-            print(f"🐢 Overall Slowest: {slowest[0]} ({slowest[1]:.0f}ms) - {slowest_config.get('framework')} + {slowest_config.get('model')}")
+        # Overall best, with every agent it cannot be told apart from
+        tiers = ranking["tiers"]
+        if tiers:
+            fastest, slowest = tiers[0], tiers[-1]
+            fastest_config = AGENTS.get(fastest["name"], {})
+            slowest_config = AGENTS.get(slowest["name"], {})
+            tied = [row["name"] for row in tiers[1:] if row["tier"] == fastest["tier"]]
+            print(f"\n🥇 Overall Fastest: {fastest['name']} ({fastest['median']:.0f}ms, "
+                  f"CI {format_ci(fastest['ci_low'], fastest['ci_high'])}) - "
+                  f"{fastest_config.get('framework')} + {fastest_config.get('model')}")
+            if tied:
+                print(f"   ⚖️  Statistically tied with: {', '.join(tied)}")
+            print(f"🐢 Overall Slowest: {slowest['name']} ({slowest['median']:.0f}ms) - "
+                  f"{slowest_config.get('framework')} + {slowest_config.get('model')}")
 
         # Save summary to run directory
         summary = {
             "timestamp": timestamp,
             "end_time": datetime.now().isoformat(),
+            "schedule": schedule.as_dict(),
             "analysis": {
                 "total_tests": analysis["total_tests"],
                 "successful": analysis["successful"],
                 "failed": analysis["failed"],
+                "rate_limited": rate_limited,
             },
             "fastest_by_model": {},
             "overall_fastest": {
-                "name": fastest[0] if all_times else None,
-                "time_ms": fastest[1] if all_times else None,
-                "framework": fastest_config.get("framework") if all_times else None,
-                "model": fastest_config.get("model") if all_times else None,
+                "name": fastest["name"] if tiers else None,
+                "time_ms": fastest["median"] if tiers else None,
+                "ci_low_ms": fastest["ci_low"] if tiers else None,
+                "ci_high_ms": fastest["ci_high"] if tiers else None,
+                "tied_with": tied if tiers else [],
+                "framework": fastest_config.get("framework") if tiers else None,
+                "model": fastest_config.get("model") if tiers else None,
             },
             "overall_slowest": {
-                "name": slowest[0] if all_times else None,
-                "time_ms": slowest[1] if all_times else None,
-                "framework": slowest_config.get("framework") if all_times else None,
-                "model": slowest_config.get("model") if all_times else None,
+                "name": slowest["name"] if tiers else None,
+                "time_ms": slowest["median"] if tiers else None,
+                "framework": slowest_config.get("framework") if tiers else None,
+                "model": slowest_config.get("model") if tiers else None,
             },
+            "ranking": ranking,
+            "timeouts": timeouts.as_dict(),
+            "failures": failures["by_agent"],
+            "quarantined": failures["quarantined"],
             "all_results": {}
         }
 
@@ -1528,7 +2447,7 @@ async def main():
                 for name, metrics_list in model_agents.items():
                     successful = [m for m in metrics_list if m.success]
                     if successful:
-                        med = median([m.total_time_ms for m in successful])
+                        med = latency.summary("agent", name)["total_ms"]["p50"]
                         if med < best_time:
                             best_time = med
                             best = name
@@ -1541,22 +2460,46 @@ async def main():
                     }
 
         # Add all agent results
+        ranks = {row["name"]: row for row in tiers}
         for name, metrics_list in all_metrics.items():
             successful = [m for m in metrics_list if m.success]
             if successful:
                 config = AGENTS.get(name, {})
+                agent_latency = latency.summary("agent", name)
                 summary["all_results"][name] = {
                     "framework": config.get("framework", name),
                     "model": config.get("model", "unknown"),
                     "model_id": config.get("model_id", "unknown"),
                     "type": config.get("type", "unknown"),
-                    "median_time_ms": median([m.total_time_ms for m in successful]),
-                    "median_ttfb_ms": median([m.time_to_first_event_ms for m in successful]),
-                    "median_ttfc_ms": median([m.time_to_first_content_ms for m in successful]),
+                    "median_time_ms": agent_latency["total_ms"]["p50"],
+                    "median_ttfb_ms": agent_latency["ttfb_ms"]["p50"],
+                    "median_ttfc_ms": agent_latency["ttfc_ms"]["p50"],
+                    "latency": agent_latency,
+                    "rank": ranks.get(name, {}).get("rank"),
+                    "tier": ranks.get(name, {}).get("tier"),
+                    "median_ci_ms": {
+                        metric: [interval["ci_low"], interval["ci_high"]]
+                        for metric, interval in ranking["intervals"].get(name, {}).items()
+                    },
                     "tests_passed": len(successful),
                     "tests_total": len(metrics_list),
                 }
 
+        # Full distributions; the histograms merge across runs bucket by bucket
+        summary["latency_by_prompt"] = latency.summaries("prompt")
+        summary["latency_by_model"] = latency.summaries("model")
+        summary["histograms"] = latency.to_dict()
+        summary["throttling"] = throttling
+        summary["conversations"] = conversations
+        summary["buffering"] = buffering
+        summary["wire"] = summarize_wire(all_metrics)
+        if noise:
+            summary["noise"] = noise
+        if adaptive_summary:
+            summary["adaptive"] = adaptive_summary
+        if cold_summary:
+            summary["cold"] = cold_summary
+
         with open(run_dir / "summary.json", "w") as f:
             json.dump(summary, f, indent=2)
 
@@ -1575,4 +2518,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,72 @@
+"""Aborted streams are measured from the events received before the abort."""
+
+import asyncio
+import json
+
+import httpx
+
+import test_agents
+from stream_guard import CONNECTION_ERROR, IDLE_TIMEOUT, StreamTimeouts
+
+
+EVENTS = [
+    {"type": "RUN_STARTED", "threadId": "t", "runId": "r"},
+    {"type": "TEXT_MESSAGE_START", "messageId": "m", "role": "assistant"},
+    {"type": "TEXT_MESSAGE_CONTENT", "messageId": "m", "delta": "Hello "},
+    {"type": "TEXT_MESSAGE_CONTENT", "messageId": "m", "delta": "world!"},
+]
+CONFIG = {"url": "http://agent.test/agent"}
+
+
+class AbortingBody(httpx.AsyncByteStream):
+    """Streams EVENTS, then drops the connection or goes silent."""
+
+    def __init__(self, drop: bool):
+        self.drop = drop
+
+    async def __aiter__(self):
+        for event in EVENTS:
+            yield f"data: {json.dumps(event)}\n\n".encode()
+            await asyncio.sleep(0.01)
+        if self.drop:
+            raise httpx.RemoteProtocolError("peer closed connection without sending complete message body")
+        await asyncio.sleep(10)
+
+
+def run_aborted(tmp_path, drop: bool):
+    def handler(request):
+        return httpx.Response(200, stream=AbortingBody(drop),
+                              headers={"content-type": "text/event-stream"})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await test_agents.test_agent(client, "mock", CONFIG, "simple", "hi", tmp_path, 1,
+                                                timeouts=StreamTimeouts(idle_s=0.2))
+
+    metrics = asyncio.run(run())
+    with open(tmp_path / "mock" / "run1-simple" / "metadata.json") as f:
+        return metrics, json.load(f)
+
+
+def assert_partial_measured(metrics, metadata):
+    assert not metrics.success
+    assert metadata["failure"]["partial"]
+    assert metadata["failure"]["events_received"] == 4
+    assert metadata["failure"]["chars_received"] == 12
+    assert metrics.final_response == "Hello world!"
+    assert metrics.time_to_first_content_ms > 0
+    assert metrics.total_time_ms >= metrics.time_to_first_content_ms
+    assert metadata["streaming"] is not None
+    assert metadata["read_framing"] is not None
+
+
+def test_timeout_abort_keeps_partial_stream(tmp_path):
+    metrics, metadata = run_aborted(tmp_path, drop=False)
+    assert metrics.failure == IDLE_TIMEOUT
+    assert_partial_measured(metrics, metadata)
+
+
+def test_connection_drop_keeps_partial_stream(tmp_path):
+    metrics, metadata = run_aborted(tmp_path, drop=True)
+    assert metrics.failure == CONNECTION_ERROR
+    assert_partial_measured(metrics, metadata)